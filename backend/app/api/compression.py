@@ -0,0 +1,66 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    """Starlette's GZipResponder with a brotli stream instead of zlib."""
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        # Flush streamed chunks so each NDJSON line reaches the client
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    """Whether Accept-Encoding lists the coding without q=0."""
+    for entry in accept_encoding.lower().split(","):
+        name, _, params = entry.partition(";")
+        if name.strip() == coding:
+            weight = params.strip().removeprefix("q=")
+            try:
+                return not weight or float(weight) > 0
+            except ValueError:
+                return True
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Compress responses of at least minimum_size bytes: brotli when the
+    client accepts it and the brotli package is installed, gzip otherwise.
+    Streaming responses are compressed chunk by chunk and flushed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if brotli is not None and _accepts(accept_encoding, "br"):
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif _accepts(accept_encoding, "gzip"):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
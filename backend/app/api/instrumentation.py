@@ -0,0 +1,55 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUEST_SECONDS, trace_request
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Time every HTTP request into HTTP_REQUEST_SECONDS, labelled by route
+    template so /api/items/{item_id} is one series. With slow_request_ms
+    set, requests at least that slow are logged with the time spent in
+    each span (OpenAI calls, vector store, write lane, retry sleeps, ...).
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_ms: int = 0):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with trace_request() as trace:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                seconds = time.perf_counter() - started
+                # The router records the matched route in the shared scope
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_SECONDS.observe(seconds, method=scope["method"], route=route, status=status)
+                if self.slow_request_ms and seconds * 1000 >= self.slow_request_ms:
+                    self._log_slow(scope, status, seconds, trace)
+
+    def _log_slow(self, scope: Scope, status: int, seconds: float, trace: dict[str, float]) -> None:
+        spans = sorted(trace.items(), key=lambda item: item[1], reverse=True)
+        breakdown = ", ".join(f"{operation} {spent * 1000:.0f}ms" for operation, spent in spans)
+        logger.warning(
+            "Slow request: %s %s -> %d in %.0fms (%s)",
+            scope["method"], scope["path"], status, seconds * 1000, breakdown or "no instrumented spans"
+        )
@@ -0,0 +1,53 @@
+import json
+from datetime import date
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json renders the same document, slower
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Types neither encoder handles natively (stdlib json also needs dates)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (stdlib json when it isn't
+    installed). Content is plain dicts and lists; datetimes and pydantic
+    models are encoded too. A handler returning it bypasses FastAPI's
+    response_model validation and serialization, so the route's
+    response_model only documents the shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for handlers that keep reading the request body
+    while the response streams.
+
+    Starlette's StreamingResponse listens for http.disconnect on receive()
+    under ASGI < 2.4 (uvicorn included), which would swallow the body
+    chunks the handler is still consuming. Here the handler owns receive();
+    a disconnect surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -1,38 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, func, tuple_
 from datetime import datetime
-from pathlib import Path
-import json
+import base64
 
-from app.core.database import get_db
+from app.api.responses import BodyStreamingResponse, ORJSONResponse
+from app.core.database import get_db, SessionLocal
+from app.core.writer import write_lane
 from app.core.config import settings
-from app.models.item import SavedItem
+from app.core.metrics import metrics
+from app.models.content import ContentBlob
+from app.models.item import SavedItem, CONTENT_FIELDS
+from app.models.ingest import IngestSession
 from app.schemas.ingest import (
+    IngestItem,
     IngestPayload,
     IngestResponse,
+    IngestBatchResult,
+    IngestSessionCreate,
+    IngestSessionResponse,
+    HighWaterMark,
+    HighWaterMarkResponse,
+    UrlProbeRequest,
+    UrlProbeResponse,
     SavedItemResponse,
     ItemListResponse,
     ProcessingStatusResponse,
     SemanticSearchRequest,
     SemanticSearchResult,
     SemanticSearchResponse,
+    KeywordSearchRequest,
+    KeywordSearchResult,
+    KeywordSearchResponse,
+    HybridSearchResult,
+    HybridSearchResponse,
+    SearchItemPreview,
     BulkProcessResponse,
-    ProcessingStatsResponse
+    ProcessingStatsResponse,
+    QueryCacheStatsResponse
 )
 from app.services.processor import (
-    process_item,
     process_all_pending,
-    get_processing_stats
+    get_processing_stats,
+    update_metric_gauges
+)
+from app.services.content_cache import content_cache
+from app.services.content_store import read_fields
+from app.services.debug_store import debug_store
+from app.services.ingest import bulk_ingest, find_existing_urls, iter_ndjson_batches
+from app.services.ingest_sessions import (
+    create_session,
+    get_high_water_mark,
+    record_session_items,
+    complete_session
 )
 from app.services.openai_service import get_openai_service
+from app.services.query_cache import query_embedding_cache
+from app.services.search_index import keyword_search, reciprocal_rank_fusion
 from app.services.vector_service import get_vector_service
-
-# Debug snapshots storage directory
-DEBUG_DIR = Path(__file__).parent.parent.parent / "data" / "debug_snapshots"
-DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+from app.services.work_queue import enqueue_items, is_job_running, work_queue
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Item fields a fields= selection can name, in response order
+ITEM_FIELDS = tuple(SavedItemResponse.model_fields)
+
+# Fields of list views without content (skips full_content/thread_content)
+LIST_FIELDS = tuple(
+    name for name in ITEM_FIELDS
+    if name not in ("full_content", "thread_content")
+)
+
+# Fields of preview-mode search results read from SQLite; content_preview
+# comes from the vector store match
+PREVIEW_FIELDS = tuple(name for name in SearchItemPreview.model_fields if name != "content_preview")
+
+# Always selected: the keyset cursor and the is_processing flag need them
+KEY_COLUMNS = ("id", "created_at", "embedding_status")
 
 
 def check_api_key_configured():
@@ -49,102 +97,47 @@ async def health_check():
     return {"status": "ok", "ai_enabled": bool(settings.OPENAI_API_KEY)}
 
 
+def _ingest_and_enqueue(
+    db: Session,
+    items: list[IngestItem],
+    platform: str,
+    skip_duplicates: bool,
+    session_id: int | None = None
+) -> dict:
+    """Write lane helper: store items, count them on their session and queue processing in one transaction."""
+    result = bulk_ingest(db, items, platform=platform, skip_duplicates=skip_duplicates)
+    if session_id is not None:
+        record_session_items(db, session_id, items)
+    if settings.AI_PROCESSING_ENABLED and result["item_ids"]:
+        enqueue_items(db, result["item_ids"])
+    return result
+
+
 @router.post("/api/ingest", response_model=IngestResponse)
-async def ingest_items(
-    payload: IngestPayload,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+async def ingest_items(payload: IngestPayload):
     """
     Ingest items from the extension.
     The extension now provides full content, so we just store it.
-    For each item:
-    - Check for duplicates
-    - Store with full_content from extension
+    The whole payload is handled set-based (see bulk_ingest):
+    - Resolve duplicates with one chunked IN query
+    - Store with full_content from extension via multi-row upsert
     - Set status based on whether content was provided
-    - Trigger background AI processing if API key is configured
+    - Queue AI processing if API key is configured
     """
     # Block ingest if API key is missing
     check_api_key_configured()
 
-    new_count = 0
-    duplicate_count = 0
-    failed_count = 0
-    items_to_process = []
-
-    for item in payload.items:
-        # Extract content_type from metadata
-        content_type = "tweet"
-        if item.extra_data and "content_type" in item.extra_data:
-            content_type = item.extra_data["content_type"]
-
-        # Determine if we have content
-        # For articles: title in metadata counts as content
-        # For tweets: full_content or preview_text counts
-        has_content = item.full_content is not None
-        if not has_content and content_type == "article" and item.extra_data:
-            has_content = item.extra_data.get("article_title") is not None
-
-        # Check for existing item
-        existing = db.execute(
-            select(SavedItem).where(SavedItem.source_url == item.url)
-        ).scalar_one_or_none()
-
-        if existing:
-            if payload.skip_duplicates:
-                # Update existing item with new content
-                existing.raw_preview = item.preview_text
-                existing.full_content = item.full_content
-                existing.thread_content = item.thread_content
-                existing.content_type = content_type
-                existing.extra_data = item.extra_data
-                existing.status = "fetched" if has_content else "pending"
-                existing.fetch_attempts = 1 if has_content else 0
-                # Reset processing status for re-processing
-                existing.summary_status = "pending"
-                existing.embedding_status = "pending"
-                existing.processing_error = None
-                if has_content:
-                    new_count += 1
-                    items_to_process.append(existing.id)
-                else:
-                    failed_count += 1
-            else:
-                duplicate_count += 1
-            continue
-
-        # Determine status based on whether content was fetched by extension
-        status = "fetched" if has_content else "pending"
-
-        # Create new item with content from extension
-        saved_item = SavedItem(
-            source_url=item.url,
-            source_platform=payload.platform,
-            content_type=content_type,
-            raw_preview=item.preview_text,
-            full_content=item.full_content,
-            thread_content=item.thread_content,
-            extra_data=item.extra_data,
-            status=status,
-            fetch_attempts=1 if has_content else 0,
-            summary_status="pending",
-            embedding_status="pending"
-        )
-        db.add(saved_item)
-        db.flush()  # Get the ID
-
-        if has_content:
-            new_count += 1
-            items_to_process.append(saved_item.id)
-        else:
-            failed_count += 1
-
-    db.commit()
+    # Stored and queued in one transaction on the serialized writer
+    if payload.session_id is not None:
+        await run_in_threadpool(_require_open_session, payload.session_id)
 
-    # Trigger background processing for all new/updated items
-    if settings.AI_PROCESSING_ENABLED and items_to_process:
-        for item_id in items_to_process:
-            background_tasks.add_task(process_item, item_id)
+    result = await write_lane.run(
+        _ingest_and_enqueue, payload.items, payload.platform, payload.skip_duplicates, payload.session_id
+    )
+    new_count = result["new_count"]
+    duplicate_count = result["duplicate_count"]
+    failed_count = result["failed_count"]
+    work_queue.notify()
 
     success = failed_count == 0
     message = f"Processed {len(payload.items)} items: {new_count} new, {duplicate_count} duplicates, {failed_count} failed"
@@ -158,51 +151,335 @@ async def ingest_items(
     )
 
 
+@router.post("/api/ingest/stream")
+async def ingest_stream(
+    request: Request,
+    platform: str = Query("twitter"),
+    skip_duplicates: bool = Query(False),
+    session_id: int | None = Query(None, description="Open ingest session to count items against")
+):
+    """
+    Streaming ingest for large syncs.
+    The body is newline-delimited JSON, one IngestItem per line. Lines are
+    validated and committed in batches of INGEST_STREAM_BATCH_SIZE as bytes
+    arrive; one IngestBatchResult line is streamed back per batch, then a
+    final IngestResponse line with the totals. A batch that cannot be
+    stored is reported with its error and all its lines failed, and the
+    stream carries on with the next batch.
+    """
+    check_api_key_configured()
+    if session_id is not None:
+        await run_in_threadpool(_require_open_session, session_id)
+
+    async def results():
+        totals = {"received": 0, "new_count": 0, "duplicate_count": 0, "failed_count": 0}
+        batches = iter_ndjson_batches(
+            request.stream(),
+            batch_size=settings.INGEST_STREAM_BATCH_SIZE,
+            max_line_bytes=settings.INGEST_STREAM_MAX_LINE_BYTES
+        )
+        batch_number = 0
+        async for items, errors in batches:
+            batch_number += 1
+            result = {"new_count": 0, "duplicate_count": 0, "failed_count": 0}
+            batch_error = None
+            if items:
+                try:
+                    result = await write_lane.run(_ingest_and_enqueue, items, platform, skip_duplicates, session_id)
+                    work_queue.notify()
+                except Exception as e:
+                    # The 200 is already sent; report the batch instead of cutting the stream
+                    logger.exception("Streaming ingest batch %d failed", batch_number)
+                    result["failed_count"] = len(items)
+                    batch_error = str(e)
+
+            batch = IngestBatchResult(
+                batch=batch_number,
+                received=len(items) + len(errors),
+                new_count=result["new_count"],
+                duplicate_count=result["duplicate_count"],
+                failed_count=result["failed_count"] + len(errors),
+                errors=errors,
+                error=batch_error
+            )
+            for key in totals:
+                totals[key] += getattr(batch, key)
+            yield batch.model_dump_json() + "\n"
+
+        yield IngestResponse(
+            success=totals["failed_count"] == 0,
+            new_count=totals["new_count"],
+            duplicate_count=totals["duplicate_count"],
+            failed_count=totals["failed_count"],
+            message=(
+                f"Processed {totals['received']} items in {batch_number} batches: "
+                f"{totals['new_count']} new, {totals['duplicate_count']} duplicates, {totals['failed_count']} failed"
+            )
+        ).model_dump_json() + "\n"
+
+    return BodyStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def _require_open_session(session_id: int) -> None:
+    with SessionLocal() as db:
+        session = db.get(IngestSession, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Ingest session not found")
+    if session.status != "open":
+        raise HTTPException(status_code=409, detail="Ingest session is already completed")
+
+
+def _high_water_mark(session: IngestSession | None) -> HighWaterMark | None:
+    if session is None:
+        return None
+    return HighWaterMark(
+        status_id=str(session.newest_status_id),
+        url=session.newest_url,
+        session_id=session.id,
+        completed_at=session.completed_at
+    )
+
+
+def _session_response(session: IngestSession, mark: IngestSession | None = None) -> IngestSessionResponse:
+    return IngestSessionResponse(
+        id=session.id,
+        platform=session.platform,
+        collection=session.collection,
+        status=session.status,
+        item_count=session.item_count,
+        newest_status_id=str(session.newest_status_id) if session.newest_status_id is not None else None,
+        newest_url=session.newest_url,
+        created_at=session.created_at,
+        completed_at=session.completed_at,
+        high_water_mark=_high_water_mark(mark)
+    )
+
+
+def _open_session(db: Session, platform: str, collection: str) -> IngestSessionResponse:
+    """Write lane helper: open a session and report the collection's current mark."""
+    session = create_session(db, platform, collection)
+    return _session_response(session, get_high_water_mark(db, platform, collection))
+
+
+def _close_session(db: Session, session_id: int) -> IngestSessionResponse | None:
+    """Write lane helper: complete a session and report the resulting mark."""
+    session = complete_session(db, session_id)
+    if session is None:
+        return None
+    db.flush()
+    return _session_response(session, get_high_water_mark(db, session.platform, session.collection))
+
+
+@router.post("/api/ingest/sessions", response_model=IngestSessionResponse)
+async def open_ingest_session(request: IngestSessionCreate):
+    """
+    Start a sync. The response carries the collection's high-water mark
+    (newest status ID stored by the last completed sync), a hint for where
+    the extension can stop scrolling; /api/items/probe confirms which
+    items are really stored. Pass the session
+    id to /api/ingest or /api/ingest/stream, then complete the session.
+    """
+    return await write_lane.run(_open_session, request.platform, request.collection)
+
+
+@router.get("/api/ingest/sessions/{session_id}", response_model=IngestSessionResponse)
+def get_ingest_session(session_id: int, db: Session = Depends(get_db)):
+    """Session progress, e.g. to resume an interrupted sync."""
+    session = db.get(IngestSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Ingest session not found")
+    return _session_response(session, get_high_water_mark(db, session.platform, session.collection))
+
+
+@router.post("/api/ingest/sessions/{session_id}/complete", response_model=IngestSessionResponse)
+async def complete_ingest_session(session_id: int):
+    """
+    Finish a sync. Only now does the session's newest status ID become the
+    high-water mark, so an interrupted sync never skips unsent items.
+    """
+    response = await write_lane.run(_close_session, session_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Ingest session not found")
+    return response
+
+
+@router.get("/api/ingest/high-water-mark", response_model=HighWaterMarkResponse)
+def get_ingest_high_water_mark(
+    platform: str = Query("twitter"),
+    collection: str = Query("bookmarks"),
+    db: Session = Depends(get_db)
+):
+    """
+    Newest status ID stored by a completed sync of a collection. A hint for
+    where to stop scrolling, not a guarantee: an old tweet bookmarked since
+    then has a lower ID but is not stored. Use /api/items/probe to check.
+    """
+    return HighWaterMarkResponse(
+        platform=platform,
+        collection=collection,
+        high_water_mark=_high_water_mark(get_high_water_mark(db, platform, collection))
+    )
+
+
+@router.post("/api/items/probe", response_model=UrlProbeResponse)
+def probe_urls(request: UrlProbeRequest, db: Session = Depends(get_db)):
+    """
+    Report which URLs are already stored, so a client can skip sending them.
+    Backed by chunked IN lookups on the source_url index.
+    """
+    existing = find_existing_urls(db, list(dict.fromkeys(request.urls)))
+    return UrlProbeResponse(
+        existing=existing,
+        missing=[url for url in dict.fromkeys(request.urls) if url not in existing]
+    )
+
+
+def _select_fields(requested: list[str] | None, default: tuple[str, ...]) -> tuple[str, ...]:
+    """Validate a fields selection; returns the names in ITEM_FIELDS order, or default if none."""
+    requested = {name.strip() for name in requested or () if name.strip()}
+    if not requested:
+        return default
+    unknown = requested.difference(ITEM_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in ITEM_FIELDS if name in requested)
+
+
+def _select_items(names: tuple[str, ...]):
+    """
+    Core select of saved_items for the given response fields: their
+    columns plus KEY_COLUMNS, and the compressed content only when a
+    content field is among them. Unselected columns (extra_data
+    included) are never read or decoded.
+    """
+    table = SavedItem.__table__
+    wanted = {*KEY_COLUMNS, *names}
+    query = select(*(column for column in table.columns if column.name in wanted))
+    if any(name in CONTENT_FIELDS for name in names):
+        blobs = ContentBlob.__table__
+        query = query.add_columns(table.c.content_spans, blobs.c.data).outerjoin(
+            blobs, blobs.c.content_hash == table.c.content_ref
+        )
+    return query
+
+
+def _item_documents(rows, names: tuple[str, ...]) -> list[dict]:
+    """Response dicts with exactly the given fields for rows of _select_items(names)."""
+    content = tuple(name for name in names if name in CONTENT_FIELDS)
+    documents = []
+    for row in rows:
+        values = row._mapping
+        if content:
+            values = {**values, **read_fields(row.data, row.content_spans, content)}
+        documents.append({name: values[name] for name in names})
+    return documents
+
+
+def _encode_cursor(item_created_at: datetime, item_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) sort key."""
+    raw = f"{item_created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, item_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/api/items", response_model=ItemListResponse)
-async def list_items(
+def list_items(
     status: str | None = Query(None, description="Filter by status"),
+    content_type: str | None = Query(None, description="Filter by content type (tweet, article)"),
+    author: str | None = Query(None, description="Filter by the tweet author's handle"),
+    quoted_author: str | None = Query(None, description="Filter by the quoted tweet's author handle"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Ignored when cursor is given"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    include_content: bool = Query(True, description="Include full_content/thread_content"),
+    fields: str | None = Query(None, description="Comma-separated item fields to return (overrides include_content)"),
     db: Session = Depends(get_db)
 ):
-    """List saved items with optional status filter."""
-    query = select(SavedItem)
+    """
+    List saved items with optional filters, newest first.
+    Pass next_cursor back as cursor for keyset pagination on (created_at, id).
+    Handles match case-insensitively, without a leading @; the author
+    filters are indexed generated columns, so no rows are decoded to match.
+    With fields, items carry only those keys and only their columns are
+    read; e.g. fields=id,source_url,raw_preview,summary for a list view.
+    """
+    # Plain rows with the compressed content joined in; no ORM entities
+    # and no response model validation
+    names = _select_fields(
+        fields.split(",") if fields else None,
+        ITEM_FIELDS if include_content else LIST_FIELDS
+    )
+    query = _select_items(names)
 
+    filters = []
     if status:
-        query = query.where(SavedItem.status == status)
+        filters.append(SavedItem.status == status)
+    if content_type:
+        filters.append(SavedItem.content_type == content_type)
+    if author:
+        filters.append(SavedItem.author == author.lstrip("@").lower())
+    if quoted_author:
+        filters.append(SavedItem.quoted_author == quoted_author.lstrip("@").lower())
+    query = query.where(*filters)
+
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(SavedItem.created_at, SavedItem.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset(offset)
 
-    query = query.order_by(SavedItem.created_at.desc())
-    query = query.offset(offset).limit(limit)
+    query = query.order_by(SavedItem.created_at.desc(), SavedItem.id.desc()).limit(limit)
 
-    items = db.execute(query).scalars().all()
+    rows = db.execute(query).all()
+    items = _item_documents(rows, names)
+    if not fields and not include_content:
+        # Same item shape as before fields= existed: the content keys are null
+        for item in items:
+            item["full_content"] = item["thread_content"] = None
 
     # Get total count
-    count_query = select(SavedItem)
-    if status:
-        count_query = count_query.where(SavedItem.status == status)
-    total = len(db.execute(count_query).scalars().all())
+    count_query = select(func.count()).select_from(SavedItem).where(*filters)
+    total = db.execute(count_query).scalar_one()
 
-    return ItemListResponse(
-        items=[SavedItemResponse.model_validate(item) for item in items],
-        total=total
-    )
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return ORJSONResponse({
+        "items": items,
+        "total": total,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/api/items/{item_id}", response_model=SavedItemResponse)
-async def get_item(item_id: int, db: Session = Depends(get_db)):
+def get_item(
+    item_id: int,
+    fields: str | None = Query(None, description="Comma-separated item fields to return"),
+    db: Session = Depends(get_db)
+):
     """Get a single item by ID."""
-    item = db.execute(
-        select(SavedItem).where(SavedItem.id == item_id)
-    ).scalar_one_or_none()
+    names = _select_fields(fields.split(",") if fields else None, ITEM_FIELDS)
+    row = db.execute(_select_items(names).where(SavedItem.id == item_id)).first()
 
-    if not item:
+    if not row:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    return SavedItemResponse.model_validate(item)
+    return ORJSONResponse(_item_documents([row], names)[0])
 
 
 @router.get("/api/items/{item_id}/status", response_model=ProcessingStatusResponse)
-async def get_item_status(item_id: int, db: Session = Depends(get_db)):
+def get_item_status(item_id: int, db: Session = Depends(get_db)):
     """Get processing status for a single item."""
     item = db.execute(
         select(SavedItem).where(SavedItem.id == item_id)
@@ -215,70 +492,142 @@ async def get_item_status(item_id: int, db: Session = Depends(get_db)):
         item_id=item.id,
         summary_status=item.summary_status,
         embedding_status=item.embedding_status,
+        chunk_status=item.chunk_status,
         has_summary=item.summary is not None,
         processing_error=item.processing_error,
         processed_at=item.processed_at,
-        content_hash=item.content_hash
+        content_hash=item.content_hash,
+        tokens={
+            "prompt_tokens": item.prompt_tokens,
+            "completion_tokens": item.completion_tokens,
+            "embedding_tokens": item.embedding_tokens
+        }
     )
 
 
-@router.post("/api/items/{item_id}/reprocess")
-async def reprocess_item(
-    item_id: int,
-    background_tasks: BackgroundTasks,
-    force: bool = Query(False, description="Force reprocess even if content unchanged"),
-    db: Session = Depends(get_db)
-):
+def _queue_reprocess(db: Session, item_id: int, force: bool) -> str:
     """
-    Trigger reprocessing of a single item.
-    By default, uses smart reprocess (only if content changed).
-    Use force=true to regenerate regardless.
+    Write lane helper: queue an item, resetting it first on force.
+    Returns "queued", or "not_found" / "running" when nothing was queued.
     """
-    check_api_key_configured()
-
-    item = db.execute(
-        select(SavedItem).where(SavedItem.id == item_id)
-    ).scalar_one_or_none()
-
+    item = db.get(SavedItem, item_id)
     if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
+        return "not_found"
+    # The run in flight would write its statuses and hash over a reset
+    if is_job_running(db, item_id):
+        return "running"
 
     if force:
+        # Drop cached AI output so it is really regenerated
+        if item.content_hash:
+            content_cache.invalidate(db, item.content_hash)
         # Clear content hash to force reprocess
         item.content_hash = None
         item.summary_status = "pending"
         item.embedding_status = "pending"
+        item.chunk_status = "pending"
         item.processing_error = None
-        db.commit()
 
-    background_tasks.add_task(process_item, item_id)
+    enqueue_items(db, [item_id])
+    return "queued"
+
+
+@router.post("/api/items/{item_id}/reprocess")
+def reprocess_item(
+    item_id: int,
+    force: bool = Query(False, description="Force reprocess even if content unchanged")
+):
+    """
+    Trigger reprocessing of a single item.
+    By default, uses smart reprocess (only if content changed).
+    Use force=true to regenerate regardless.
+    """
+    check_api_key_configured()
+
+    outcome = write_lane.call(_queue_reprocess, item_id, force)
+    if outcome == "not_found":
+        raise HTTPException(status_code=404, detail="Item not found")
+    if outcome == "running":
+        raise HTTPException(status_code=409, detail="Item is being processed; retry once it finishes")
+    work_queue.notify()
 
     return {"message": f"Item {item_id} queued for reprocessing", "force": force}
 
 
 @router.get("/api/processing/stats", response_model=ProcessingStatsResponse)
-async def get_stats():
+def get_stats():
     """Get processing statistics."""
     stats = get_processing_stats()
     return ProcessingStatsResponse(**stats)
 
 
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Prometheus text format: request, processing stage and operation
+    latency histograms, retry/rate limit/cache/token counters, and item
+    and job queue gauges (read from SQLite on each scrape).
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    update_metric_gauges()
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @router.post("/api/processing/run-all", response_model=BulkProcessResponse)
-async def run_all_processing(background_tasks: BackgroundTasks):
+async def run_all_processing():
     """
     Bulk process all pending items.
-    Runs in background and returns immediately.
+    Queues them for the background workers and returns immediately.
     """
     check_api_key_configured()
 
-    background_tasks.add_task(process_all_pending)
+    result = await process_all_pending()
 
     return BulkProcessResponse(
-        queued_count=-1,  # Unknown until processing starts
-        message="Bulk processing started in background"
+        queued_count=result["queued"],
+        message=f"Queued {result['queued']} items for background processing"
     )
 
 
+def _build_search_results(
+    db: Session,
+    matches: list[dict],
+    mode: str,
+    result_model: type = SemanticSearchResult,
+    fields: list[str] | None = None
+) -> list[dict]:
+    """
+    Hydrate search matches from SQLite in one IN query, keeping their order.
+    Match keys named like result_model fields (similarity, score, snippet,
+    matched_chunk, ...) are copied onto each result. Full mode returns the
+    item fields selected by fields (all by default). Results are plain
+    dicts shaped like result_model, for ORJSONResponse.
+    """
+    item_ids = [match["neurolink_item_id"] for match in matches]
+    # Preview mode doesn't read the content blobs at all
+    names = PREVIEW_FIELDS if mode == "preview" else _select_fields(fields, ITEM_FIELDS)
+    rows = db.execute(_select_items(names).where(SavedItem.id.in_(item_ids))).all()
+    items = {row.id: (row, document) for row, document in zip(rows, _item_documents(rows, names))}
+    match_fields = [name for name in result_model.model_fields if name not in ("item", "is_processing")]
+
+    results = []
+    for match in matches:
+        row, document = items.get(match["neurolink_item_id"], (None, None))
+        if row is None:
+            continue
+
+        if mode == "preview":
+            document["content_preview"] = match.get("content_preview")
+
+        results.append({
+            "item": document,
+            **{name: match.get(name) for name in match_fields},
+            "is_processing": row.embedding_status != "completed"
+        })
+    return results
+
+
 @router.post("/api/search/semantic", response_model=SemanticSearchResponse)
 async def semantic_search(
     request: SemanticSearchRequest,
@@ -286,7 +635,8 @@ async def semantic_search(
 ):
     """
     Semantic search across embedded items.
-    Returns items sorted by similarity with optional filters.
+    Returns items sorted by similarity with optional filters. Long items
+    also match through their chunks (best chunk wins, see matched_chunk).
     Includes items still being processed with is_processing flag.
     """
     check_api_key_configured()
@@ -294,11 +644,12 @@ async def semantic_search(
     openai_service = get_openai_service()
     vector_service = get_vector_service()
 
-    # Generate query embedding
-    query_embedding = await openai_service.generate_query_embedding(request.query)
+    # Generate query embedding (repeated queries are served from the cache)
+    query_embedding = await query_embedding_cache.get_embedding(request.query, openai_service)
 
-    # Search in Supabase
-    matches = vector_service.search_similar(
+    # Vector search and hydration are blocking I/O; keep them off the event loop
+    matches = await run_in_threadpool(
+        vector_service.search_with_chunks,
         query_embedding=query_embedding,
         match_threshold=request.threshold,
         match_count=request.limit,
@@ -306,25 +657,92 @@ async def semantic_search(
         after=request.after,
         before=request.before
     )
+    results = await run_in_threadpool(_build_search_results, db, matches, request.mode, fields=request.fields)
 
-    # Fetch full items from SQLite
-    results = []
-    for match in matches:
-        item = db.execute(
-            select(SavedItem).where(SavedItem.id == match["neurolink_item_id"])
-        ).scalar_one_or_none()
-
-        if item:
-            results.append(SemanticSearchResult(
-                item=SavedItemResponse.model_validate(item),
-                similarity=match["similarity"],
-                is_processing=item.embedding_status != "completed"
-            ))
-
-    return SemanticSearchResponse(
-        results=results,
-        total=len(results)
+    return ORJSONResponse({
+        "results": results,
+        "total": len(results)
+    })
+
+
+@router.post("/api/search/keyword", response_model=KeywordSearchResponse)
+def search_keyword(
+    request: KeywordSearchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search with BM25 ranking over preview, content, thread and
+    summary (SQLite FTS5). Answers locally; no OpenAI or vector store call.
+    Exact handles and hashtags, "quoted phrases" and prefix* terms work.
+    """
+    matches = keyword_search(
+        db,
+        request.query,
+        limit=request.limit,
+        content_type=request.content_type,
+        after=request.after,
+        before=request.before
     )
+    results = _build_search_results(db, matches, request.mode, KeywordSearchResult, request.fields)
+    return ORJSONResponse({"results": results, "total": len(results)})
+
+
+@router.post("/api/search/hybrid", response_model=HybridSearchResponse)
+async def search_hybrid(
+    request: SemanticSearchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Keyword and semantic search fused with reciprocal rank fusion.
+    The keyword search runs while the query embedding is fetched; each
+    ranking contributes up to HYBRID_CANDIDATES items before fusion.
+    """
+    check_api_key_configured()
+
+    openai_service = get_openai_service()
+    vector_service = get_vector_service()
+    candidates = max(request.limit, settings.HYBRID_CANDIDATES)
+    filters = {"content_type": request.content_type, "after": request.after, "before": request.before}
+
+    query_embedding, keyword_matches = await asyncio.gather(
+        query_embedding_cache.get_embedding(request.query, openai_service),
+        run_in_threadpool(keyword_search, db, request.query, limit=candidates, **filters)
+    )
+    vector_matches = await run_in_threadpool(
+        vector_service.search_with_chunks,
+        query_embedding=query_embedding,
+        match_threshold=request.threshold,
+        match_count=candidates,
+        **filters
+    )
+
+    by_vector = {match["neurolink_item_id"]: match for match in vector_matches}
+    by_keyword = {match["neurolink_item_id"]: match for match in keyword_matches}
+    fused = reciprocal_rank_fusion([list(by_vector), list(by_keyword)])[:request.limit]
+
+    matches = []
+    for item_id, score in fused:
+        vector_match = by_vector.get(item_id, {})
+        keyword_match = by_keyword.get(item_id, {})
+        matches.append({
+            "neurolink_item_id": item_id,
+            "score": score,
+            "similarity": vector_match.get("similarity"),
+            "content_preview": vector_match.get("content_preview"),
+            "matched_chunk": vector_match.get("matched_chunk"),
+            "keyword_score": keyword_match.get("score"),
+            "snippet": keyword_match.get("snippet")
+        })
+    results = await run_in_threadpool(
+        _build_search_results, db, matches, request.mode, HybridSearchResult, request.fields
+    )
+    return ORJSONResponse({"results": results, "total": len(results)})
+
+
+@router.get("/api/search/stats", response_model=QueryCacheStatsResponse)
+async def get_search_stats():
+    """Query embedding cache hit/miss counters and latency statistics."""
+    return QueryCacheStatsResponse(**query_embedding_cache.stats())
 
 
 # =============================================================================
@@ -332,79 +750,52 @@ async def semantic_search(
 # =============================================================================
 
 @router.post("/api/debug")
-async def save_debug_snapshot(snapshot: dict):
+def save_debug_snapshot(snapshot: dict):
     """
     Save a debug snapshot from the extension.
     Returns the snapshot ID for later retrieval.
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    snapshot_id = f"debug_{timestamp}"
-    filepath = DEBUG_DIR / f"{snapshot_id}.json"
-
-    # Add server-side metadata
-    snapshot["_server_received"] = datetime.now().isoformat()
-    snapshot["_id"] = snapshot_id
-
-    with open(filepath, "w") as f:
-        json.dump(snapshot, f, indent=2)
-
-    # Also save as "latest" for easy access
-    latest_path = DEBUG_DIR / "latest.json"
-    with open(latest_path, "w") as f:
-        json.dump(snapshot, f, indent=2)
-
+    entry = debug_store.save(snapshot)
     return {
         "success": True,
-        "id": snapshot_id,
-        "path": str(filepath)
+        "id": entry.id,
+        "path": str(debug_store.directory / entry.filename)
     }
 
 
 @router.get("/api/debug/latest")
-async def get_latest_debug_snapshot():
+def get_latest_debug_snapshot():
     """
     Get the most recent debug snapshot.
     Used by AI agents to analyze extension behavior.
     """
-    latest_path = DEBUG_DIR / "latest.json"
-
-    if not latest_path.exists():
+    payload = debug_store.read_latest()
+    if payload is None:
         raise HTTPException(status_code=404, detail="No debug snapshots found")
-
-    with open(latest_path, "r") as f:
-        snapshot = json.load(f)
-
-    return snapshot
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get("/api/debug/list")
-async def list_debug_snapshots(limit: int = Query(10, ge=1, le=100)):
-    """List available debug snapshots."""
-    snapshots = []
-
-    for filepath in sorted(DEBUG_DIR.glob("debug_*.json"), reverse=True)[:limit]:
-        with open(filepath, "r") as f:
-            data = json.load(f)
-            snapshots.append({
-                "id": data.get("_id", filepath.stem),
-                "timestamp": data.get("timestamp"),
-                "totalArticles": data.get("totalArticlesFound", 0),
-                "captured": data.get("summary", {}).get("captured", 0),
-                "skipped": data.get("summary", {}).get("skipped", 0)
-            })
-
-    return {"snapshots": snapshots}
+def list_debug_snapshots(limit: int = Query(10, ge=1, le=100)):
+    """List available debug snapshots (from the index; payloads are not read)."""
+    return {"snapshots": [
+        {
+            "id": entry.id,
+            "timestamp": entry.client_timestamp,
+            "totalArticles": entry.total_articles,
+            "captured": entry.captured,
+            "skipped": entry.skipped,
+            "rawBytes": entry.raw_bytes,
+            "storedBytes": entry.stored_bytes
+        }
+        for entry in debug_store.list(limit)
+    ]}
 
 
 @router.get("/api/debug/{snapshot_id}")
-async def get_debug_snapshot(snapshot_id: str):
+def get_debug_snapshot(snapshot_id: str):
     """Get a specific debug snapshot by ID."""
-    filepath = DEBUG_DIR / f"{snapshot_id}.json"
-
-    if not filepath.exists():
+    payload = debug_store.read(snapshot_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found")
-
-    with open(filepath, "r") as f:
-        snapshot = json.load(f)
-
-    return snapshot
+    return Response(content=payload, media_type="application/json")
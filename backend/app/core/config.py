@@ -10,19 +10,94 @@ class Settings(BaseSettings):
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     OPENAI_SUMMARY_MODEL: str = "gpt-4o-mini"
 
+    # Vector store: "supabase" (pgvector) or "local" (in-process NumPy index)
+    VECTOR_BACKEND: str = "supabase"
+
     # Supabase settings
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_KEY: str = ""
 
     # Processing settings
     AI_PROCESSING_ENABLED: bool = True
-    MAX_CONTENT_LENGTH: int = 8000
+    MAX_CONTENT_TOKENS: int = 2000  # Summary/embedding input cap, counted with the model tokenizer
     EMBEDDING_DIMENSION: int = 1536
-    RATE_LIMIT_DELAY: float = 0.5
+    EMBEDDING_BATCH_SIZE: int = 256
+    EMBEDDING_BATCH_MAX_TOKENS: int = 250000
+    EMBEDDING_BATCH_WAIT_MS: int = 50
+    VECTOR_UPSERT_BATCH_SIZE: int = 500  # Rows per vector store upsert request
+    VECTOR_UPSERT_BATCH_WAIT_MS: int = 50
+    CONTENT_CACHE_MAX_ENTRIES: int = 50000
+
+    # Chunked embeddings for long threads/articles (searched alongside item vectors)
+    CHUNKING_ENABLED: bool = True
+    CHUNK_MAX_TOKENS: int = 512
+    CHUNK_OVERLAP_TOKENS: int = 64
+    CHUNK_MAX_PER_ITEM: int = 64
+
+    # Keyword (FTS5) and hybrid search
+    SEARCH_RRF_K: int = 60  # Reciprocal rank fusion constant
+    HYBRID_CANDIDATES: int = 50  # Results taken from each ranking before fusion
+
+    # Search query embedding cache
+    QUERY_CACHE_MAX_ENTRIES: int = 1000
+    QUERY_CACHE_TTL_SECONDS: int = 86400
+    QUERY_CACHE_PERSIST: bool = True
+
+    # OpenAI rate limits (per model); budgets are corrected from response headers
+    OPENAI_SUMMARY_RPM: int = 500
+    OPENAI_SUMMARY_TPM: int = 200000
+    OPENAI_EMBEDDING_RPM: int = 3000
+    OPENAI_EMBEDDING_TPM: int = 1000000
+
+    # Processing queue settings
+    QUEUE_WORKERS: int = 4
+    QUEUE_JOBS_PER_WORKER: int = 16  # Items each worker processes at once
+    QUEUE_LEASE_SECONDS: int = 300
+    QUEUE_MAX_ATTEMPTS: int = 3
+    QUEUE_RETRY_BACKOFF: float = 30.0
+    QUEUE_POLL_INTERVAL: float = 2.0
+
+    # Streaming ingest (/api/ingest/stream)
+    INGEST_STREAM_BATCH_SIZE: int = 500  # Lines validated and committed per batch
+    INGEST_STREAM_MAX_LINE_BYTES: int = 1048576
+
+    # Shared HTTP clients (OpenAI + Supabase)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+
+    # SQLite tuning (applied to every pooled connection)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL; FULL fsyncs every commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 20
+    WRITE_BATCH_SIZE: int = 200  # Max queued writes committed per transaction
+
+    # Prometheus metrics (/metrics) and the slow-request log
+    METRICS_ENABLED: bool = True
+    SLOW_REQUEST_THRESHOLD_MS: int = 0  # Log slower requests with a per-span breakdown; 0 disables
+
+    # HTTP response compression: brotli (needs brotli) if accepted, else gzip
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024  # Smaller bodies are sent as is
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4
+
+    # Extension debug snapshots (/api/debug)
+    DEBUG_SNAPSHOT_CODEC: str = "zstd"  # zstd (needs zstandard) or gzip
+    DEBUG_SNAPSHOT_MAX_COUNT: int = 200
+    DEBUG_SNAPSHOT_MAX_AGE_DAYS: int = 14
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+        # Older .env files still set retired keys (RATE_LIMIT_DELAY, MAX_CONTENT_LENGTH)
+        extra = "ignore"
 
 
 settings = Settings()
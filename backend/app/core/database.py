@@ -1,5 +1,6 @@
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from app.core.config import settings
@@ -12,10 +13,37 @@ data_dir.mkdir(exist_ok=True)
 db_path = data_dir / "neurolink.db"
 database_url = f"sqlite:///{db_path}"
 
-engine = create_engine(
-    database_url,
-    connect_args={"check_same_thread": False}  # Required for SQLite
-)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection (WAL lets reads run during writes)."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_sqlite_engine(url: str, tuned: bool = True) -> Engine:
+    """
+    Create a SQLite engine with a connection pool.
+    With tuned=True, WAL mode and the SQLITE_* pragmas are applied on connect.
+    """
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Required for SQLite
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_pre_ping=True
+    )
+    if tuned:
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+engine = create_sqlite_engine(database_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,220 @@
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Latency buckets in seconds: from cache lookups up to retried OpenAI calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class _Metric(ABC):
+    """One metric family: a value per label set, guarded by a lock."""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self):
+        """(suffix, labels, value) for every sample of the family."""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic total per label set."""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    """Current value per label set, set when it is known (e.g. at scrape time)."""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Observations in cumulative buckets, plus their sum and count, per label set."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def means(self) -> dict[tuple[str, ...], float]:
+        """Mean observation per label set."""
+        with self._lock:
+            return {key: total / sum(counts) for key, (counts, total) in self._values.items()}
+
+    def _samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """The process's metric families, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "neurolink_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+PROCESSING_STAGE_SECONDS = metrics.histogram(
+    "neurolink_processing_stage_duration_seconds", "Time per process_item stage (total = whole item)", ("stage",)
+)
+OPERATION_SECONDS = metrics.histogram(
+    "neurolink_operation_duration_seconds", "Time per external call or SQLite write operation", ("operation",)
+)
+RETRIES = metrics.counter("neurolink_retries_total", "Calls retried after a transient error", ("operation",))
+RETRY_SLEEP_SECONDS = metrics.counter(
+    "neurolink_retry_sleep_seconds_total", "Backoff slept before retries", ("operation",)
+)
+RATE_LIMIT_HITS = metrics.counter("neurolink_rate_limit_hits_total", "429 responses from OpenAI", ("model",))
+RATE_LIMIT_WAIT_SECONDS = metrics.counter(
+    "neurolink_rate_limit_wait_seconds_total", "Time callers waited for rate limit budget", ("model",)
+)
+CACHE_REQUESTS = metrics.counter("neurolink_cache_requests_total", "Cache lookups by result", ("cache", "result"))
+OPENAI_TOKENS = metrics.counter("neurolink_openai_tokens_total", "OpenAI tokens billed", ("kind",))
+ITEMS = metrics.gauge("neurolink_items", "Saved items by processing status", ("kind", "status"))
+QUEUE_JOBS = metrics.gauge("neurolink_work_queue_jobs", "Processing jobs by state", ("state",))
+
+
+# Seconds per operation of the current HTTP request (see trace_request)
+_request_trace: ContextVar[dict[str, float] | None] = ContextVar("request_trace", default=None)
+
+
+@contextmanager
+def trace_request():
+    """
+    Collect the time of every span in this context into a dict (operation
+    -> seconds) for the slow-request log. Worker threads started with
+    run_in_threadpool / asyncio.to_thread copy the context and add to it.
+    """
+    trace: dict[str, float] = {}
+    token = _request_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _request_trace.reset(token)
+
+
+def add_to_trace(operation: str, seconds: float) -> None:
+    """Charge time to the current request's trace, if any."""
+    trace = _request_trace.get()
+    if trace is not None:
+        trace[operation] = trace.get(operation, 0.0) + seconds
+
+
+def record_operation(operation: str, seconds: float) -> None:
+    OPERATION_SECONDS.observe(seconds, operation=operation)
+    add_to_trace(operation, seconds)
+
+
+@contextmanager
+def span(operation: str):
+    """Time a block into OPERATION_SECONDS and the current request's trace."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_operation(operation, time.perf_counter() - started)
+
+
+def record_retry(operation: str):
+    """tenacity before_sleep hook: count the retry and the backoff about to be slept."""
+    def before_sleep(retry_state) -> None:
+        sleep = retry_state.next_action.sleep if retry_state.next_action else 0.0
+        RETRIES.inc(operation=operation)
+        RETRY_SLEEP_SECONDS.inc(sleep, operation=operation)
+        add_to_trace("retry_sleep", sleep)
+    return before_sleep
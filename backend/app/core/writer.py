@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.metrics import span
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteLane:
+    """
+    Single serialized writer for SQLite.
+
+    Write functions `fn(db, *args)` are queued to one dedicated thread,
+    which drains whatever is pending (up to WRITE_BATCH_SIZE) and runs it
+    in a single transaction, so concurrent workers share one commit/fsync
+    instead of fighting for the write lock. If any function in a batch
+    fails, the batch is rolled back and each function is retried in its
+    own transaction so only the failing caller sees the error.
+
+    A write function can therefore run twice. Its database changes are
+    rolled back in between, but nothing else is: work outside the session
+    must be safe to repeat (files, network calls) or merely approximate
+    (in-process hit counters may count such a write twice).
+    """
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal, batch_size: int | None = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.WRITE_BATCH_SIZE
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.transactions = 0
+        self.writes = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a write; the future resolves after its transaction commits."""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Queue a write and block until it is committed."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("WriteLane.call() from inside a write function would deadlock")
+        with span("write_lane"):
+            return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Queue a write and await its commit without blocking the event loop."""
+        with span("write_lane"):
+            return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stop(self, timeout: float | None = 10) -> None:
+        """Finish queued writes and stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: list) -> None:
+        batch = [entry for entry in batch if entry[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        with self.session_factory() as db:
+            try:
+                results = [fn(db, *args, **kwargs) for fn, args, kwargs, _ in batch]
+                with span("sqlite_commit"):
+                    db.commit()
+            except Exception:
+                db.rollback()
+                results = None
+
+        if results is not None:
+            self.transactions += 1
+            self.writes += len(batch)
+            for (_, _, _, future), result in zip(batch, results):
+                future.set_result(result)
+            return
+
+        # Isolate the failing write(s)
+        for fn, args, kwargs, future in batch:
+            with self.session_factory() as db:
+                try:
+                    result = fn(db, *args, **kwargs)
+                    with span("sqlite_commit"):
+                        db.commit()
+                except Exception as e:
+                    db.rollback()
+                    future.set_exception(e)
+                    continue
+            self.transactions += 1
+            self.writes += 1
+            future.set_result(result)
+
+
+# Application-wide writer for background work (processing, queue, caches)
+write_lane = WriteLane()
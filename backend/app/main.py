@@ -1,16 +1,57 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.database import engine, Base
+from app.core.config import settings
+from app.core.writer import write_lane
+from app.api.compression import CompressionMiddleware
+from app.api.instrumentation import MetricsMiddleware
 from app.api.routes import router
+from app.services.clients import app_clients
+from app.services.debug_store import debug_store
+from app.services.migrations import migrate_database
+from app.services.processor import process_item
+from app.services.search_index import create_search_index
+from app.services.tokens import preload_tokenizers
+from app.services.work_queue import work_queue
 
-# Create database tables
+logging.basicConfig(format="%(levelname)s:     %(name)s - %(message)s")
+logging.getLogger("app").setLevel(logging.INFO)
+
+# Create database tables, then upgrade tables from older versions
 Base.metadata.create_all(bind=engine)
+migrate_database(engine)
+create_search_index(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared HTTP clients: one keep-alive pool each for OpenAI and Supabase
+    app_clients.open()
+    # Tokenizer files may be downloaded on first load; do it before serving
+    await asyncio.to_thread(
+        preload_tokenizers, settings.OPENAI_SUMMARY_MODEL, settings.OPENAI_EMBEDDING_MODEL
+    )
+    # Bring pre-store .json debug snapshots under listing and retention
+    await asyncio.to_thread(debug_store.index_legacy)
+    # Start the processing workers; interrupted jobs are resumed on start
+    if settings.AI_PROCESSING_ENABLED and settings.OPENAI_API_KEY:
+        await work_queue.start(process_item)
+    yield
+    await work_queue.stop()
+    # Flush pending writes before exit
+    write_lane.stop()
+    await app_clients.close()
+
 
 app = FastAPI(
     title="NeuroLink",
     description="Personal Knowledge Management System",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for extension
@@ -22,5 +63,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses for clients that accept it
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY
+    )
+
+# Outermost, so request timings include compression
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, slow_request_ms=settings.SLOW_REQUEST_THRESHOLD_MS)
+
 # Include routes
 app.include_router(router)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import String, Text, LargeBinary, DateTime, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class AICacheEntry(Base):
+    """Cached AI output for a piece of content, keyed by (kind, content_hash, model)."""
+    __tablename__ = "ai_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(20))  # "summary" or "embedding"
+    content_hash: Mapped[str] = mapped_column(String(64))
+    model: Mapped[str] = mapped_column(String(50))
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    embedding: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # float32
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("kind", "content_hash", "model", name="uq_ai_cache_key"),
+        Index("ix_ai_cache_last_used_at", "last_used_at"),
+    )
@@ -0,0 +1,64 @@
+import zlib
+from datetime import datetime
+from functools import cached_property
+from sqlalchemy import String, LargeBinary, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+# One-byte codec tag in front of every stored payload
+RAW_TAG = b"t"
+ZLIB_TAG = b"z"
+
+# Shorter text is stored as is; zlib doesn't pay off on it
+COMPRESS_MIN_BYTES = 128
+ZLIB_LEVEL = 6
+
+
+def encode_text(text: str) -> bytes:
+    """Tagged payload for text: zlib-compressed unless short or incompressible."""
+    raw = text.encode()
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(raw, ZLIB_LEVEL)
+        if len(compressed) < len(raw):
+            return ZLIB_TAG + compressed
+    return RAW_TAG + raw
+
+
+def decode_text(data: bytes, max_chars: int | None = None) -> str:
+    """
+    Text of a tagged payload. With max_chars, only enough is decompressed
+    to cover that many characters (the result may be longer).
+    """
+    tag, payload = data[:1], data[1:]
+    if max_chars is None:
+        if tag == ZLIB_TAG:
+            payload = zlib.decompress(payload)
+        return payload.decode()
+
+    # A character is at most 4 bytes; a character cut at the limit is dropped
+    max_bytes = max_chars * 4
+    if tag == ZLIB_TAG:
+        payload = zlib.decompressobj().decompress(payload, max_bytes)
+    return payload[:max_bytes].decode(errors="ignore")
+
+
+class ContentBlob(Base):
+    """
+    Item text stored once per distinct value, keyed by its SHA-256. The
+    text is the packed layout of all content fields (see pack_content), so
+    the key is not the processor's content_hash, which hashes only the best
+    field; the two differ whenever a field is appended. Items point at a
+    blob and keep spans into it for their overlapping fields.
+    """
+    __tablename__ = "content_blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    @cached_property
+    def text(self) -> str:
+        """Decompressed on first access; blobs never change."""
+        return decode_text(self.data)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DebugSnapshot(Base):
+    """
+    Index entry of an extension debug snapshot.
+    The compressed payload lives in data/debug_snapshots/<filename>;
+    listing only reads these rows.
+    """
+    __tablename__ = "debug_snapshots"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)  # debug_YYYYmmdd_HHMMSS_ffffff
+    filename: Mapped[str] = mapped_column(String(128))
+    client_timestamp: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    total_articles: Mapped[int] = mapped_column(Integer, default=0)
+    captured: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
+    raw_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    stored_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, BigInteger, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class IngestSession(Base):
+    """
+    One sync run of a collection (e.g. Twitter bookmarks).
+    The newest status ID seen becomes the collection's high-water mark
+    once the session is completed.
+    """
+    __tablename__ = "ingest_sessions"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    platform: Mapped[str] = mapped_column(String(50))
+    collection: Mapped[str] = mapped_column(String(50))
+    status: Mapped[str] = mapped_column(String(20), default="open")  # open, completed
+    item_count: Mapped[int] = mapped_column(Integer, default=0)
+    newest_status_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    newest_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_ingest_sessions_mark", "platform", "collection", "status", "newest_status_id"),
+    )
+
+
+class IngestKey(Base):
+    """Client idempotency key of an ingested item; replays with the same key are no-ops."""
+    __tablename__ = "ingest_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    item_id: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
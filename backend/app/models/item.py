@@ -1,26 +1,53 @@
 from datetime import datetime
 import json
-from sqlalchemy import String, Text, Integer, BigInteger, DateTime, Index
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Text, Integer, BigInteger, DateTime, Index, Computed
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import TypeDecorator
 
 from app.core.database import Base
+from app.models.content import ContentBlob
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is slower but stores the same text
+    orjson = None
+
+
+# Text fields kept in the item's content blob, widest first: the thread
+# contains the tweet, which contains the preview
+CONTENT_FIELDS = ("thread_content", "full_content", "raw_preview")
+
+
+# Handle from https://<host>/<handle>/status/<id>, for the author column
+_URL_PATH = "substr(source_url, instr(source_url, '://') + 3)"
+AUTHOR_EXPRESSION = (
+    f"CASE WHEN instr({_URL_PATH}, '/status/') > 0 THEN lower(substr({_URL_PATH}, "
+    f"instr({_URL_PATH}, '/') + 1, instr({_URL_PATH}, '/status/') - instr({_URL_PATH}, '/') - 1)) END"
+)
 
 
 class JSONType(TypeDecorator):
-    """SQLite-compatible JSON type."""
+    """
+    SQLite-compatible JSON type, stored as compact JSON text so JSON1
+    functions (json_extract) can read it. Encoded with orjson when
+    installed.
+    """
     impl = Text
     cache_ok = True
 
     def process_bind_param(self, value, dialect):
-        if value is not None:
-            return json.dumps(value)
-        return None
+        if value is None:
+            return None
+        if orjson is not None:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(value, separators=(",", ":"))
 
     def process_result_value(self, value, dialect):
-        if value is not None:
-            return json.loads(value)
-        return None
+        if value is None:
+            return None
+        if orjson is not None:
+            return orjson.loads(value)
+        return json.loads(value)
 
 
 class SavedItem(Base):
@@ -30,10 +57,26 @@ class SavedItem(Base):
     source_url: Mapped[str] = mapped_column(String(2048), unique=True, index=True)
     source_platform: Mapped[str] = mapped_column(String(50), default="twitter")
     content_type: Mapped[str | None] = mapped_column(String(50), nullable=True, default="tweet")
-    raw_preview: Mapped[str | None] = mapped_column(Text, nullable=True)
-    full_content: Mapped[str | None] = mapped_column(Text, nullable=True)
-    thread_content: Mapped[str | None] = mapped_column(Text, nullable=True)
-    extra_data: Mapped[dict | None] = mapped_column(JSONType, nullable=True)
+    # Text lives in content_blobs; each field is a [start, end] span of it
+    content_ref: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    content_spans: Mapped[dict | None] = mapped_column(JSONType, nullable=True)
+    # Deferred: ORM loads decode it only when the attribute is read
+    extra_data: Mapped[dict | None] = mapped_column(JSONType, nullable=True, deferred=True)
+    # Hot keys as virtual generated columns, computed by SQLite (JSON1) on
+    # read; the filterable ones are indexed below
+    article_title: Mapped[str | None] = mapped_column(
+        Text, Computed("json_extract(extra_data, '$.article_title')", persisted=False), nullable=True
+    )
+    article_description: Mapped[str | None] = mapped_column(
+        Text, Computed("json_extract(extra_data, '$.article_description')", persisted=False), nullable=True
+    )
+    quoted_author: Mapped[str | None] = mapped_column(
+        String(50), Computed("lower(json_extract(extra_data, '$.quoted_author'))", persisted=False), nullable=True
+    )
+    # Not in extra_data: the tweet author's handle, from source_url
+    author: Mapped[str | None] = mapped_column(
+        String(50), Computed(AUTHOR_EXPRESSION, persisted=False), nullable=True
+    )
     status: Mapped[str] = mapped_column(String(20), default="pending")
     fetch_attempts: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(
@@ -52,9 +95,47 @@ class SavedItem(Base):
     processing_error: Mapped[str | None] = mapped_column(Text, nullable=True)
     processed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    chunk_count: Mapped[int] = mapped_column(Integer, default=0)  # Chunk vectors stored for the item
+    # Chunk vectors are tracked apart from the item vector (embedding_status)
+    chunk_status: Mapped[str] = mapped_column(String(20), default="pending")
+    # OpenAI tokens billed for this item, summed over all processing runs
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    embedding_tokens: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Loaded on first read of a content field
+    content_blob: Mapped[ContentBlob | None] = relationship(
+        primaryjoin="foreign(SavedItem.content_ref) == ContentBlob.content_hash",
+        viewonly=True
+    )
 
     __table_args__ = (
         Index("ix_saved_items_status", "status"),
-        Index("ix_saved_items_summary_status", "summary_status"),
         Index("ix_saved_items_embedding_status", "embedding_status"),
+        # Covers the GROUP BY in processing stats and summary_status filters
+        Index("ix_saved_items_processing_status", "summary_status", "embedding_status"),
+        # Keyset pagination on (created_at, id)
+        Index("ix_saved_items_created_at_id", "created_at", "id"),
+        # List filters, each paging by (created_at, id) within its value
+        Index("ix_saved_items_author_created_at_id", "author", "created_at", "id"),
+        Index("ix_saved_items_quoted_author_created_at_id", "quoted_author", "created_at", "id"),
+        Index("ix_saved_items_content_type_created_at_id", "content_type", "created_at", "id"),
     )
+
+    def _content_field(self, name: str) -> str | None:
+        span = self.content_spans.get(name) if self.content_spans else None
+        if span is None or self.content_blob is None:
+            return None
+        return self.content_blob.text[span[0]:span[1]]
+
+    @property
+    def raw_preview(self) -> str | None:
+        return self._content_field("raw_preview")
+
+    @property
+    def full_content(self) -> str | None:
+        return self._content_field("full_content")
+
+    @property
+    def thread_content(self) -> str | None:
+        return self._content_field("thread_content")
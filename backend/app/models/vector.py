@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, BigInteger, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class LocalEmbedding(Base):
+    """
+    Metadata for a vector in the local vector store.
+    The vector itself lives at row `slot` of the memory-mapped matrix.
+    Mirrors the Supabase item_embeddings table.
+    """
+    __tablename__ = "local_embeddings"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    slot: Mapped[int] = mapped_column(Integer, unique=True)
+    neurolink_item_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
+    source_url: Mapped[str] = mapped_column(String(2048))
+    content_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    content_preview: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class LocalChunkEmbedding(Base):
+    """
+    Metadata for one chunk vector of a long item in the local vector store.
+    The vector lives at row `slot` of the chunk matrix; offsets are
+    character positions in the item's content.
+    Mirrors the Supabase item_chunk_embeddings table.
+    """
+    __tablename__ = "local_chunk_embeddings"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    slot: Mapped[int] = mapped_column(Integer, unique=True)
+    neurolink_item_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    chunk_index: Mapped[int] = mapped_column(Integer)
+    start_offset: Mapped[int] = mapped_column(Integer)
+    end_offset: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("neurolink_item_id", "chunk_index"),
+    )
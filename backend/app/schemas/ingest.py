@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 
 class IngestItem(BaseModel):
@@ -9,12 +9,15 @@ class IngestItem(BaseModel):
     full_content: str | None = None
     thread_content: str | None = None
     extra_data: dict[str, Any] | None = None
+    # Client-chosen key; resending an item with the same key is a no-op
+    idempotency_key: str | None = Field(None, max_length=255)
 
 
 class IngestPayload(BaseModel):
     items: list[IngestItem]
     platform: str = "twitter"
     skip_duplicates: bool = False
+    session_id: int | None = None
 
 
 class IngestResponse(BaseModel):
@@ -25,6 +28,69 @@ class IngestResponse(BaseModel):
     message: str
 
 
+class IngestSessionCreate(BaseModel):
+    platform: str = "twitter"
+    collection: str = "bookmarks"
+
+
+class HighWaterMark(BaseModel):
+    # String: 64-bit status IDs don't survive JavaScript numbers
+    status_id: str
+    url: str | None
+    session_id: int
+    completed_at: datetime | None
+
+
+class IngestSessionResponse(BaseModel):
+    id: int
+    platform: str
+    collection: str
+    status: str
+    item_count: int
+    newest_status_id: str | None
+    newest_url: str | None
+    created_at: datetime
+    completed_at: datetime | None
+    # Mark from previous completed sessions. Only a hint for where to stop
+    # scrolling; /api/items/probe decides which items still need sending
+    high_water_mark: HighWaterMark | None = None
+
+
+class HighWaterMarkResponse(BaseModel):
+    platform: str
+    collection: str
+    high_water_mark: HighWaterMark | None
+
+
+# Max URLs per /api/items/probe request
+PROBE_MAX_URLS = 10000
+
+
+class UrlProbeRequest(BaseModel):
+    urls: list[str] = Field(max_length=PROBE_MAX_URLS)
+
+
+class UrlProbeResponse(BaseModel):
+    existing: dict[str, int]  # source_url -> item id
+    missing: list[str]
+
+
+class IngestLineError(BaseModel):
+    line: int
+    error: str
+
+
+class IngestBatchResult(BaseModel):
+    """One NDJSON line streamed back by /api/ingest/stream per committed batch."""
+    batch: int
+    received: int
+    new_count: int
+    duplicate_count: int
+    failed_count: int
+    errors: list[IngestLineError] = []
+    error: str | None = None  # Set when the whole batch could not be stored
+
+
 class SavedItemResponse(BaseModel):
     id: int
     source_url: str
@@ -47,6 +113,11 @@ class SavedItemResponse(BaseModel):
     processing_error: str | None = None
     processed_at: datetime | None = None
     content_hash: str | None = None
+    chunk_count: int = 0
+    chunk_status: str = "pending"
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    embedding_tokens: int = 0
 
     class Config:
         from_attributes = True
@@ -55,16 +126,19 @@ class SavedItemResponse(BaseModel):
 class ItemListResponse(BaseModel):
     items: list[SavedItemResponse]
     total: int
+    next_cursor: str | None = None
 
 
 class ProcessingStatusResponse(BaseModel):
     item_id: int
     summary_status: str
     embedding_status: str
+    chunk_status: str
     has_summary: bool
     processing_error: str | None
     processed_at: datetime | None
     content_hash: str | None
+    tokens: dict[str, int] | None = None
 
 
 class SemanticSearchRequest(BaseModel):
@@ -74,12 +148,37 @@ class SemanticSearchRequest(BaseModel):
     content_type: str | None = None
     after: datetime | None = None
     before: datetime | None = None
+    # "preview" skips full_content/thread_content and returns the
+    # vector store's content_preview plus the summary instead
+    mode: Literal["full", "preview"] = "full"
+    # Full mode only: item fields to return (default all)
+    fields: list[str] | None = None
+
+
+class SearchItemPreview(BaseModel):
+    id: int
+    source_url: str
+    source_platform: str
+    content_type: str | None
+    content_preview: str | None
+    summary: str | None = None
+    summary_status: str = "pending"
+    embedding_status: str = "pending"
+    created_at: datetime
+
+
+class ChunkMatch(BaseModel):
+    """The chunk that won an item's max-sim score; offsets index its content."""
+    chunk_index: int
+    start_offset: int
+    end_offset: int
 
 
 class SemanticSearchResult(BaseModel):
-    item: SavedItemResponse
+    item: SavedItemResponse | SearchItemPreview
     similarity: float
     is_processing: bool
+    matched_chunk: ChunkMatch | None = None
 
 
 class SemanticSearchResponse(BaseModel):
@@ -87,6 +186,54 @@ class SemanticSearchResponse(BaseModel):
     total: int
 
 
+class KeywordSearchRequest(BaseModel):
+    query: str
+    limit: int = Field(10, ge=1, le=100)
+    content_type: str | None = None
+    after: datetime | None = None
+    before: datetime | None = None
+    mode: Literal["full", "preview"] = "full"
+    fields: list[str] | None = None
+
+
+class KeywordSearchResult(BaseModel):
+    item: SavedItemResponse | SearchItemPreview
+    score: float  # BM25; lower is better
+    snippet: str | None = None  # Matched terms wrapped in <mark></mark>
+    is_processing: bool
+
+
+class KeywordSearchResponse(BaseModel):
+    results: list[KeywordSearchResult]
+    total: int
+
+
+class HybridSearchResult(BaseModel):
+    item: SavedItemResponse | SearchItemPreview
+    score: float  # Reciprocal rank fusion score; higher is better
+    similarity: float | None = None  # Set when the vector ranking found the item
+    keyword_score: float | None = None  # Set when the keyword ranking found the item
+    snippet: str | None = None
+    matched_chunk: ChunkMatch | None = None
+    is_processing: bool
+
+
+class HybridSearchResponse(BaseModel):
+    results: list[HybridSearchResult]
+    total: int
+
+
+class QueryCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    entries: int
+    max_entries: int
+    ttl_seconds: int
+    persist: bool
+    hit_latency: dict[str, float]
+    miss_latency: dict[str, float]
+
+
 class BulkProcessResponse(BaseModel):
     queued_count: int
     message: str
@@ -96,3 +243,9 @@ class ProcessingStatsResponse(BaseModel):
     total_items: int
     summary: dict[str, int]
     embedding: dict[str, int]
+    progress: dict[str, int | float | None] | None = None
+    queue: dict[str, int] | None = None
+    stage_latency_ms: dict[str, float] | None = None
+    cache: dict[str, int] | None = None
+    connections: dict[str, dict[str, int | float]] | None = None
+    tokens: dict[str, dict[str, int | float | None]] | None = None
@@ -2,6 +2,7 @@
 from app.services.openai_service import OpenAIService, get_openai_service
 from app.services.vector_service import VectorService, get_vector_service
 from app.services.processor import process_item, process_all_pending, get_processing_stats
+from app.services.ingest import bulk_ingest
 
 __all__ = [
     "OpenAIService",
@@ -11,4 +12,5 @@ __all__ = [
     "process_item",
     "process_all_pending",
     "get_processing_stats",
+    "bulk_ingest",
 ]
@@ -0,0 +1,75 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.services.tokens import Tokenizer, get_tokenizer
+
+
+# Boundaries tried, best first, when choosing where a window ends
+BREAKS = ("\n\n", "\n", ". ", "? ", "! ", " ")
+
+
+@dataclass
+class Chunk:
+    """A window of an item's content; start/end are character offsets into it."""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def _find_break(text: str, start: int, end: int) -> int:
+    """
+    Offset to end a window at: just after the best boundary in the window's
+    last quarter, or `end` when there is none (one very long word).
+    """
+    floor = start + (end - start) * 3 // 4
+    for separator in BREAKS:
+        position = text.rfind(separator, floor, end)
+        if position != -1:
+            return position + len(separator)
+    return end
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int | None = None,
+    overlap_tokens: int | None = None,
+    max_chunks: int | None = None,
+    tokenizer: Tokenizer | None = None
+) -> list[Chunk]:
+    """
+    Split text into overlapping windows of at most max_tokens tokens
+    (embedding model tokenizer by default).
+
+    Windows end on a paragraph, line, sentence or word boundary where
+    possible, and each one starts overlap_tokens before the previous end
+    so a passage cut by a boundary is still whole in one chunk. Text that
+    fits in one window is one chunk. At most max_chunks chunks are
+    returned; the tail beyond is dropped.
+    """
+    max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+    overlap_tokens = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    max_chunks = max_chunks or settings.CHUNK_MAX_PER_ITEM
+    tokenizer = tokenizer or get_tokenizer(settings.OPENAI_EMBEDDING_MODEL)
+
+    overlap = min(overlap_tokens, max_tokens // 2)
+    offsets = tokenizer.offsets(text)
+
+    def char_at(token: int) -> int:
+        return offsets[token] if token < len(offsets) else len(text)
+
+    chunks: list[Chunk] = []
+    first = 0  # First token of the window
+    while first < len(offsets) and len(chunks) < max_chunks:
+        start = char_at(first)
+        end = char_at(first + max_tokens)
+        if end < len(text):
+            end = _find_break(text, start, end)
+        chunks.append(Chunk(index=len(chunks), start=start, end=end, text=text[start:end]))
+        if end == len(text):
+            break
+
+        last = bisect_left(offsets, end)  # First token after the window
+        first = max(last - overlap, first + 1)
+    return chunks
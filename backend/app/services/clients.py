@@ -0,0 +1,154 @@
+import logging
+import httpx
+from openai import AsyncOpenAI
+from supabase import create_client, Client, ClientOptions
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStats:
+    """
+    Connection reuse counters for one HTTP client.
+
+    Every request counts; a request that had to open a TCP connection
+    (seen through httpcore's trace extension) counts as a new connection.
+    Everything else was served from the keep-alive pool.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.http2_responses = 0
+
+    def _on_trace(self, event: str) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.new_connections += 1
+
+    def sync_hooks(self) -> dict:
+        def trace(event: str, info: dict) -> None:
+            self._on_trace(event)
+
+        def on_request(request: httpx.Request) -> None:
+            self.requests += 1
+            request.extensions["trace"] = trace
+
+        def on_response(response: httpx.Response) -> None:
+            if response.http_version == "HTTP/2":
+                self.http2_responses += 1
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def async_hooks(self) -> dict:
+        async def trace(event: str, info: dict) -> None:
+            self._on_trace(event)
+
+        async def on_request(request: httpx.Request) -> None:
+            self.requests += 1
+            request.extensions["trace"] = trace
+
+        async def on_response(response: httpx.Response) -> None:
+            if response.http_version == "HTTP/2":
+                self.http2_responses += 1
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def snapshot(self) -> dict:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "http2_responses": self.http2_responses,
+        }
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+
+class AppClients:
+    """
+    Application-scoped OpenAI and Supabase clients.
+
+    Opened in the FastAPI lifespan and shared by every request and worker,
+    so TLS sessions and keep-alive connections are reused instead of being
+    rebuilt per call. Clients are also created lazily on first use, so
+    scripts running outside the app work unchanged.
+    """
+
+    def __init__(self):
+        self._openai: AsyncOpenAI | None = None
+        self._supabase: Client | None = None
+        self._supabase_http: httpx.Client | None = None
+        self.openai_stats = ConnectionStats()
+        self.supabase_stats = ConnectionStats()
+
+    def open(self) -> None:
+        """Create the clients up front (called on app startup)."""
+        if settings.OPENAI_API_KEY:
+            self.openai()
+        if settings.VECTOR_BACKEND != "local" and settings.SUPABASE_URL:
+            self.supabase()
+
+    def openai(self) -> AsyncOpenAI:
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=_timeout(),
+                http_client=httpx.AsyncClient(
+                    http2=settings.HTTP2_ENABLED,
+                    limits=_limits(),
+                    timeout=_timeout(),
+                    event_hooks=self.openai_stats.async_hooks()
+                )
+            )
+        return self._openai
+
+    def supabase(self) -> Client:
+        if self._supabase is None:
+            self._supabase_http = httpx.Client(
+                http2=settings.HTTP2_ENABLED,
+                limits=_limits(),
+                timeout=_timeout(),
+                follow_redirects=True,
+                event_hooks=self.supabase_stats.sync_hooks()
+            )
+            self._supabase = create_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_KEY,
+                options=ClientOptions(httpx_client=self._supabase_http)
+            )
+        return self._supabase
+
+    async def close(self) -> None:
+        """Close pooled connections (called on app shutdown)."""
+        if self._openai is not None:
+            await self._openai.close()
+            self._openai = None
+        if self._supabase_http is not None:
+            self._supabase_http.close()
+            self._supabase_http = None
+            self._supabase = None
+        logger.info("Closed HTTP clients")
+
+    def stats(self) -> dict:
+        return {
+            "openai": self.openai_stats.snapshot(),
+            "supabase": self.supabase_stats.snapshot(),
+        }
+
+
+# Process-wide clients; opened and closed by the FastAPI lifespan in app.main
+app_clients = AppClients()
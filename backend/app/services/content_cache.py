@@ -0,0 +1,190 @@
+from array import array
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, func, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.models.cache import AICacheEntry
+
+
+# Run eviction every N writes instead of counting rows on each put
+EVICTION_INTERVAL = 100
+
+
+def encode_embedding(embedding: list[float]) -> bytes:
+    """Pack an embedding as float32 bytes."""
+    return array("f", embedding).tobytes()
+
+
+def decode_embedding(data: bytes) -> list[float]:
+    """Unpack float32 bytes into an embedding."""
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class ContentCache:
+    """
+    Local cache of AI output keyed by (content hash, model name).
+
+    Identical content saved under different URLs (retweets, quote tweets,
+    re-bookmarked threads) reuses the stored summary and embedding instead
+    of paying for new OpenAI calls. Entries are evicted least recently used
+    first once CONTENT_CACHE_MAX_ENTRIES is exceeded. Persisted search
+    query embeddings (kind "query") live in the same table under their
+    own QUERY_CACHE_MAX_ENTRIES budget.
+    """
+
+    def __init__(self, max_entries: int | None = None):
+        self.max_entries = max_entries or settings.CONTENT_CACHE_MAX_ENTRIES
+        self.max_query_entries = settings.QUERY_CACHE_MAX_ENTRIES
+        self.hits = {"summary": 0, "embedding": 0, "query": 0}
+        self.misses = {"summary": 0, "embedding": 0, "query": 0}
+        self._writes = 0
+
+    def _get(
+        self,
+        db: Session,
+        kind: str,
+        content_hash: str,
+        model: str,
+        max_age: timedelta | None = None,
+        touch: bool = True
+    ) -> AICacheEntry | None:
+        query = select(AICacheEntry).where(
+            AICacheEntry.kind == kind,
+            AICacheEntry.content_hash == content_hash,
+            AICacheEntry.model == model
+        )
+        if max_age is not None:
+            query = query.where(AICacheEntry.created_at >= datetime.utcnow() - max_age)
+        entry = db.execute(query).scalar_one_or_none()
+
+        if entry is None:
+            self.misses[kind] += 1
+            CACHE_REQUESTS.inc(cache=f"content_{kind}", result="miss")
+            return None
+
+        self.hits[kind] += 1
+        CACHE_REQUESTS.inc(cache=f"content_{kind}", result="hit")
+        if touch:
+            entry.last_used_at = datetime.utcnow()
+        return entry
+
+    def _put(self, db: Session, kind: str, content_hash: str, model: str, **values) -> None:
+        now = datetime.utcnow()
+        stmt = sqlite_insert(AICacheEntry.__table__).values(
+            kind=kind,
+            content_hash=content_hash,
+            model=model,
+            created_at=now,
+            last_used_at=now,
+            **values
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["kind", "content_hash", "model"],
+            # A re-put is fresh output, so it restarts the TTL too
+            set_={"created_at": now, "last_used_at": now, **values}
+        ))
+
+        self._writes += 1
+        if self._writes % EVICTION_INTERVAL == 0:
+            self.evict(db)
+
+    def get_summary(self, db: Session, content_hash: str, model: str, touch: bool = True) -> str | None:
+        """
+        Cached summary for content, or None. Does not commit.
+        touch=False leaves last_used_at alone (read-only sessions).
+        """
+        entry = self._get(db, "summary", content_hash, model, touch=touch)
+        return entry.summary if entry else None
+
+    def put_summary(self, db: Session, content_hash: str, model: str, summary: str) -> None:
+        """Store a summary for content. Does not commit."""
+        self._put(db, "summary", content_hash, model, summary=summary)
+
+    def get_embedding(
+        self,
+        db: Session,
+        content_hash: str,
+        model: str,
+        kind: str = "embedding",
+        max_age: timedelta | None = None,
+        touch: bool = True
+    ) -> list[float] | None:
+        """
+        Cached embedding for content, or None. Does not commit.
+        kind="query" is used for persisted search query embeddings.
+        """
+        entry = self._get(db, kind, content_hash, model, max_age=max_age, touch=touch)
+        return decode_embedding(entry.embedding) if entry else None
+
+    def put_embedding(
+        self,
+        db: Session,
+        content_hash: str,
+        model: str,
+        embedding: list[float],
+        kind: str = "embedding"
+    ) -> None:
+        """Store an embedding for content. Does not commit."""
+        self._put(db, kind, content_hash, model, embedding=encode_embedding(embedding))
+
+    def touch(self, db: Session, content_hash: str) -> None:
+        """Mark every cached output for content as just used. Does not commit."""
+        db.execute(
+            update(AICacheEntry)
+            .where(AICacheEntry.content_hash == content_hash, AICacheEntry.kind != "query")
+            .values(last_used_at=datetime.utcnow())
+        )
+
+    def invalidate(self, db: Session, content_hash: str) -> None:
+        """Drop every cached output for content (used by forced reprocess). Does not commit."""
+        db.execute(delete(AICacheEntry).where(
+            AICacheEntry.content_hash == content_hash, AICacheEntry.kind != "query"
+        ))
+
+    def evict(self, db: Session) -> int:
+        """
+        Delete least recently used entries beyond max_entries (content) and
+        max_query_entries (search queries). Does not commit.
+        """
+        is_query = AICacheEntry.kind == "query"
+        return (
+            self._evict_beyond(db, ~is_query, self.max_entries) +
+            self._evict_beyond(db, is_query, self.max_query_entries)
+        )
+
+    def _evict_beyond(self, db: Session, condition, max_entries: int) -> int:
+        count = db.execute(select(func.count()).select_from(AICacheEntry).where(condition)).scalar_one()
+        excess = count - max_entries
+        if excess <= 0:
+            return 0
+
+        oldest = select(AICacheEntry.id).where(condition).order_by(AICacheEntry.last_used_at).limit(excess)
+        db.execute(delete(AICacheEntry).where(AICacheEntry.id.in_(oldest.scalar_subquery())))
+        return excess
+
+    def stats(self, db: Session) -> dict:
+        """Hit/miss counters since startup plus current size."""
+        sizes = dict(db.execute(
+            select(AICacheEntry.kind == "query", func.count()).group_by(AICacheEntry.kind == "query")
+        ).all())
+        return {
+            "summary_hits": self.hits["summary"],
+            "summary_misses": self.misses["summary"],
+            "embedding_hits": self.hits["embedding"],
+            "embedding_misses": self.misses["embedding"],
+            "entries": sizes.get(False, 0),
+            "max_entries": self.max_entries,
+            "query_hits": self.hits["query"],
+            "query_misses": self.misses["query"],
+            "query_entries": sizes.get(True, 0),
+            "max_query_entries": self.max_query_entries,
+        }
+
+
+# Process-wide cache; counters are shared by all workers
+content_cache = ContentCache()
@@ -0,0 +1,102 @@
+import hashlib
+from datetime import datetime
+from sqlalchemy import select, delete, exists
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.content import ContentBlob, encode_text, decode_text
+from app.models.item import SavedItem, CONTENT_FIELDS
+
+
+# Joins a field that isn't contained in the text laid out so far
+FIELD_SEPARATOR = "\n\n"
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lookups
+HASH_LOOKUP_CHUNK_SIZE = 500
+
+
+def compute_content_hash(content: str) -> str:
+    """Compute SHA-256 hash of content for change detection."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def pack_content(fields: dict[str, str | None]) -> tuple[str | None, dict[str, list[int]] | None]:
+    """
+    Lay out an item's overlapping text fields as one text plus spans.
+
+    Fields are placed widest first (CONTENT_FIELDS order). A field found
+    in the text laid out so far becomes a [start, end] span of it, so a
+    tweet inside its thread and a preview cut from the tweet cost nothing;
+    anything else is appended after a blank line. Returns (None, None)
+    when every field is None.
+    """
+    text: str | None = None
+    spans: dict[str, list[int]] = {}
+    for name in CONTENT_FIELDS:
+        value = fields.get(name)
+        if value is None:
+            continue
+        if text is None:
+            text = value
+            start = 0
+        else:
+            start = text.find(value)
+            if start < 0:
+                start = len(text) + len(FIELD_SEPARATOR)
+                text = text + FIELD_SEPARATOR + value
+        spans[name] = [start, start + len(value)]
+    return text, spans or None
+
+
+def read_fields(data: bytes | None, spans: dict | None, names: tuple[str, ...] = CONTENT_FIELDS) -> dict[str, str | None]:
+    """
+    Cut fields out of a content blob's payload without loading the blob
+    entity. Only the prefix covering the requested spans is decompressed,
+    so a preview costs a few hundred characters, not the whole thread.
+    """
+    spans = {name: spans[name] for name in names if spans and name in spans}
+    if data is None or not spans:
+        return {name: None for name in names}
+    text = decode_text(data, max(end for _, end in spans.values()))
+    return {name: text[spans[name][0]:spans[name][1]] if name in spans else None for name in names}
+
+
+def store_content(db: Session, blobs: dict[str, str]) -> None:
+    """
+    Write content blobs (content_hash -> text) that aren't stored yet.
+    Only new text is compressed. Does not commit.
+    """
+    hashes = list(blobs)
+    table = ContentBlob.__table__
+    now = datetime.utcnow()
+    for start in range(0, len(hashes), HASH_LOOKUP_CHUNK_SIZE):
+        chunk = hashes[start:start + HASH_LOOKUP_CHUNK_SIZE]
+        stored = set(db.execute(
+            select(ContentBlob.content_hash).where(ContentBlob.content_hash.in_(chunk))
+        ).scalars())
+        rows = [
+            {"content_hash": content_hash, "data": encode_text(blobs[content_hash]), "created_at": now}
+            for content_hash in chunk if content_hash not in stored
+        ]
+        if rows:
+            db.execute(sqlite_insert(table).on_conflict_do_nothing(index_elements=[table.c.content_hash]), rows)
+
+
+def prune_content(db: Session, hashes: set[str]) -> int:
+    """
+    Delete the blobs among `hashes` that no item references any more
+    (after their items were rewritten). Returns the number deleted.
+    Does not commit.
+    """
+    candidates = [content_hash for content_hash in hashes if content_hash]
+    deleted = 0
+    referenced = exists().where(SavedItem.content_ref == ContentBlob.content_hash)
+    for start in range(0, len(candidates), HASH_LOOKUP_CHUNK_SIZE):
+        chunk = candidates[start:start + HASH_LOOKUP_CHUNK_SIZE]
+        result = db.execute(
+            delete(ContentBlob)
+            .where(ContentBlob.content_hash.in_(chunk), ~referenced)
+            .execution_options(synchronize_session=False)
+        )
+        deleted += result.rowcount
+    return deleted
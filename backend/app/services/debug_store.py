@@ -0,0 +1,226 @@
+import gzip
+import json
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, data_dir
+from app.core.writer import write_lane
+from app.models.debug import DebugSnapshot
+
+try:
+    import zstandard
+except ImportError:  # Optional: gzip is always available
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+# Plain .json snapshots written before the store existed
+LEGACY_ID_PATTERN = re.compile(r"debug_\d{8}_\d{6}")
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def _codec() -> str:
+    if settings.DEBUG_SNAPSHOT_CODEC == "zstd" and zstandard is not None:
+        return "zstd"
+    return "gzip"
+
+
+def _compress(payload: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return gzip.compress(payload, compresslevel=GZIP_LEVEL)
+
+
+def _decompress(data: bytes, filename: str) -> bytes:
+    if filename.endswith(".json"):
+        return data
+    if filename.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{filename} is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class DebugSnapshotStore:
+    """
+    Extension debug snapshots: compressed payload files plus a small
+    metadata index (debug_snapshots table), so listing never reads a
+    payload. Methods block on disk and DB I/O; call them from worker
+    threads (plain `def` routes). Saving evicts snapshots beyond
+    DEBUG_SNAPSHOT_MAX_COUNT or older than DEBUG_SNAPSHOT_MAX_AGE_DAYS.
+    Plain .json snapshots from before the store are indexed by
+    index_legacy() and then listed and evicted like the others.
+    """
+
+    def __init__(self, directory: Path | None = None):
+        self.directory = directory or data_dir / "debug_snapshots"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_stamp: datetime | None = None
+
+    def _new_id(self) -> str:
+        """Microsecond timestamp ID, bumped if two saves land on the same one."""
+        with self._lock:
+            stamp = datetime.now()
+            if self._last_stamp is not None and stamp <= self._last_stamp:
+                stamp = self._last_stamp + timedelta(microseconds=1)
+            self._last_stamp = stamp
+        return f"debug_{stamp.strftime('%Y%m%d_%H%M%S_%f')}"
+
+    def save(self, snapshot: dict) -> DebugSnapshot:
+        """Compress and store a snapshot, index it and apply retention."""
+        snapshot_id = self._new_id()
+        snapshot["_server_received"] = datetime.now().isoformat()
+        snapshot["_id"] = snapshot_id
+
+        payload = json.dumps(snapshot, separators=(",", ":")).encode()
+        codec = _codec()
+        data = _compress(payload, codec)
+        filename = f"{snapshot_id}.json.{'zst' if codec == 'zstd' else 'gz'}"
+
+        # Write then rename, so a reader never sees a partial file
+        path = self.directory / filename
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+
+        entry = _entry(snapshot_id, filename, snapshot, len(payload), len(data), datetime.utcnow())
+        try:
+            evicted = write_lane.call(self._index, [entry])
+        except Exception:
+            # An unindexed payload would never be listed or evicted
+            self._unlink([filename])
+            raise
+        self._unlink(evicted)
+        return entry
+
+    def index_legacy(self) -> int:
+        """
+        Index plain .json snapshots from before the store, dated by file
+        modification time, and apply retention to them. Reads each legacy
+        file once; already indexed ones are skipped. Returns how many were added.
+        """
+        paths = [path for path in self.directory.glob("debug_*.json") if LEGACY_ID_PATTERN.fullmatch(path.stem)]
+        if not paths:
+            return 0
+        with SessionLocal() as db:
+            indexed = set(db.execute(
+                select(DebugSnapshot.id).where(DebugSnapshot.id.in_([path.stem for path in paths]))
+            ).scalars())
+
+        entries = []
+        for path in paths:
+            if path.stem in indexed:
+                continue
+            try:
+                data = path.read_bytes()
+                snapshot = json.loads(data)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable debug snapshot %s: %s", path.name, e)
+                continue
+            created_at = datetime.utcfromtimestamp(path.stat().st_mtime)
+            entries.append(_entry(path.stem, path.name, snapshot, len(data), len(data), created_at))
+        if entries:
+            self._unlink(write_lane.call(self._index, entries))
+        return len(entries)
+
+    def _index(self, db: Session, entries: list[DebugSnapshot]) -> list[str]:
+        """Write lane helper: add the entries and drop expired ones. Returns evicted filenames. Does not commit."""
+        db.add_all(entries)
+        db.flush()
+        for entry in entries:
+            db.expunge(entry)
+
+        cutoff = datetime.utcnow() - timedelta(days=settings.DEBUG_SNAPSHOT_MAX_AGE_DAYS)
+        keep = (
+            select(DebugSnapshot.id)
+            .order_by(DebugSnapshot.created_at.desc(), DebugSnapshot.id.desc())
+            .limit(settings.DEBUG_SNAPSHOT_MAX_COUNT)
+        )
+        expired = db.execute(
+            select(DebugSnapshot.id, DebugSnapshot.filename).where(
+                (DebugSnapshot.created_at < cutoff) | DebugSnapshot.id.not_in(keep)
+            )
+        ).all()
+        if expired:
+            db.execute(delete(DebugSnapshot).where(DebugSnapshot.id.in_([row.id for row in expired])))
+        return [row.filename for row in expired]
+
+    def _unlink(self, filenames: list[str]) -> None:
+        for filename in filenames:
+            try:
+                (self.directory / filename).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Could not delete debug snapshot %s: %s", filename, e)
+
+    def list(self, limit: int = 10) -> list[DebugSnapshot]:
+        """Newest index entries first; no payload is read."""
+        with SessionLocal() as db:
+            return db.execute(
+                select(DebugSnapshot).order_by(DebugSnapshot.created_at.desc(), DebugSnapshot.id.desc()).limit(limit)
+            ).scalars().all()
+
+    def read_latest(self) -> bytes | None:
+        """The newest snapshot's JSON document (see read), or None if there are none."""
+        with SessionLocal() as db:
+            latest_id = db.execute(
+                select(DebugSnapshot.id).order_by(DebugSnapshot.created_at.desc(), DebugSnapshot.id.desc()).limit(1)
+            ).scalar_one_or_none()
+        if latest_id is None:
+            legacy_path = self.directory / "latest.json"
+            return legacy_path.read_bytes() if legacy_path.exists() else None
+        return self.read(latest_id)
+
+    def read(self, snapshot_id: str) -> bytes | None:
+        """
+        The snapshot's JSON document, decompressed but not parsed (callers
+        can send it as is), or None if unknown. Plain .json snapshots from
+        before the store are readable by ID even before they are indexed.
+        """
+        with SessionLocal() as db:
+            entry = db.get(DebugSnapshot, snapshot_id)
+
+        if entry is None:
+            legacy_path = self.directory / f"{snapshot_id}.json"
+            if LEGACY_ID_PATTERN.fullmatch(snapshot_id) and legacy_path.exists():
+                return legacy_path.read_bytes()
+            return None
+
+        path = self.directory / entry.filename
+        if not path.exists():
+            return None
+        return _decompress(path.read_bytes(), entry.filename)
+
+
+def _entry(
+    snapshot_id: str,
+    filename: str,
+    snapshot: dict,
+    raw_bytes: int,
+    stored_bytes: int,
+    created_at: datetime
+) -> DebugSnapshot:
+    summary = snapshot.get("summary") or {}
+    return DebugSnapshot(
+        id=snapshot_id,
+        filename=filename,
+        client_timestamp=snapshot.get("timestamp"),
+        total_articles=snapshot.get("totalArticlesFound", 0),
+        captured=summary.get("captured", 0),
+        skipped=summary.get("skipped", 0),
+        raw_bytes=raw_bytes,
+        stored_bytes=stored_bytes,
+        created_at=created_at
+    )
+
+
+debug_store = DebugSnapshotStore()
@@ -0,0 +1,311 @@
+from datetime import datetime
+from typing import AsyncIterator
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.item import SavedItem
+from app.models.ingest import IngestKey
+from app.schemas.ingest import IngestItem
+from app.services.content_store import compute_content_hash, pack_content, store_content, prune_content
+from app.services.search_index import index_items
+
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lookups
+URL_LOOKUP_CHUNK_SIZE = 500
+
+# Columns rewritten when an existing item is re-ingested with skip_duplicates
+UPSERT_UPDATE_COLUMNS = (
+    "content_ref",
+    "content_spans",
+    "content_type",
+    "extra_data",
+    "status",
+    "fetch_attempts",
+    "summary_status",
+    "embedding_status",
+    "chunk_status",
+    "processing_error",
+    "updated_at",
+)
+
+
+def resolve_content_type(item: IngestItem) -> str:
+    """Extract content_type from the item's metadata (defaults to tweet)."""
+    if item.extra_data and "content_type" in item.extra_data:
+        return item.extra_data["content_type"]
+    return "tweet"
+
+
+def has_extracted_content(item: IngestItem, content_type: str) -> bool:
+    """
+    Determine if the extension captured content for this item.
+    For articles: title in metadata counts as content
+    For tweets: full_content counts
+    """
+    has_content = item.full_content is not None
+    if not has_content and content_type == "article" and item.extra_data:
+        has_content = item.extra_data.get("article_title") is not None
+    return has_content
+
+
+def find_existing_urls(db: Session, urls: list[str]) -> dict[str, int]:
+    """
+    Resolve which URLs are already stored.
+    Uses chunked IN queries against the source_url index.
+    Returns mapping of source_url -> item id.
+    """
+    existing = {}
+    for start in range(0, len(urls), URL_LOOKUP_CHUNK_SIZE):
+        chunk = urls[start:start + URL_LOOKUP_CHUNK_SIZE]
+        rows = db.execute(
+            select(SavedItem.source_url, SavedItem.id).where(SavedItem.source_url.in_(chunk))
+        ).all()
+        existing.update({url: item_id for url, item_id in rows})
+    return existing
+
+
+def find_existing_keys(db: Session, keys: list[str]) -> set[str]:
+    """Resolve which idempotency keys were already ingested (chunked IN on the key)."""
+    existing = set()
+    for start in range(0, len(keys), URL_LOOKUP_CHUNK_SIZE):
+        chunk = keys[start:start + URL_LOOKUP_CHUNK_SIZE]
+        existing.update(db.execute(select(IngestKey.key).where(IngestKey.key.in_(chunk))).scalars())
+    return existing
+
+
+def _build_row(item: IngestItem, platform: str, now: datetime) -> tuple[dict, str | None]:
+    """Build an insert row for an ingested item, plus the text for its content blob."""
+    content_type = resolve_content_type(item)
+    has_content = has_extracted_content(item, content_type)
+    text, spans = pack_content({
+        "raw_preview": item.preview_text,
+        "full_content": item.full_content,
+        "thread_content": item.thread_content,
+    })
+    return {
+        "source_url": item.url,
+        "source_platform": platform,
+        "content_type": content_type,
+        "content_ref": compute_content_hash(text) if text is not None else None,
+        "content_spans": spans,
+        "extra_data": item.extra_data,
+        "status": "fetched" if has_content else "pending",
+        "fetch_attempts": 1 if has_content else 0,
+        "summary_status": "pending",
+        "embedding_status": "pending",
+        "chunk_status": "pending",
+        "processing_error": None,
+        "created_at": now,
+        "updated_at": now,
+    }, text
+
+
+def bulk_ingest(
+    db: Session,
+    items: list[IngestItem],
+    platform: str = "twitter",
+    skip_duplicates: bool = False
+) -> dict:
+    """
+    Store a batch of ingested items with set-based queries.
+
+    Existing URLs are resolved with one chunked IN query, then all rows are
+    written with a multi-row INSERT ... ON CONFLICT(source_url). With
+    skip_duplicates the conflict path updates existing rows with the new
+    content and resets processing status; otherwise existing rows are left
+    untouched and counted as duplicates. Items carrying an idempotency_key
+    that was already ingested are skipped entirely. Text goes to the
+    content store first (one blob per distinct text; blobs left without
+    an item by a rewrite are dropped), and written rows are re-indexed
+    for keyword search in the same transaction.
+
+    Does not commit. Returns dict with counts and the ids to process.
+    """
+    new_count = 0
+    duplicate_count = 0
+    failed_count = 0
+
+    if not items:
+        return {"new_count": 0, "duplicate_count": 0, "failed_count": 0, "item_ids": []}
+
+    # Items whose idempotency key was already ingested (a retried chunk)
+    # are replays: counted as duplicates and never rewritten or re-queued
+    keys = list({item.idempotency_key for item in items if item.idempotency_key})
+    if keys:
+        seen_keys = find_existing_keys(db, keys)
+        fresh = []
+        for item in items:
+            if item.idempotency_key:
+                if item.idempotency_key in seen_keys:
+                    duplicate_count += 1
+                    continue
+                seen_keys.add(item.idempotency_key)
+            fresh.append(item)
+        items = fresh
+
+    now = datetime.utcnow()
+    existing = find_existing_urls(db, list({item.url for item in items}))
+
+    # Last occurrence of a URL wins; repeats inside the payload behave
+    # as if the first occurrence had already been stored
+    rows: dict[str, dict] = {}
+    blobs: dict[str, str] = {}
+    seen = set(existing)
+    for item in items:
+        row, text = _build_row(item, platform, now)
+        has_content = row["status"] == "fetched"
+
+        if item.url in seen:
+            if not skip_duplicates:
+                duplicate_count += 1
+                continue
+            if has_content:
+                new_count += 1
+            else:
+                failed_count += 1
+        else:
+            seen.add(item.url)
+            if has_content:
+                new_count += 1
+            else:
+                failed_count += 1
+
+        rows[item.url] = row
+        if text is not None:
+            blobs[row["content_ref"]] = text
+
+    if not rows:
+        _record_keys(db, items, existing, now)
+        return {
+            "new_count": new_count,
+            "duplicate_count": duplicate_count,
+            "failed_count": failed_count,
+            "item_ids": []
+        }
+
+    # Blobs that may lose their last item: the ones rewritten rows point at
+    # before the upsert, and new ones for rows that end up not written
+    replaced_refs = set()
+    if skip_duplicates:
+        rewritten = [url for url in rows if url in existing]
+        for start in range(0, len(rewritten), URL_LOOKUP_CHUNK_SIZE):
+            chunk = rewritten[start:start + URL_LOOKUP_CHUNK_SIZE]
+            replaced_refs.update(db.execute(
+                select(SavedItem.content_ref).where(SavedItem.source_url.in_(chunk))
+            ).scalars())
+    store_content(db, blobs)
+
+    # Core insert on the table: one multi-row statement per page,
+    # without ORM bulk grouping rows by their NULL columns
+    table = SavedItem.__table__
+    stmt = sqlite_insert(table)
+    if skip_duplicates:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.source_url],
+            set_={column: stmt.excluded[column] for column in UPSERT_UPDATE_COLUMNS}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.source_url])
+
+    written = db.execute(
+        stmt.returning(table.c.id, table.c.source_url),
+        list(rows.values())
+    ).all()
+    ids_by_url = {url: item_id for item_id, url in written}
+    index_items(db, list(ids_by_url.values()))
+
+    # Rows inserted concurrently by another request hit the conflict
+    # without returning; report them as duplicates like the lookup would
+    for url, row in rows.items():
+        if url not in ids_by_url and url not in existing:
+            if row["status"] == "fetched":
+                new_count -= 1
+            else:
+                failed_count -= 1
+            duplicate_count += 1
+            replaced_refs.add(row["content_ref"])
+    prune_content(db, replaced_refs)
+
+    item_ids = [
+        ids_by_url[url] for url, row in rows.items()
+        if url in ids_by_url and row["status"] == "fetched"
+    ]
+    _record_keys(db, items, {**existing, **ids_by_url}, now)
+
+    return {
+        "new_count": new_count,
+        "duplicate_count": duplicate_count,
+        "failed_count": failed_count,
+        "item_ids": item_ids
+    }
+
+
+def _record_keys(db: Session, items: list[IngestItem], ids_by_url: dict[str, int], now: datetime) -> None:
+    """Remember the idempotency keys of stored items. Does not commit."""
+    rows = [
+        {"key": item.idempotency_key, "item_id": ids_by_url[item.url], "created_at": now}
+        for item in items
+        if item.idempotency_key and item.url in ids_by_url
+    ]
+    if rows:
+        db.execute(sqlite_insert(IngestKey.__table__).on_conflict_do_nothing(), rows)
+
+
+async def iter_ndjson_batches(
+    chunks: AsyncIterator[bytes],
+    batch_size: int,
+    max_line_bytes: int
+) -> AsyncIterator[tuple[list[IngestItem], list[dict]]]:
+    """
+    Parse a newline-delimited JSON stream of IngestItems as bytes arrive.
+    Yields (items, errors) every `batch_size` lines, where errors are
+    {"line": n, "error": message} for lines that failed validation. Only
+    one batch and one partial line are held in memory at a time.
+    """
+    buffer = b""
+    line_number = 0
+    items: list[IngestItem] = []
+    errors: list[dict] = []
+    oversized = False
+
+    def parse(line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            items.append(IngestItem.model_validate_json(line))
+        except ValidationError as e:
+            errors.append({"line": line_number, "error": e.errors(include_url=False)[0]["msg"]})
+
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                if len(buffer) > max_line_bytes:
+                    # Drop the rest of this line as it streams in
+                    buffer = b""
+                    oversized = True
+                break
+
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            line_number += 1
+            if oversized or len(line) > max_line_bytes:
+                errors.append({"line": line_number, "error": f"Line exceeds {max_line_bytes} bytes"})
+                oversized = False
+            else:
+                parse(line)
+
+            if len(items) + len(errors) >= batch_size:
+                yield items, errors
+                items, errors = [], []
+
+    if buffer.strip() or oversized:
+        line_number += 1
+        if oversized:
+            errors.append({"line": line_number, "error": f"Line exceeds {max_line_bytes} bytes"})
+        else:
+            parse(buffer)
+    if items or errors:
+        yield items, errors
@@ -0,0 +1,98 @@
+import re
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.ingest import IngestSession
+from app.models.item import SavedItem
+from app.schemas.ingest import IngestItem
+from app.services.ingest import URL_LOOKUP_CHUNK_SIZE
+
+
+# Tweet/status URLs end in a snowflake ID that grows with post time
+STATUS_ID_PATTERN = re.compile(r"/status(?:es)?/(\d+)")
+
+
+def extract_status_id(url: str) -> int | None:
+    """Numeric status ID from a tweet URL, or None for other URLs."""
+    match = STATUS_ID_PATTERN.search(url)
+    return int(match.group(1)) if match else None
+
+
+def get_high_water_mark(db: Session, platform: str, collection: str) -> IngestSession | None:
+    """
+    The completed session that stored the newest status ID for a collection,
+    if any. The mark is only a hint for where a client can stop scrolling:
+    bookmarks are ordered by when they were bookmarked, so an old tweet
+    bookmarked since the last sync sits below it. /api/items/probe is the
+    authoritative check for what is stored.
+    """
+    return db.execute(
+        select(IngestSession)
+        .where(
+            IngestSession.platform == platform,
+            IngestSession.collection == collection,
+            IngestSession.status == "completed",
+            IngestSession.newest_status_id.is_not(None)
+        )
+        .order_by(IngestSession.newest_status_id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def create_session(db: Session, platform: str, collection: str) -> IngestSession:
+    """Open a new ingest session. Does not commit."""
+    session = IngestSession(platform=platform, collection=collection, status="open", item_count=0)
+    db.add(session)
+    db.flush()
+    return session
+
+
+def record_session_items(db: Session, session_id: int, items: list[IngestItem]) -> None:
+    """
+    Count a batch against an open session and track the newest status ID
+    among its items stored with content; items left "pending" (no content
+    yet) don't move it. Call after the batch is written, in the same
+    transaction. Unknown or completed sessions are ignored. Does not commit.
+    """
+    session = db.get(IngestSession, session_id)
+    if session is None or session.status != "open":
+        return
+
+    session.item_count += len(items)
+    candidates = {}
+    for item in items:
+        status_id = extract_status_id(item.url)
+        if status_id is not None and (session.newest_status_id is None or status_id > session.newest_status_id):
+            candidates[item.url] = status_id
+    if not candidates:
+        return
+
+    urls = list(candidates)
+    stored = []
+    for start in range(0, len(urls), URL_LOOKUP_CHUNK_SIZE):
+        stored.extend(db.execute(
+            select(SavedItem.source_url).where(
+                SavedItem.source_url.in_(urls[start:start + URL_LOOKUP_CHUNK_SIZE]),
+                SavedItem.status == "fetched"
+            )
+        ).scalars())
+    if stored:
+        newest_url = max(stored, key=candidates.__getitem__)
+        session.newest_status_id = candidates[newest_url]
+        session.newest_url = newest_url
+
+
+def complete_session(db: Session, session_id: int) -> IngestSession | None:
+    """
+    Mark a session completed so its newest status ID becomes the high-water
+    mark. Until then an interrupted sync can resume without moving the mark.
+    Does not commit.
+    """
+    session = db.get(IngestSession, session_id)
+    if session is None:
+        return None
+    if session.status != "completed":
+        session.status = "completed"
+        session.completed_at = datetime.utcnow()
+    return session
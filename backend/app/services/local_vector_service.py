@@ -0,0 +1,454 @@
+import calendar
+import threading
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.database import SessionLocal, data_dir
+from app.core.config import settings
+from app.core.writer import write_lane
+from app.models.vector import LocalEmbedding, LocalChunkEmbedding
+from app.services.vector_store import VectorStore, create_content_preview, MAX_MATCH_COUNT
+
+
+# Matrix rows allocated up front; capacity doubles when full
+INITIAL_CAPACITY = 1024
+
+
+def _timestamp(value: datetime) -> float:
+    """UTC epoch seconds; naive datetimes are treated as UTC like the DB."""
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+    return vector / np.where(norm == 0, 1, norm)
+
+
+def _item_filter(
+    columns: dict[str, np.ndarray],
+    slots: np.ndarray,
+    content_type: str | None,
+    after: datetime | None,
+    before: datetime | None
+) -> np.ndarray:
+    """Boolean mask of item slots passing the content_type/date filters."""
+    mask = np.ones(len(slots), dtype=bool)
+    if content_type:
+        mask &= columns["content_type"][slots] == content_type
+    if after:
+        mask &= columns["created"][slots] >= _timestamp(after)
+    if before:
+        mask &= columns["created"][slots] <= _timestamp(before)
+    return mask
+
+
+class SlotMatrix:
+    """
+    Memory-mapped float32 matrix of unit vectors, one per slot, plus
+    in-memory per-slot columns (NumPy arrays) used for vectorized filters.
+    Freed slots are reused; capacity doubles when full. Writers must hold
+    the caller's lock; concurrent readers take a consistent view with
+    snapshot(), since growing replaces the matrix and column arrays.
+    """
+
+    def __init__(self, path: Path, dimension: int, size: int, columns: dict[str, tuple[type, object]]):
+        self.path = path
+        self.dimension = dimension
+        self.capacity = max(INITIAL_CAPACITY, size)
+        self.matrix = self._map(self.capacity)
+        self._defaults = columns
+        self.columns = {
+            name: np.full(self.capacity, fill, dtype=dtype)
+            for name, (dtype, fill) in columns.items()
+        }
+        self.size = size
+        self.free: list[int] = []
+        self._swap_lock = threading.Lock()
+
+    def _map(self, capacity: int) -> np.memmap:
+        needed = capacity * self.dimension * 4
+        if not self.path.exists() or self.path.stat().st_size < needed:
+            with open(self.path, "ab") as f:
+                f.truncate(needed)
+        return np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _grow(self) -> None:
+        capacity = self.capacity * 2
+        self.matrix.flush()
+        extra = capacity - self.capacity
+        matrix = self._map(capacity)
+        columns = {
+            name: np.concatenate([self.columns[name], np.full(extra, fill, dtype=dtype)])
+            for name, (dtype, fill) in self._defaults.items()
+        }
+        # Readers still holding the old arrays keep a valid (smaller) view
+        with self._swap_lock:
+            self.matrix, self.columns, self.capacity = matrix, columns, capacity
+
+    def allocate(self) -> int:
+        if self.free:
+            return self.free.pop()
+        if self.size == self.capacity:
+            self._grow()
+        with self._swap_lock:
+            self.size += 1
+        return self.size - 1
+
+    def snapshot(self) -> tuple[np.ndarray, dict[str, np.ndarray], int]:
+        """The matrix, columns and size as of now, all of the same generation."""
+        with self._swap_lock:
+            return self.matrix, dict(self.columns), self.size
+
+    def release(self, slot: int) -> None:
+        self.matrix[slot] = 0
+        for name, (_, fill) in self._defaults.items():
+            self.columns[name][slot] = fill
+        self.free.append(slot)
+
+
+class LocalVectorService(VectorStore):
+    """
+    In-process vector store for offline search.
+
+    Unit-normalized float32 embeddings live in memory-mapped matrices next
+    to the SQLite DB (one row per slot): one for item vectors, one for the
+    chunk vectors of long items. Metadata lives in the local_embeddings and
+    local_chunk_embeddings tables. Search is an exact vectorized cosine
+    top-k with the same content_type/date filters as match_items().
+    """
+
+    def __init__(self, directory: Path | None = None, dimension: int | None = None):
+        self.dimension = dimension or settings.EMBEDDING_DIMENSION
+        self.directory = directory or data_dir / "vectors"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"embeddings_{self.dimension}.f32"
+        self.chunk_path = self.directory / f"chunks_{self.dimension}.f32"
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Open the matrices and rebuild the in-memory filter columns."""
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(
+                    LocalEmbedding.slot,
+                    LocalEmbedding.neurolink_item_id,
+                    LocalEmbedding.content_type,
+                    LocalEmbedding.created_at
+                )
+            ).all()
+            chunk_rows = db.execute(
+                select(
+                    LocalChunkEmbedding.slot,
+                    LocalChunkEmbedding.neurolink_item_id,
+                    LocalChunkEmbedding.chunk_index,
+                    LocalChunkEmbedding.start_offset,
+                    LocalChunkEmbedding.end_offset
+                )
+            ).all()
+
+        self._items = SlotMatrix(
+            self.path,
+            self.dimension,
+            size=max((row.slot for row in rows), default=-1) + 1,
+            columns={"item_id": (np.int64, -1), "content_type": (object, None), "created": (np.float64, 0.0)}
+        )
+        self._slots: dict[int, int] = {}
+        for row in rows:
+            self._items.columns["item_id"][row.slot] = row.neurolink_item_id
+            self._items.columns["content_type"][row.slot] = row.content_type
+            self._items.columns["created"][row.slot] = _timestamp(row.created_at)
+            self._slots[row.neurolink_item_id] = row.slot
+        self._items.free = [slot for slot in range(self._items.size) if self._items.columns["item_id"][slot] < 0]
+
+        self._chunks = SlotMatrix(
+            self.chunk_path,
+            self.dimension,
+            size=max((row.slot for row in chunk_rows), default=-1) + 1,
+            columns={
+                "item_id": (np.int64, -1),
+                "chunk_index": (np.int32, -1),
+                "start": (np.int32, 0),
+                "end": (np.int32, 0)
+            }
+        )
+        self._chunk_slots: dict[int, list[int]] = {}
+        for row in chunk_rows:
+            columns = self._chunks.columns
+            columns["item_id"][row.slot] = row.neurolink_item_id
+            columns["chunk_index"][row.slot] = row.chunk_index
+            columns["start"][row.slot] = row.start_offset
+            columns["end"][row.slot] = row.end_offset
+            self._chunk_slots.setdefault(row.neurolink_item_id, []).append(row.slot)
+        self._chunks.free = [slot for slot in range(self._chunks.size) if self._chunks.columns["item_id"][slot] < 0]
+
+    def upsert_embedding(
+        self,
+        neurolink_item_id: int,
+        source_url: str,
+        content_type: str | None,
+        content: str,
+        embedding: list[float]
+    ) -> int:
+        """
+        Upsert an embedding into the local store.
+        Returns the embedding ID.
+        """
+        result = self.upsert_embeddings_batch([{
+            "neurolink_item_id": neurolink_item_id,
+            "source_url": source_url,
+            "content_type": content_type,
+            "content": content,
+            "embedding": embedding
+        }])
+        if neurolink_item_id in result["errors"]:
+            raise ValueError(result["errors"][neurolink_item_id])
+        return result["ids"][neurolink_item_id]
+
+    def upsert_embeddings_batch(self, rows: list[dict]) -> dict:
+        """
+        Upsert many embeddings: matrix rows are written in place and all
+        metadata goes in one multi-row upsert.
+        Returns {"ids": {item_id: embedding_id}, "errors": {item_id: message}}.
+        """
+        vectors, errors = {}, {}
+        latest = {}
+        for row in rows:
+            vector = np.asarray(row["embedding"], dtype=np.float32)
+            if vector.shape != (self.dimension,):
+                errors[row["neurolink_item_id"]] = f"Expected {self.dimension}-dim embedding, got {vector.shape}"
+                continue
+            vectors[row["neurolink_item_id"]] = vector
+            latest[row["neurolink_item_id"]] = row
+        if not latest:
+            return {"ids": {}, "errors": errors}
+
+        with self._lock:
+            slots = {}
+            previous = {}  # Vectors overwritten in place, restored if the write fails
+            for item_id in latest:
+                slot = self._slots.get(item_id)
+                if slot is None:
+                    slot = self._items.allocate()
+                else:
+                    previous[slot] = self._items.matrix[slot].copy()
+                slots[item_id] = slot
+                self._items.matrix[slot] = _normalize(vectors[item_id])
+            self._items.matrix.flush()
+
+            now = datetime.utcnow()
+            stmt = sqlite_insert(LocalEmbedding.__table__).values([
+                {
+                    "slot": slots[item_id],
+                    "neurolink_item_id": item_id,
+                    "source_url": row["source_url"],
+                    "content_type": row["content_type"],
+                    "content_preview": create_content_preview(row["content"]),
+                    "created_at": now
+                }
+                for item_id, row in latest.items()
+            ])
+            # Like Supabase, created_at keeps the first insert time
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["neurolink_item_id"],
+                set_={
+                    "source_url": stmt.excluded.source_url,
+                    "content_type": stmt.excluded.content_type,
+                    "content_preview": stmt.excluded.content_preview,
+                }
+            ).returning(LocalEmbedding.id, LocalEmbedding.neurolink_item_id, LocalEmbedding.created_at)
+            try:
+                stored = write_lane.call(lambda db: [tuple(row) for row in db.execute(stmt)])
+            except Exception:
+                for slot in slots.values():
+                    if slot in previous:
+                        self._items.matrix[slot] = previous[slot]
+                    else:
+                        self._items.release(slot)
+                self._items.matrix.flush()
+                raise
+
+            ids = {}
+            for embedding_id, item_id, created_at in stored:
+                slot = slots[item_id]
+                self._items.columns["item_id"][slot] = item_id
+                self._items.columns["content_type"][slot] = latest[item_id]["content_type"]
+                self._items.columns["created"][slot] = _timestamp(created_at)
+                self._slots[item_id] = slot
+                ids[item_id] = embedding_id
+
+        return {"ids": ids, "errors": errors}
+
+    def delete_embedding(self, neurolink_item_id: int) -> bool:
+        """Delete an embedding, and any chunk vectors, by neurolink_item_id."""
+        self.replace_chunks(neurolink_item_id, [])
+        with self._lock:
+            slot = self._slots.pop(neurolink_item_id, None)
+            write_lane.call(
+                lambda db: db.execute(delete(LocalEmbedding).where(LocalEmbedding.neurolink_item_id == neurolink_item_id))
+            )
+            if slot is not None:
+                self._items.release(slot)
+        return True
+
+    def replace_chunks(self, neurolink_item_id: int, chunks: list[dict]) -> int:
+        """
+        Replace an item's chunk vectors: new matrix rows are written first,
+        then the metadata swap is one write lane transaction.
+        Returns the number of chunks stored.
+        """
+        vectors = []
+        for chunk in chunks:
+            vector = np.asarray(chunk["embedding"], dtype=np.float32)
+            if vector.shape != (self.dimension,):
+                raise ValueError(f"Expected {self.dimension}-dim embedding, got {vector.shape}")
+            vectors.append(_normalize(vector))
+
+        with self._lock:
+            old_slots = self._chunk_slots.pop(neurolink_item_id, [])
+            if not chunks and not old_slots:
+                return 0
+            slots = [self._chunks.allocate() for _ in chunks]
+            for slot, vector in zip(slots, vectors):
+                self._chunks.matrix[slot] = vector
+            self._chunks.matrix.flush()
+
+            now = datetime.utcnow()
+            records = [
+                {
+                    "slot": slot,
+                    "neurolink_item_id": neurolink_item_id,
+                    "chunk_index": chunk["chunk_index"],
+                    "start_offset": chunk["start_offset"],
+                    "end_offset": chunk["end_offset"],
+                    "created_at": now
+                }
+                for slot, chunk in zip(slots, chunks)
+            ]
+
+            def swap(db):
+                db.execute(delete(LocalChunkEmbedding).where(LocalChunkEmbedding.neurolink_item_id == neurolink_item_id))
+                if records:
+                    db.execute(sqlite_insert(LocalChunkEmbedding.__table__).values(records))
+
+            try:
+                write_lane.call(swap)
+            except Exception:
+                for slot in slots:
+                    self._chunks.release(slot)
+                self._chunk_slots[neurolink_item_id] = old_slots
+                raise
+
+            for slot in old_slots:
+                self._chunks.release(slot)
+            columns = self._chunks.columns
+            for slot, chunk in zip(slots, chunks):
+                columns["item_id"][slot] = neurolink_item_id
+                columns["chunk_index"][slot] = chunk["chunk_index"]
+                columns["start"][slot] = chunk["start_offset"]
+                columns["end"][slot] = chunk["end_offset"]
+            if slots:
+                self._chunk_slots[neurolink_item_id] = slots
+        return len(slots)
+
+    def search_similar(
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        content_type: str | None = None,
+        after: datetime | None = None,
+        before: datetime | None = None
+    ) -> list[dict]:
+        """
+        Exact cosine top-k over all stored vectors.
+        Returns list of matches with similarity scores.
+        """
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        matrix, columns, size = self._items.snapshot()
+        if size == 0:
+            return []
+
+        similarities = matrix[:size] @ query
+        mask = (columns["item_id"][:size] >= 0) & (similarities > match_threshold)
+        mask &= _item_filter(columns, np.arange(size), content_type, after, before)
+
+        candidates = np.flatnonzero(mask)
+        k = min(match_count, MAX_MATCH_COUNT, len(candidates))
+        if k == 0:
+            return []
+        top = candidates[np.argpartition(-similarities[candidates], k - 1)[:k]]
+        top = top[np.argsort(-similarities[top])]
+
+        item_ids = [int(columns["item_id"][slot]) for slot in top]
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(LocalEmbedding).where(LocalEmbedding.neurolink_item_id.in_(item_ids))
+            ).scalars().all()
+            metadata = {row.neurolink_item_id: row for row in rows}
+
+        matches = []
+        for slot, item_id in zip(top, item_ids):
+            row = metadata.get(item_id)
+            if row is None:
+                continue
+            matches.append({
+                "id": row.id,
+                "neurolink_item_id": item_id,
+                "source_url": row.source_url,
+                "content_type": row.content_type,
+                "content_preview": row.content_preview,
+                "similarity": float(similarities[slot]),
+                "created_at": row.created_at.isoformat()
+            })
+        return matches
+
+    def search_chunks(
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        content_type: str | None = None,
+        after: datetime | None = None,
+        before: datetime | None = None
+    ) -> list[dict]:
+        """
+        Exact cosine search over chunk vectors, reduced to the best chunk
+        per item (max-sim). Returns one match per item, best first.
+        """
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        matrix, columns, size = self._chunks.snapshot()
+        if size == 0:
+            return []
+
+        similarities = matrix[:size] @ query
+        candidates = np.flatnonzero((columns["item_id"][:size] >= 0) & (similarities > match_threshold))
+        if len(candidates) == 0:
+            return []
+
+        # Filters live on the item vector's slot (slots added since the
+        # snapshot are skipped)
+        _, item_columns, item_size = self._items.snapshot()
+        item_slots = np.array([self._slots.get(int(item_id), -1) for item_id in columns["item_id"][candidates]])
+        keep = (item_slots >= 0) & (item_slots < item_size)
+        keep[keep] = _item_filter(item_columns, item_slots[keep], content_type, after, before)
+        candidates = candidates[keep]
+
+        # Best first, then the first occurrence of each item is its max-sim chunk
+        candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        _, first = np.unique(columns["item_id"][candidates], return_index=True)
+        best = candidates[np.sort(first)][:min(match_count, MAX_MATCH_COUNT)]
+
+        return [
+            {
+                "neurolink_item_id": int(columns["item_id"][slot]),
+                "chunk_index": int(columns["chunk_index"][slot]),
+                "start_offset": int(columns["start"][slot]),
+                "end_offset": int(columns["end"][slot]),
+                "similarity": float(similarities[slot])
+            }
+            for slot in best
+        ]
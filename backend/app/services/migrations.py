@@ -0,0 +1,128 @@
+import logging
+from sqlalchemy import Column, Table, bindparam, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.item import SavedItem, CONTENT_FIELDS
+from app.models.job import ProcessingJob
+from app.services.content_store import compute_content_hash, pack_content, store_content
+from app.services.search_index import SEARCH_TABLE, INDEXED_COLUMNS
+
+
+logger = logging.getLogger(__name__)
+
+# Indexes the models no longer declare
+DROPPED_INDEXES = ("ix_saved_items_summary_status",)
+
+# Legacy rows packed into content blobs per transaction
+PACK_CHUNK_SIZE = 500
+
+
+def _columns(conn: Connection, table: str) -> list[str]:
+    # table_xinfo also lists generated columns (hidden 2/3); hidden 1 are
+    # a virtual table's own (FTS5 table name and rank)
+    return [row[1] for row in conn.execute(text(f"PRAGMA table_xinfo({table})")) if row[6] != 1]
+
+
+def _column_ddl(column: Column, conn: Connection) -> str:
+    """ALTER TABLE ... ADD COLUMN definition for a model column."""
+    ddl = f"{column.name} {column.type.compile(dialect=conn.dialect)}"
+    if column.computed is not None:
+        # SQLite can only add virtual generated columns to an existing table
+        return f"{ddl} GENERATED ALWAYS AS ({column.computed.sqltext}) VIRTUAL"
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        if isinstance(default, bool):
+            default = int(default)
+        literal = f"'{default}'" if isinstance(default, str) else default
+        ddl += f" NOT NULL DEFAULT {literal}" if not column.nullable else f" DEFAULT {literal}"
+    return ddl
+
+
+def _add_missing_columns(conn: Connection, table: Table) -> None:
+    existing = set(_columns(conn, table.name))
+    for column in table.columns:
+        if column.name not in existing:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, conn)}"))
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def _pack_legacy_content(engine: Engine) -> None:
+    """
+    Move text from the pre-blob raw_preview/full_content/thread_content
+    columns into content_blobs, then drop the columns. Rows already packed
+    are skipped, so an interrupted run resumes where it stopped.
+    """
+    with engine.connect() as conn:
+        legacy = [name for name in CONTENT_FIELDS if name in _columns(conn, SavedItem.__tablename__)]
+    if not legacy:
+        return
+
+    select_rows = text(
+        f"SELECT id, {', '.join(legacy)} FROM {SavedItem.__tablename__} "
+        f"WHERE content_ref IS NULL AND id > :last_id ORDER BY id LIMIT :limit"
+    )
+    set_content = (
+        update(SavedItem.__table__)
+        .where(SavedItem.__table__.c.id == bindparam("item_id"))
+        .values(content_ref=bindparam("content_ref"), content_spans=bindparam("content_spans"))
+    )
+    packed = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select_rows, {"last_id": last_id, "limit": PACK_CHUNK_SIZE}).all()
+            if not rows:
+                break
+            blobs = {}
+            params = []
+            for row in rows:
+                content, spans = pack_content(dict(zip(legacy, row[1:])))
+                if content is None:
+                    continue
+                content_ref = compute_content_hash(content)
+                blobs[content_ref] = content
+                params.append({"item_id": row[0], "content_ref": content_ref, "content_spans": spans})
+            store_content(conn, blobs)
+            if params:
+                conn.execute(set_content, params)
+            packed += len(params)
+            last_id = rows[-1][0]
+
+    with engine.begin() as conn:
+        for name in legacy:
+            conn.execute(text(f"ALTER TABLE {SavedItem.__tablename__} DROP COLUMN {name}"))
+    logger.info("Moved content of %d items into content_blobs; dropped %s", packed, ", ".join(legacy))
+
+
+def migrate_database(engine: Engine) -> None:
+    """
+    Bring a database created by an older version up to the current models.
+    Run after Base.metadata.create_all() (which creates missing tables but
+    never alters existing ones) and before create_search_index(). Every
+    step checks the live schema first, so this is a no-op on an up-to-date
+    database and safe to re-run after an interrupted start.
+
+    - saved_items and processing_jobs get the models' new columns,
+      generated columns included
+    - legacy content columns are packed into content_blobs and dropped
+    - stale indexes are dropped and missing ones created
+    - an item_search table with an older column set is dropped, so
+      create_search_index() recreates and refills it
+    """
+    table = SavedItem.__table__
+    with engine.begin() as conn:
+        _add_missing_columns(conn, table)
+        _add_missing_columns(conn, ProcessingJob.__table__)
+
+    _pack_legacy_content(engine)
+
+    with engine.begin() as conn:
+        for name in DROPPED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+        search_columns = _columns(conn, SEARCH_TABLE)
+        if search_columns and tuple(search_columns) != INDEXED_COLUMNS:
+            conn.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+            logger.info("Dropped %s with columns %s; it is rebuilt on start", SEARCH_TABLE, search_columns)
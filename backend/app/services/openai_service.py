@@ -1,80 +1,287 @@
 import asyncio
 from openai import AsyncOpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from openai import RateLimitError, APIConnectionError, APITimeoutError
+from openai import RateLimitError, APIConnectionError, APITimeoutError, BadRequestError
 
 from app.core.config import settings
+from app.core.metrics import record_retry, span
+from app.services.rate_limiter import get_rate_limiter
+from app.services.clients import app_clients
+from app.services.tokens import get_tokenizer, token_usage
 
 
 SUMMARY_PROMPT = "Summarize this content in 1-2 sentences, capturing the key insight."
+SUMMARY_MAX_TOKENS = 150
 
 
 class OpenAIService:
+    """
+    OpenAI calls with token budgeting: inputs are truncated to
+    MAX_CONTENT_TOKENS with the model's tokenizer, rate limits are charged
+    the counted tokens, and billed usage is recorded in token_usage (and
+    in the caller's per-item `usage` dict when one is passed).
+    """
+
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.embedding_model = settings.OPENAI_EMBEDDING_MODEL
         self.summary_model = settings.OPENAI_SUMMARY_MODEL
-        self.max_content_length = settings.MAX_CONTENT_LENGTH
-        self.rate_limit_delay = settings.RATE_LIMIT_DELAY
+        self.max_content_tokens = settings.MAX_CONTENT_TOKENS
+        self.summary_limiter = get_rate_limiter(self.summary_model)
+        self.embedding_limiter = get_rate_limiter(self.embedding_model)
+        self.summary_tokenizer = get_tokenizer(self.summary_model)
+        self.embedding_tokenizer = get_tokenizer(self.embedding_model)
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The app-scoped client, so every service instance shares one connection pool."""
+        return app_clients.openai()
+
+    def _truncate_content(self, content: str, tokenizer=None) -> tuple[str, int]:
+        """
+        Truncate content to MAX_CONTENT_TOKENS tokens (embedding tokenizer by
+        default). Returns (truncated content, its token count).
+        """
+        return (tokenizer or self.embedding_tokenizer).fit(content, self.max_content_tokens)
 
-    def _truncate_content(self, content: str) -> str:
-        """Truncate content to max length."""
-        if len(content) > self.max_content_length:
-            return content[:self.max_content_length] + "..."
-        return content
+    def prepare_embedding_input(self, text: str) -> tuple[str, int]:
+        """Text as sent for embedding, and the tokens it is billed for."""
+        return self._truncate_content(text)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError))
+        retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError)),
+        before_sleep=record_retry("openai_summary")
     )
-    async def generate_summary(self, content: str) -> str:
-        """Generate a summary for the given content."""
-        truncated_content = self._truncate_content(content)
-
-        response = await self.client.chat.completions.create(
-            model=self.summary_model,
-            messages=[
-                {"role": "system", "content": SUMMARY_PROMPT},
-                {"role": "user", "content": truncated_content}
-            ],
-            max_tokens=150,
-            temperature=0.3
+    async def generate_summary(self, content: str, usage: dict | None = None) -> str:
+        """
+        Generate a summary for the given content.
+        Prompt/completion tokens are added to `usage` if given.
+        """
+        truncated_content, content_tokens = self._truncate_content(content, self.summary_tokenizer)
+
+        await self.summary_limiter.acquire(
+            self.summary_tokenizer.count(SUMMARY_PROMPT) + content_tokens + SUMMARY_MAX_TOKENS
         )
+        try:
+            with span("openai_summary"):
+                raw = await self.client.chat.completions.with_raw_response.create(
+                    model=self.summary_model,
+                    messages=[
+                        {"role": "system", "content": SUMMARY_PROMPT},
+                        {"role": "user", "content": truncated_content}
+                    ],
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                    temperature=0.3
+                )
+        except RateLimitError as e:
+            self.summary_limiter.on_rate_limited(e.response.headers)
+            raise
 
-        await asyncio.sleep(self.rate_limit_delay)
+        self.summary_limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        if response.usage is not None:
+            token_usage.record(
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens
+            )
+            if usage is not None:
+                usage["prompt_tokens"] += response.usage.prompt_tokens
+                usage["completion_tokens"] += response.usage.completion_tokens
         return response.choices[0].message.content.strip()
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError))
+        retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError)),
+        before_sleep=record_retry("openai_embedding")
     )
     async def generate_embedding(self, text: str) -> list[float]:
         """Generate embedding vector for the given text."""
-        truncated_text = self._truncate_content(text)
+        truncated_text, tokens = self._truncate_content(text)
 
-        response = await self.client.embeddings.create(
-            model=self.embedding_model,
-            input=truncated_text
-        )
+        await self.embedding_limiter.acquire(tokens)
+        try:
+            with span("openai_embedding"):
+                raw = await self.client.embeddings.with_raw_response.create(
+                    model=self.embedding_model,
+                    input=truncated_text
+                )
+        except RateLimitError as e:
+            self.embedding_limiter.on_rate_limited(e.response.headers)
+            raise
 
-        await asyncio.sleep(self.rate_limit_delay)
+        self.embedding_limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        self._record_embedding_usage(response)
         return response.data[0].embedding
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError)),
+        before_sleep=record_retry("openai_embedding")
+    )
+    async def generate_embeddings_batch(
+        self,
+        texts: list[str],
+        token_counts: list[int] | None = None
+    ) -> list[list[float]]:
+        """
+        Generate embedding vectors for many texts in one request.
+        Returns vectors in the same order as `texts`.
+
+        With token_counts, texts are taken as already prepared (see
+        prepare_embedding_input) and are not encoded again.
+        """
+        if token_counts is None:
+            prepared = [self._truncate_content(text) for text in texts]
+            truncated_texts = [text for text, _ in prepared]
+            token_counts = [tokens for _, tokens in prepared]
+        else:
+            truncated_texts = texts
+
+        await self.embedding_limiter.acquire(sum(token_counts))
+        try:
+            with span("openai_embedding"):
+                raw = await self.client.embeddings.with_raw_response.create(
+                    model=self.embedding_model,
+                    input=truncated_texts
+                )
+        except RateLimitError as e:
+            self.embedding_limiter.on_rate_limited(e.response.headers)
+            raise
+
+        self.embedding_limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        self._record_embedding_usage(response)
+        # The API reports each vector's input position; don't rely on order
+        vectors = [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
+        if len(vectors) != len(texts):
+            raise ValueError(f"Embeddings response has {len(vectors)} vectors for {len(texts)} inputs")
+        return vectors
+
+    def _record_embedding_usage(self, response) -> None:
+        if response.usage is not None:
+            token_usage.record(embedding_tokens=response.usage.prompt_tokens)
+
     async def generate_embedding_for_item(self, summary: str, content: str) -> list[float]:
         """
         Generate embedding for an item.
         Combines summary + original content for richer semantic representation.
         """
-        combined_text = f"{summary}\n\n{content}"
-        return await self.generate_embedding(combined_text)
+        return await self.generate_embedding(build_item_embedding_text(summary, content))
 
     async def generate_query_embedding(self, query: str) -> list[float]:
         """Generate embedding for a search query."""
         return await self.generate_embedding(query)
 
 
+def build_item_embedding_text(summary: str, content: str) -> str:
+    """Text embedded for an item: summary + original content."""
+    return f"{summary}\n\n{content}"
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching layer over generate_embeddings_batch.
+
+    Concurrent `embed()` calls are collected until the batch reaches
+    EMBEDDING_BATCH_SIZE texts or EMBEDDING_BATCH_MAX_TOKENS tokens, or EMBEDDING_BATCH_WAIT_MS passes, then sent as one request.
+    If the API rejects a batch, it is split in halves so only the
+    offending texts fail.
+    """
+
+    def __init__(self, service: OpenAIService):
+        self.service = service
+        self.max_batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.max_batch_tokens = settings.EMBEDDING_BATCH_MAX_TOKENS
+        self.max_wait = settings.EMBEDDING_BATCH_WAIT_MS / 1000
+        self._pending: list[tuple[str, int, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def embed(self, text: str, usage: dict | None = None) -> list[float]:
+        """
+        Queue a text for the next batch and wait for its vector.
+        The text's share of the batch's tokens is added to `usage` if given.
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Truncated and counted once here; the batch request reuses both
+        text, tokens = self.service.prepare_embedding_input(text)
+
+        if self._pending and (
+            len(self._pending) >= self.max_batch_size or
+            self._pending_tokens + tokens > self.max_batch_tokens
+        ):
+            self._flush()
+
+        self._pending.append((text, tokens, future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+        vector = await future
+        if usage is not None:
+            usage["embedding_tokens"] += tokens
+        return vector
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, int, asyncio.Future]]) -> None:
+        try:
+            vectors = await self.service.generate_embeddings_batch(
+                [text for text, _, _ in batch], [tokens for _, tokens, _ in batch]
+            )
+        except BadRequestError as e:
+            if len(batch) == 1:
+                _set_exception(batch[0][2], e)
+                return
+            middle = len(batch) // 2
+            await asyncio.gather(self._send(batch[:middle]), self._send(batch[middle:]))
+            return
+        except Exception as e:
+            for _, _, future in batch:
+                _set_exception(future, e)
+            return
+
+        for (_, _, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+        # Never leave a caller waiting on a vector that did not come back
+        missing = ValueError(f"Embedding batch returned {len(vectors)} vectors for {len(batch)} texts")
+        for _, _, future in batch[len(vectors):]:
+            _set_exception(future, missing)
+
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+
 def get_openai_service() -> OpenAIService:
     """Factory function to get OpenAI service instance."""
     return OpenAIService()
+
+
+_embedding_batcher: EmbeddingBatcher | None = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Get the process-wide embedding batcher shared by processing workers."""
+    global _embedding_batcher
+    if _embedding_batcher is None:
+        _embedding_batcher = EmbeddingBatcher(OpenAIService())
+    return _embedding_batcher
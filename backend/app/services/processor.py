@@ -1,18 +1,27 @@
 import asyncio
-import hashlib
+import logging
+import time
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, func, update
+from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
 from app.core.config import settings
+from app.core.metrics import ITEMS, PROCESSING_STAGE_SECONDS, QUEUE_JOBS
+from app.core.writer import write_lane
 from app.models.item import SavedItem
-from app.services.openai_service import OpenAIService
-from app.services.vector_service import VectorService
+from app.services.openai_service import get_openai_service, get_embedding_batcher, build_item_embedding_text
+from app.services.vector_service import get_vector_service, get_vector_upsert_batcher
+from app.services.chunking import chunk_text
+from app.services.content_cache import content_cache
+from app.services.content_store import compute_content_hash
+from app.services.clients import app_clients
+from app.services.tokens import USAGE_KINDS, empty_usage, token_usage
+from app.services.search_index import index_items
+from app.services.work_queue import enqueue_items, get_queue_depth, work_queue
 
 
-def compute_content_hash(content: str) -> str:
-    """Compute SHA-256 hash of content for change detection."""
-    return hashlib.sha256(content.encode()).hexdigest()
+logger = logging.getLogger(__name__)
 
 
 def get_best_content(item: SavedItem) -> str | None:
@@ -26,141 +35,294 @@ def get_best_content(item: SavedItem) -> str | None:
         return item.full_content
     if item.raw_preview:
         return item.raw_preview
-    if item.extra_data:
-        # Try article fields
-        title = item.extra_data.get("article_title", "")
-        description = item.extra_data.get("article_description", "")
-        if title or description:
-            return f"{title}\n{description}".strip()
+    # Article fields, read from their generated columns (extra_data stays undecoded)
+    title = item.article_title or ""
+    description = item.article_description or ""
+    if title or description:
+        return f"{title}\n{description}".strip()
     return None
 
 
-async def process_item(item_id: int) -> dict:
+# Pipeline stages, in order. An item whose summary survived an earlier
+# run (unchanged content) resumes at "embedding", and one whose item
+# vector did too resumes at "chunks".
+STAGES = ("summary", "embedding", "vector_upsert", "chunks")
+
+# Error prefixes for stages after the summary, which is kept when they fail
+STAGE_FAILURES = {
+    "embedding": "Embedding generation failed",
+    "vector_upsert": "Vector upsert failed",
+    "chunks": "Chunk embedding failed",
+}
+
+
+class ItemRun:
     """
-    Process a single item: generate summary and embedding.
-    Creates fresh database session for background task safety.
+    State of one item moving through the stages.
 
-    Returns dict with processing results.
+    Stages only fill in `values`; the item row is written once when the run
+    finishes, and that write is group-committed with other items' writes by
+    the write lane. AI output is checkpointed in the content cache as soon
+    as it is paid for, so a crash (the job is re-queued on restart) resumes
+    from the cache instead of calling OpenAI again.
+    """
+
+    def __init__(self, item: SavedItem):
+        self.item_id = item.id
+        self.content = get_best_content(item)
+        self.content_hash = compute_content_hash(self.content) if self.content else None
+        self.source_url = item.source_url
+        self.content_type = item.content_type
+        self.chunk_count = item.chunk_count
+        self.values: dict = {"content_hash": self.content_hash, "processing_error": None}
+        self.summary: str | None = None
+        self.embedding: list[float] | None = None
+        self.cached_summary: str | None = None
+        self.cached_embedding: list[float] | None = None
+        self.usage = empty_usage()  # Tokens billed during this run
+
+        unchanged = self.content_hash is not None and item.content_hash == self.content_hash
+        summarized = unchanged and item.summary_status == "completed" and item.summary
+        embedded = summarized and item.embedding_status == "completed"
+        if embedded and item.chunk_status != "completed":
+            # Only the chunks failed (or predate chunking): redo just those
+            self.stage = "chunks"
+        elif summarized:
+            # Partial success last time: keep the summary, redo the rest
+            self.summary = item.summary
+            self.stage = "embedding"
+        else:
+            self.stage = "summary"
+        self.skip = bool(embedded) and item.chunk_status == "completed"
+
+    def fail(self, status_columns: tuple[str, ...], error: str) -> None:
+        for column in status_columns:
+            self.values[column] = "failed"
+        self.values["processing_error"] = error
+
+
+def _update_item(db: Session, item_id: int, values: dict) -> None:
+    """Write lane helper: set columns on one item. Does not commit."""
+    db.execute(update(SavedItem).where(SavedItem.id == item_id).values(**values))
+
+
+def _finish_item(db: Session, run: ItemRun) -> None:
+    """
+    Write lane helper: the run's single item write (token counters are
+    added to the item's totals), the keyword index update for a new
+    summary, plus cache recency. Does not commit.
     """
-    openai_service = OpenAIService()
-    vector_service = VectorService()
+    values = dict(run.values)
+    for kind in USAGE_KINDS:
+        if run.usage[kind]:
+            values[kind] = getattr(SavedItem, kind) + run.usage[kind]
+    _update_item(db, run.item_id, values)
+    if "summary" in values:
+        index_items(db, [run.item_id])
+    if run.cached_summary is not None or run.cached_embedding is not None:
+        content_cache.touch(db, run.content_hash)
+
+
+def _checkpoint(fn, *args) -> None:
+    """Queue a cache write without waiting for its commit."""
+    future = write_lane.submit(fn, *args)
+    future.add_done_callback(_log_checkpoint_failure)
+
+
+def _log_checkpoint_failure(future) -> None:
+    if future.exception() is not None:
+        logger.warning("Cache checkpoint failed: %s", future.exception())
 
+
+def _start_run(item_id: int) -> ItemRun | None:
+    """Read the item and any cached AI output for it, or None if it is missing."""
     with SessionLocal() as db:
         item = db.get(SavedItem, item_id)
         if not item:
-            return {"success": False, "error": "Item not found"}
-
-        content = get_best_content(item)
-        if not content:
-            item.summary_status = "failed"
-            item.embedding_status = "failed"
-            item.processing_error = "No content available for processing"
-            db.commit()
-            return {"success": False, "error": "No content available"}
-
-        content_hash = compute_content_hash(content)
-
-        # Check if content has changed (smart reprocess)
-        if item.content_hash == content_hash and item.summary_status == "completed":
-            # Content unchanged and already processed
-            return {"success": True, "skipped": True, "reason": "Content unchanged"}
-
-        item.content_hash = content_hash
-        item.summary_status = "processing"
-        item.embedding_status = "processing"
-        item.processing_error = None
-        db.commit()
+            return None
+
+        run = ItemRun(item)
+        if run.content and not run.skip:
+            # Lookups only; recency is bumped by the final write
+            if run.stage == "summary":
+                run.cached_summary = content_cache.get_summary(
+                    db, run.content_hash, settings.OPENAI_SUMMARY_MODEL, touch=False
+                )
+            run.cached_embedding = content_cache.get_embedding(
+                db, run.content_hash, settings.OPENAI_EMBEDDING_MODEL, touch=False
+            )
+        return run
 
-        summary = None
-        embedding_id = None
 
-        # Step 1: Generate summary
-        try:
-            summary = await openai_service.generate_summary(content)
-            item.summary = summary
-            item.summary_model = settings.OPENAI_SUMMARY_MODEL
-            item.summary_status = "completed"
-            db.commit()
-        except Exception as e:
-            item.summary_status = "failed"
-            item.processing_error = f"Summary generation failed: {str(e)}"
-            item.embedding_status = "failed"
-            db.commit()
-            return {"success": False, "error": str(e), "stage": "summary"}
+def _select_unprocessed_ids() -> list[int]:
+    with SessionLocal() as db:
+        query = select(SavedItem.id).where(
+            (SavedItem.summary_status.in_(["pending", "failed"])) |
+            (SavedItem.embedding_status.in_(["pending", "failed"])) |
+            (SavedItem.chunk_status.in_(["pending", "failed"]))
+        )
+        return db.execute(query).scalars().all()
+
+
+async def _run_summary_stage(run: ItemRun, openai_service) -> None:
+    summary = run.cached_summary
+    if summary is None:
+        summary = await openai_service.generate_summary(run.content, usage=run.usage)
+        _checkpoint(content_cache.put_summary, run.content_hash, settings.OPENAI_SUMMARY_MODEL, summary)
+    run.summary = summary
+    run.values.update(
+        summary=summary,
+        summary_model=settings.OPENAI_SUMMARY_MODEL,
+        summary_status="completed"
+    )
+
+
+async def _run_embedding_stage(run: ItemRun) -> None:
+    embedding = run.cached_embedding
+    if embedding is None:
+        # Batched with concurrently processed items (see EmbeddingBatcher)
+        embedding = await get_embedding_batcher().embed(
+            build_item_embedding_text(run.summary, run.content), usage=run.usage
+        )
+        _checkpoint(content_cache.put_embedding, run.content_hash, settings.OPENAI_EMBEDDING_MODEL, embedding)
+    run.embedding = embedding
 
-        # Step 2: Generate embedding (even if Supabase fails, we keep the summary)
-        try:
-            embedding = await openai_service.generate_embedding_for_item(summary, content)
-
-            # Step 3: Store in Supabase
-            try:
-                embedding_id = vector_service.upsert_embedding(
-                    neurolink_item_id=item.id,
-                    source_url=item.source_url,
-                    content_type=item.content_type,
-                    content=content,
-                    embedding=embedding
-                )
-                item.embedding_id = embedding_id
-                item.embedding_status = "completed"
-            except Exception as e:
-                # Supabase failed, but we still have the summary
-                item.embedding_status = "failed"
-                item.processing_error = f"Supabase upsert failed: {str(e)}"
 
-        except Exception as e:
-            item.embedding_status = "failed"
-            if item.processing_error:
-                item.processing_error += f"; Embedding generation failed: {str(e)}"
-            else:
-                item.processing_error = f"Embedding generation failed: {str(e)}"
+async def _run_vector_upsert_stage(run: ItemRun) -> None:
+    # Bulk-written with concurrently processed items (see VectorUpsertBatcher)
+    embedding_id = await get_vector_upsert_batcher().upsert(
+        neurolink_item_id=run.item_id,
+        source_url=run.source_url,
+        content_type=run.content_type,
+        content=run.content,
+        embedding=run.embedding
+    )
+    run.values.update(embedding_id=embedding_id, embedding_status="completed")
 
-        item.processed_at = datetime.utcnow()
-        db.commit()
 
-        return {
-            "success": item.summary_status == "completed",
-            "summary_status": item.summary_status,
-            "embedding_status": item.embedding_status,
-            "embedding_id": embedding_id
-        }
+async def _run_chunk_stage(run: ItemRun) -> None:
+    """
+    Embed long content as overlapping chunks so search can match passages
+    past the item vector's truncated text. Content that fits in one chunk
+    is covered by the item vector; any chunks it had before are removed.
+    """
+    # Tokenizing long content takes a while; keep it off the event loop
+    chunks = await asyncio.to_thread(chunk_text, run.content) if settings.CHUNKING_ENABLED else []
+    if len(chunks) <= 1:
+        chunks = []
+    if not chunks and not run.chunk_count:
+        run.values["chunk_status"] = "completed"
+        return
+
+    # Each chunk joins the shared embedding batches
+    batcher = get_embedding_batcher()
+    embeddings = await asyncio.gather(*(batcher.embed(chunk.text, usage=run.usage) for chunk in chunks))
+    stored = await asyncio.to_thread(
+        get_vector_service().replace_chunks,
+        run.item_id,
+        [
+            {
+                "chunk_index": chunk.index,
+                "start_offset": chunk.start,
+                "end_offset": chunk.end,
+                "embedding": embedding
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+    )
+    run.values.update(chunk_count=stored, chunk_status="completed")
 
 
-async def process_all_pending() -> dict:
+async def process_item(item_id: int) -> dict:
     """
-    Process all items with pending or failed status.
-    Returns stats about the processing run.
+    Process a single item through the summary -> embedding -> vector upsert
+    -> chunks stages (see ItemRun). Blocking reads and vector store calls run in
+    worker threads and writes go through the write lane, so the event loop
+    only ever waits on OpenAI.
+
+    Returns dict with processing results.
     """
-    processed = 0
-    failed = 0
-    skipped = 0
+    openai_service = get_openai_service()
+    started = time.perf_counter()
+
+    run = await asyncio.to_thread(_start_run, item_id)
+    if run is None:
+        return {"success": False, "error": "Item not found"}
+
+    if not run.content:
+        await write_lane.run(_update_item, item_id, {
+            "summary_status": "failed",
+            "embedding_status": "failed",
+            "chunk_status": "failed",
+            "processing_error": "No content available for processing"
+        })
+        return {"success": False, "error": "No content available"}
+
+    # Check if content has changed (smart reprocess)
+    if run.skip:
+        # Content unchanged and already processed
+        return {"success": True, "skipped": True, "reason": "Content unchanged"}
+
+    # Visible to stats/UI; queued, not awaited: the lane keeps writes in order
+    if run.stage == "chunks":
+        in_progress = {"chunk_status": "processing"}
+    else:
+        in_progress = {"embedding_status": "processing"}
+        if run.stage == "summary":
+            in_progress["summary_status"] = "processing"
+    _checkpoint(_update_item, item_id, in_progress)
+
+    for stage in STAGES[STAGES.index(run.stage):]:
+        stage_started = time.perf_counter()
+        try:
+            if stage == "summary":
+                await _run_summary_stage(run, openai_service)
+            elif stage == "embedding":
+                await _run_embedding_stage(run)
+            elif stage == "vector_upsert":
+                await _run_vector_upsert_stage(run)
+            else:
+                await _run_chunk_stage(run)
+        except Exception as e:
+            if stage == "summary":
+                run.fail(("summary_status", "embedding_status"), f"Summary generation failed: {str(e)}")
+                await write_lane.run(_finish_item, run)
+                return {"success": False, "error": str(e), "stage": "summary"}
+            # Later stages keep the summary; a chunk failure also keeps the
+            # stored item vector, so only the chunks are retried
+            failed_status = "chunk_status" if stage == "chunks" else "embedding_status"
+            run.fail((failed_status,), f"{STAGE_FAILURES[stage]}: {str(e)}")
+            break
+        PROCESSING_STAGE_SECONDS.observe(time.perf_counter() - stage_started, stage=stage)
+
+    run.values["processed_at"] = datetime.utcnow()
+    await write_lane.run(_finish_item, run)
+    PROCESSING_STAGE_SECONDS.observe(time.perf_counter() - started, stage="total")
 
-    with SessionLocal() as db:
-        # Get all items that need processing
-        query = select(SavedItem).where(
-            (SavedItem.summary_status.in_(["pending", "failed"])) |
-            (SavedItem.embedding_status.in_(["pending", "failed"]))
-        )
-        items = db.execute(query).scalars().all()
-        item_ids = [item.id for item in items]
-
-    for item_id in item_ids:
-        result = await process_item(item_id)
-        if result.get("skipped"):
-            skipped += 1
-        elif result.get("success"):
-            processed += 1
-        else:
-            failed += 1
+    return {
+        "success": True,
+        "summary_status": "completed",
+        "embedding_status": run.values.get("embedding_status", "completed"),
+        "chunk_status": run.values.get("chunk_status", "pending"),
+        "embedding_id": run.values.get("embedding_id")
+    }
 
-        # Rate limiting between items
-        await asyncio.sleep(settings.RATE_LIMIT_DELAY)
+
+async def process_all_pending() -> dict:
+    """
+    Queue all items with pending or failed status for processing.
+    The work queue's worker pool picks them up.
+    Returns stats about the queued run.
+    """
+    # Get all items that need processing
+    item_ids = await asyncio.to_thread(_select_unprocessed_ids)
+    queued = await write_lane.run(enqueue_items, item_ids)
+
+    work_queue.notify()
 
     return {
         "total": len(item_ids),
-        "processed": processed,
-        "failed": failed,
-        "skipped": skipped
+        "queued": queued
     }
 
 
@@ -172,7 +334,8 @@ def reset_failed_items() -> int:
     with SessionLocal() as db:
         query = select(SavedItem).where(
             (SavedItem.summary_status == "failed") |
-            (SavedItem.embedding_status == "failed")
+            (SavedItem.embedding_status == "failed") |
+            (SavedItem.chunk_status == "failed")
         )
         items = db.execute(query).scalars().all()
 
@@ -182,6 +345,8 @@ def reset_failed_items() -> int:
                 item.summary_status = "pending"
             if item.embedding_status == "failed":
                 item.embedding_status = "pending"
+            if item.chunk_status == "failed":
+                item.chunk_status = "pending"
             item.processing_error = None
             count += 1
 
@@ -189,32 +354,76 @@ def reset_failed_items() -> int:
         return count
 
 
-def get_processing_stats() -> dict:
-    """Get processing statistics."""
-    with SessionLocal() as db:
-        total = db.execute(select(SavedItem)).scalars().all()
+def _status_counts(db: Session) -> tuple[int, dict[str, int], dict[str, int]]:
+    """Total items plus summary and embedding counts by status, from one GROUP BY over the status index."""
+    rows = db.execute(
+        select(SavedItem.summary_status, SavedItem.embedding_status, func.count())
+        .group_by(SavedItem.summary_status, SavedItem.embedding_status)
+    ).all()
 
-        summary_stats = {
-            "pending": 0,
-            "processing": 0,
-            "completed": 0,
-            "failed": 0
-        }
-        embedding_stats = {
-            "pending": 0,
-            "processing": 0,
-            "completed": 0,
-            "failed": 0
-        }
+    summary_stats = {
+        "pending": 0,
+        "processing": 0,
+        "completed": 0,
+        "failed": 0
+    }
+    embedding_stats = {
+        "pending": 0,
+        "processing": 0,
+        "completed": 0,
+        "failed": 0
+    }
+
+    total = 0
+    for summary_status, embedding_status, count in rows:
+        total += count
+        if summary_status in summary_stats:
+            summary_stats[summary_status] += count
+        if embedding_status in embedding_stats:
+            embedding_stats[embedding_status] += count
+    return total, summary_stats, embedding_stats
 
-        for item in total:
-            if item.summary_status in summary_stats:
-                summary_stats[item.summary_status] += 1
-            if item.embedding_status in embedding_stats:
-                embedding_stats[item.embedding_status] += 1
+
+def get_processing_stats() -> dict:
+    """
+    Get processing statistics.
+    Status counts come from one GROUP BY over the status index; throughput,
+    queue depth and stage latency come from the worker pool. Token usage
+    is reported for this run (since startup, with throughput and a
+    backlog estimate) and in total over all items.
+    """
+    with SessionLocal() as db:
+        total, summary_stats, embedding_stats = _status_counts(db)
+        queue = get_queue_depth(db)
+        token_totals = db.execute(
+            select(*(func.coalesce(func.sum(getattr(SavedItem, kind)), 0) for kind in USAGE_KINDS))
+        ).one()
 
         return {
-            "total_items": len(total),
+            "total_items": total,
             "summary": summary_stats,
-            "embedding": embedding_stats
+            "embedding": embedding_stats,
+            "progress": work_queue.progress.snapshot(queued=queue["queued"]),
+            "queue": queue,
+            "stage_latency_ms": {
+                stage: round(mean * 1000, 2) for (stage,), mean in PROCESSING_STAGE_SECONDS.means().items()
+            },
+            "cache": content_cache.stats(db),
+            "connections": app_clients.stats(),
+            "tokens": {
+                "run": token_usage.snapshot(items=work_queue.progress.completed, queued=queue["queued"]),
+                "total": dict(zip(USAGE_KINDS, token_totals))
+            }
         }
+
+
+def update_metric_gauges() -> None:
+    """Set the item status and job queue gauges from the database (called per /metrics scrape)."""
+    with SessionLocal() as db:
+        _, summary_stats, embedding_stats = _status_counts(db)
+        queue = get_queue_depth(db)
+    for kind, counts in (("summary", summary_stats), ("embedding", embedding_stats)):
+        for status, count in counts.items():
+            ITEMS.set(count, kind=kind, status=status)
+    for state, count in queue.items():
+        QUEUE_JOBS.set(count, state=state)
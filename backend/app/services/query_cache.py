@@ -0,0 +1,123 @@
+import hashlib
+import time
+from collections import OrderedDict, deque
+from datetime import timedelta
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.writer import write_lane
+from app.services.content_cache import content_cache
+from app.services.openai_service import OpenAIService
+
+
+# Latency percentiles are computed over the most recent lookups
+LATENCY_SAMPLES = 1000
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivially different spellings share an entry."""
+    return " ".join(query.casefold().split())
+
+
+def _latency_summary(samples: deque) -> dict:
+    if not samples:
+        return {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU/TTL cache of search query embeddings.
+
+    Keyed by normalized query text and embedding model. With
+    QUERY_CACHE_PERSIST enabled, entries are also written to the local
+    ai_cache table so they survive restarts.
+    """
+
+    def __init__(self):
+        self.max_entries = settings.QUERY_CACHE_MAX_ENTRIES
+        self.ttl = settings.QUERY_CACHE_TTL_SECONDS
+        self.persist = settings.QUERY_CACHE_PERSIST
+        self._entries: OrderedDict[tuple[str, str], tuple[float, list[float]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._hit_latency: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._miss_latency: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def _lookup(self, key: tuple[str, str]) -> list[float] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, embedding = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return embedding
+
+    def _store(self, key: tuple[str, str], embedding: list[float]) -> None:
+        self._entries[key] = (time.monotonic(), embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load_persisted(self, query_hash: str, model: str) -> list[float] | None:
+        # Lookups touch last_used_at, so they go through the write lane too
+        return await write_lane.run(
+            content_cache.get_embedding, query_hash, model, kind="query", max_age=timedelta(seconds=self.ttl)
+        )
+
+    async def _save_persisted(self, query_hash: str, model: str, embedding: list[float]) -> None:
+        await write_lane.run(content_cache.put_embedding, query_hash, model, embedding, kind="query")
+
+    async def get_embedding(self, query: str, openai_service: OpenAIService) -> list[float]:
+        """Return the query's embedding, calling OpenAI only on a miss."""
+        start = time.perf_counter()
+        normalized = normalize_query(query)
+        model = openai_service.embedding_model
+        key = (normalized, model)
+
+        embedding = self._lookup(key)
+        if embedding is not None:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="query_embedding", result="hit")
+            self._hit_latency.append((time.perf_counter() - start) * 1000)
+            return embedding
+
+        query_hash = hashlib.sha256(normalized.encode()).hexdigest()
+        if self.persist:
+            embedding = await self._load_persisted(query_hash, model)
+
+        if embedding is None:
+            # Normalization only widens the cache key; embed what the user typed
+            embedding = await openai_service.generate_query_embedding(query)
+            if self.persist:
+                await self._save_persisted(query_hash, model, embedding)
+
+        self._store(key, embedding)
+        self.misses += 1
+        CACHE_REQUESTS.inc(cache="query_embedding", result="miss")
+        self._miss_latency.append((time.perf_counter() - start) * 1000)
+        return embedding
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persist": self.persist,
+            "hit_latency": _latency_summary(self._hit_latency),
+            "miss_latency": _latency_summary(self._miss_latency),
+        }
+
+
+# Process-wide cache shared by all search requests
+query_embedding_cache = QueryEmbeddingCache()
@@ -0,0 +1,144 @@
+import asyncio
+import re
+import time
+from typing import Mapping
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_HITS, RATE_LIMIT_WAIT_SECONDS, add_to_trace
+
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: str | None) -> float | None:
+    """Parse OpenAI reset durations like "1s", "6m0s" or "120ms" into seconds."""
+    if not value:
+        return None
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / self.capacity
+
+    def consume(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def sync(self, limit: float | None, remaining: float | None, now: float) -> None:
+        """Adopt the limit and remaining budget reported by the server."""
+        self._refill(now)
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute limiter.
+
+    Callers await `acquire()` with an estimated token count before each API
+    call. Budgets are corrected from the x-ratelimit-* response headers, and
+    a 429 pauses every caller until the reported reset.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, name: str = "default"):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until one request and `tokens` tokens fit in the budget."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.blocked_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now)
+                )
+                if wait <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    break
+                await asyncio.sleep(wait)
+
+        # Includes waiting behind other callers for the lock
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            RATE_LIMIT_WAIT_SECONDS.inc(waited, model=self.name)
+            add_to_trace("rate_limit_wait", waited)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync budgets with OpenAI's x-ratelimit-* headers."""
+        now = time.monotonic()
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = _header_float(headers, f"x-ratelimit-limit-{kind}")
+            remaining = _header_float(headers, f"x-ratelimit-remaining-{kind}")
+            bucket.sync(limit, remaining, now)
+
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining == 0 and reset:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    def on_rate_limited(self, headers: Mapping[str, str] | None) -> None:
+        """Pause all callers after a 429, honouring retry-after when given."""
+        RATE_LIMIT_HITS.inc(model=self.name)
+        headers = headers or {}
+        self.update_from_headers(headers)
+        retry_after = _header_float(headers, "retry-after-ms")
+        if retry_after is not None:
+            retry_after /= 1000
+        else:
+            retry_after = _header_float(headers, "retry-after") or 1.0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> float | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+_limiters: dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Get the process-wide limiter for a model (limits are per model)."""
+    if model not in _limiters:
+        if model == settings.OPENAI_EMBEDDING_MODEL:
+            limiter = RateLimiter(settings.OPENAI_EMBEDDING_RPM, settings.OPENAI_EMBEDDING_TPM, name=model)
+        else:
+            limiter = RateLimiter(settings.OPENAI_SUMMARY_RPM, settings.OPENAI_SUMMARY_TPM, name=model)
+        _limiters[model] = limiter
+    return _limiters[model]
@@ -0,0 +1,181 @@
+import re
+from datetime import datetime
+from sqlalchemy import text, bindparam, select, DateTime
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.models.content import ContentBlob, decode_text
+from app.models.item import SavedItem
+
+
+# FTS5 table over the searchable text of saved_items; rowid = saved_items.id.
+# "content" is the item's content blob text, so overlapping fields (preview,
+# tweet, thread) are indexed once.
+# unicode61 drops '@'/'#', so "@handle" and "#tag" match as the bare word.
+SEARCH_TABLE = "item_search"
+INDEXED_COLUMNS = ("content", "summary")
+
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    {", ".join(INDEXED_COLUMNS)},
+    tokenize="unicode61 remove_diacritics 2"
+)
+"""
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lists
+INDEX_CHUNK_SIZE = 500
+
+# Quoted phrases, or single terms (optionally with a trailing * for prefix match)
+QUERY_TERM_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+SNIPPET_TOKENS = 16
+
+
+# Item id, compressed content and summary of the rows to index
+INDEX_ROWS = (
+    select(SavedItem.id, ContentBlob.data, SavedItem.summary)
+    .outerjoin(ContentBlob, ContentBlob.content_hash == SavedItem.content_ref)
+)
+
+INSERT_ROW = text(
+    f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(INDEXED_COLUMNS)}) "
+    f"VALUES (:rowid, :content, :summary)"
+)
+
+
+def _insert_rows(connection: Connection | Session, rows) -> None:
+    """Decompress and index (id, data, summary) rows."""
+    params = [
+        {"rowid": item_id, "content": decode_text(data) if data is not None else None, "summary": summary}
+        for item_id, data, summary in rows
+    ]
+    if params:
+        connection.execute(INSERT_ROW, params)
+
+
+def _backfill(conn: Connection) -> None:
+    last_id = 0
+    while rows := conn.execute(
+        INDEX_ROWS.where(SavedItem.id > last_id).order_by(SavedItem.id).limit(INDEX_CHUNK_SIZE)
+    ).all():
+        _insert_rows(conn, rows)
+        last_id = rows[-1][0]
+
+
+def create_search_index(engine: Engine) -> None:
+    """
+    Create the FTS5 table if missing and fill it from saved_items when it
+    is empty but items exist, so existing databases get the index on first
+    start. SQLite commits the CREATE on its own, so a failed backfill drops
+    the table again rather than leaving an empty index behind.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_SEARCH_TABLE))
+        indexed = conn.execute(text(f"SELECT 1 FROM {SEARCH_TABLE} LIMIT 1")).first()
+        has_items = conn.execute(select(SavedItem.id).limit(1)).first()
+    if indexed or not has_items:
+        return
+
+    try:
+        with engine.begin() as conn:
+            _backfill(conn)
+    except Exception:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+        raise
+
+
+def index_items(db: Session, item_ids: list[int]) -> None:
+    """
+    Re-index items from their current saved_items rows and content blobs.
+    Call after writing them, in the same transaction. Does not commit.
+    """
+    delete = text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True))
+    for start in range(0, len(item_ids), INDEX_CHUNK_SIZE):
+        chunk = item_ids[start:start + INDEX_CHUNK_SIZE]
+        db.execute(delete, {"ids": chunk})
+        _insert_rows(db, db.execute(INDEX_ROWS.where(SavedItem.id.in_(chunk))).all())
+
+
+def to_match_query(query: str) -> str | None:
+    """
+    Turn user input into an FTS5 MATCH expression: every term and "quoted
+    phrase" must match (implicit AND); a trailing * on a term is a prefix
+    match. FTS5 operators are treated as plain text. None if no terms.
+    """
+    terms = []
+    for phrase, term in QUERY_TERM_PATTERN.findall(query):
+        prefix = False
+        if term:
+            prefix = term.endswith("*") and len(term) > 1
+            phrase = term.rstrip("*") if prefix else term
+        quoted = '"' + phrase.replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    return " ".join(terms) or None
+
+
+def keyword_search(
+    db: Session,
+    query: str,
+    limit: int = 10,
+    content_type: str | None = None,
+    after: datetime | None = None,
+    before: datetime | None = None
+) -> list[dict]:
+    """
+    BM25-ranked full-text search over item_search.
+    Returns match dicts, best first: neurolink_item_id, score (BM25;
+    lower is better) and a highlighted snippet.
+    """
+    match_query = to_match_query(query)
+    if match_query is None:
+        return []
+
+    conditions = [f"{SEARCH_TABLE} MATCH :query"]
+    params = {"query": match_query, "limit": limit}
+    if content_type or after or before:
+        join = f"JOIN saved_items ON saved_items.id = {SEARCH_TABLE}.rowid"
+        if content_type:
+            conditions.append("saved_items.content_type = :content_type")
+            params["content_type"] = content_type
+        if after:
+            conditions.append("saved_items.created_at >= :after")
+            params["after"] = after
+        if before:
+            conditions.append("saved_items.created_at <= :before")
+            params["before"] = before
+    else:
+        join = ""
+
+    stmt = text(
+        f"SELECT {SEARCH_TABLE}.rowid, bm25({SEARCH_TABLE}) AS score, "
+        f"snippet({SEARCH_TABLE}, -1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}) "
+        f"FROM {SEARCH_TABLE} {join} "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY score LIMIT :limit"
+    )
+    # Compare dates in the DateTime column's stored format
+    stmt = stmt.bindparams(*(bindparam(name, type_=DateTime) for name in ("after", "before") if name in params))
+    with span("keyword_search"):
+        rows = db.execute(stmt, params).all()
+
+    return [
+        {"neurolink_item_id": item_id, "score": score, "snippet": snippet}
+        for item_id, score, snippet in rows
+    ]
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int | None = None) -> list[tuple[int, float]]:
+    """
+    Fuse ranked lists of item IDs: each item scores sum(1 / (k + rank))
+    over the lists it appears in (rank starting at 1).
+    Returns (item_id, score) pairs, best first.
+    """
+    k = settings.SEARCH_RRF_K if k is None else k
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,174 @@
+import logging
+import time
+from collections import deque
+
+from app.core.metrics import OPENAI_TOKENS
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the ~4 chars/token estimate
+    tiktoken = None
+
+
+logger = logging.getLogger(__name__)
+
+# Fallback ratio when tiktoken (or its encoding files) is unavailable
+CHARS_PER_TOKEN = 4
+
+# Text is cut to this many characters per allowed token before encoding,
+# so truncating a long thread costs about as much as encoding max_tokens
+# (it runs on the event loop). Real text averages ~4 chars per token, so
+# the cut only binds on text that is over the token limit anyway.
+MAX_CHARS_PER_TOKEN = 8
+
+# Encoding for models tiktoken doesn't know yet
+DEFAULT_ENCODING = "cl100k_base"
+
+# Trailing window for tokens/min, like the pool's items/min
+THROUGHPUT_WINDOW_SECONDS = 300
+
+USAGE_KINDS = ("prompt_tokens", "completion_tokens", "embedding_tokens")
+
+
+def _load_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        # Encodings are downloaded on first use; offline that can fail
+        logger.warning("No tokenizer for %s, estimating tokens instead: %s", model, e)
+        return None
+
+
+class Tokenizer:
+    """
+    Token counting and truncation for one model.
+    Exact with tiktoken; otherwise an estimate of ~4 chars per token.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = _load_encoding(model)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def _encode(self, text: str) -> list[int]:
+        # Special-token text in user content is just text
+        return self._encoding.encode(text, disallowed_special=())
+
+    def count(self, text: str) -> int:
+        if self._encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(self._encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of text that fits in max_tokens."""
+        return self.fit(text, max_tokens)[0]
+
+    def fit(self, text: str, max_tokens: int) -> tuple[str, int]:
+        """
+        Truncate text to max_tokens and count the result, encoding it once
+        and at most max_tokens * MAX_CHARS_PER_TOKEN characters of it.
+        Returns (truncated text, its token count).
+        """
+        if self._encoding is None:
+            truncated = text[:max_tokens * CHARS_PER_TOKEN]
+            return truncated, -(-len(truncated) // CHARS_PER_TOKEN)
+        text = text[:max_tokens * MAX_CHARS_PER_TOKEN]
+        tokens = self._encode(text)
+        if len(tokens) <= max_tokens:
+            return text, len(tokens)
+        return self._encoding.decode(tokens[:max_tokens]), max_tokens
+
+    def offsets(self, text: str) -> list[int]:
+        """Character offset at which each token of text starts."""
+        if self._encoding is None:
+            return list(range(0, len(text), CHARS_PER_TOKEN))
+        _, offsets = self._encoding.decode_with_offsets(self._encode(text))
+        return offsets
+
+
+_tokenizers: dict[str, Tokenizer] = {}
+
+
+def get_tokenizer(model: str) -> Tokenizer:
+    """Get the process-wide tokenizer for a model."""
+    if model not in _tokenizers:
+        _tokenizers[model] = Tokenizer(model)
+    return _tokenizers[model]
+
+
+def preload_tokenizers(*models: str) -> None:
+    """
+    Load the tokenizers for models up front. tiktoken downloads encoding
+    files on first use, so call this in a thread at startup rather than
+    letting the first request do it on the event loop.
+    """
+    for model in models:
+        get_tokenizer(model)
+
+
+def empty_usage() -> dict[str, int]:
+    """Per-item token counters, filled in by OpenAIService calls."""
+    return {kind: 0 for kind in USAGE_KINDS}
+
+
+class TokenUsage:
+    """
+    Tokens billed since the process started, as reported by the API
+    (`usage` on each response), with trailing-window throughput.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.totals = empty_usage()
+        self.requests = 0
+        self._recent: deque[tuple[float, int]] = deque()
+
+    def record(self, prompt_tokens: int = 0, completion_tokens: int = 0, embedding_tokens: int = 0) -> None:
+        now = time.monotonic()
+        self.totals["prompt_tokens"] += prompt_tokens
+        self.totals["completion_tokens"] += completion_tokens
+        self.totals["embedding_tokens"] += embedding_tokens
+        self.requests += 1
+        for kind, tokens in (
+            ("prompt", prompt_tokens), ("completion", completion_tokens), ("embedding", embedding_tokens)
+        ):
+            if tokens:
+                OPENAI_TOKENS.inc(tokens, kind=kind)
+        self._recent.append((now, prompt_tokens + completion_tokens + embedding_tokens))
+        while self._recent and self._recent[0][0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self._recent.popleft()
+
+    def tokens_per_minute(self) -> float:
+        now = time.monotonic()
+        window = min(THROUGHPUT_WINDOW_SECONDS, now - self.started_at)
+        recent = sum(tokens for at, tokens in self._recent if at >= now - window)
+        return recent * 60 / window if window > 0 else 0.0
+
+    def snapshot(self, items: int = 0, queued: int | None = None) -> dict:
+        """
+        Totals and throughput; with the number of items processed so far,
+        also the average per item and an estimate for the queued backlog.
+        """
+        total = sum(self.totals.values())
+        per_item = total / items if items else None
+        snapshot = {
+            **self.totals,
+            "total_tokens": total,
+            "requests": self.requests,
+            "tokens_per_minute": round(self.tokens_per_minute(), 1),
+            "tokens_per_item": round(per_item, 1) if per_item is not None else None,
+        }
+        if queued is not None:
+            snapshot["backlog_tokens_estimate"] = round(queued * per_item) if per_item is not None else None
+        return snapshot
+
+
+token_usage = TokenUsage()
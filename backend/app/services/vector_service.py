@@ -1,29 +1,46 @@
 from datetime import datetime
-from supabase import create_client, Client
-from tenacity import retry, stop_after_attempt, wait_exponential
+import httpx
+from postgrest.exceptions import APIError
+from supabase import Client
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.core.config import settings
+from app.core.metrics import record_retry
+from app.services.clients import app_clients
+from app.services.vector_store import VectorStore, VectorUpsertBatcher, create_content_preview
+from app.services.local_vector_service import LocalVectorService
 
 
-CONTENT_PREVIEW_LENGTH = 500
+def _is_row_error(error: Exception) -> bool:
+    """
+    Whether a rejected upsert was caused by its rows (so splitting the batch
+    isolates them): a Postgres data exception or constraint violation, a
+    PostgREST request error, or a 4xx without a JSON error body. Transport
+    errors and 5xx mean the service is unavailable for every row.
+    """
+    if not isinstance(error, APIError):
+        return False
+    code = str(error.code or "")
+    if len(code) == 3 and code.isdigit():  # HTTP status of a non-JSON error
+        return code.startswith("4")
+    return code[:2] in ("22", "23") or code.startswith("PGRST1")
 
 
-class VectorService:
-    def __init__(self):
-        self.client: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY
-        )
+class VectorService(VectorStore):
+    """
+    Supabase pgvector backend: item_embeddings table + match_items RPC,
+    and item_chunk_embeddings + match_item_chunks RPC for long items.
+    """
 
-    def _create_content_preview(self, content: str) -> str:
-        """Create a content preview truncated to CONTENT_PREVIEW_LENGTH chars."""
-        if len(content) > CONTENT_PREVIEW_LENGTH:
-            return content[:CONTENT_PREVIEW_LENGTH] + "..."
-        return content
+    @property
+    def client(self) -> Client:
+        """The app-scoped Supabase client (pooled HTTP/2 connections)."""
+        return app_clients.supabase()
 
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        before_sleep=record_retry("supabase")
     )
     def upsert_embedding(
         self,
@@ -37,7 +54,7 @@ class VectorService:
         Upsert an embedding into Supabase.
         Returns the embedding ID.
         """
-        content_preview = self._create_content_preview(content)
+        content_preview = create_content_preview(content)
 
         data = {
             "neurolink_item_id": neurolink_item_id,
@@ -58,13 +75,116 @@ class VectorService:
 
         raise Exception("Failed to upsert embedding - no data returned")
 
+    def upsert_embeddings_batch(self, rows: list[dict]) -> dict:
+        """
+        Upsert embeddings in requests of up to VECTOR_UPSERT_BATCH_SIZE rows.
+        A request rejected for its data is split in halves, so one bad row
+        only fails itself; if Supabase is unreachable or failing, the rows
+        not stored yet all fail without further requests.
+        Returns {"ids": {item_id: embedding_id}, "errors": {item_id: message}}.
+        """
+        # One statement can't update the same conflict key twice; keep the latest row
+        latest = {row["neurolink_item_id"]: row for row in rows}
+        records = [
+            {
+                "neurolink_item_id": row["neurolink_item_id"],
+                "source_url": row["source_url"],
+                "content_type": row["content_type"],
+                "content_preview": create_content_preview(row["content"]),
+                "embedding": row["embedding"]
+            }
+            for row in latest.values()
+        ]
+
+        ids, errors = {}, {}
+        size = settings.VECTOR_UPSERT_BATCH_SIZE
+        try:
+            for start in range(0, len(records), size):
+                self._upsert_records(records[start:start + size], ids, errors)
+        except Exception as e:
+            for record in records:
+                item_id = record["neurolink_item_id"]
+                if item_id not in ids and item_id not in errors:
+                    errors[item_id] = str(e)
+        return {"ids": ids, "errors": errors}
+
+    def _upsert_records(self, records: list[dict], ids: dict, errors: dict) -> None:
+        try:
+            data = self._send_upsert(records)
+        except Exception as e:
+            if not _is_row_error(e):
+                raise
+            if len(records) == 1:
+                errors[records[0]["neurolink_item_id"]] = str(e)
+                return
+            middle = len(records) // 2
+            self._upsert_records(records[:middle], ids, errors)
+            self._upsert_records(records[middle:], ids, errors)
+            return
+
+        returned = {row["neurolink_item_id"]: row["id"] for row in data}
+        for record in records:
+            item_id = record["neurolink_item_id"]
+            if item_id in returned:
+                ids[item_id] = returned[item_id]
+            else:
+                errors[item_id] = "Failed to upsert embedding - no data returned"
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(httpx.TransportError),
+        before_sleep=record_retry("supabase")
+    )
+    def _send_upsert(self, records: list[dict]) -> list[dict]:
+        """One multi-row upsert request; only network errors are retried."""
+        result = self.client.table("item_embeddings").upsert(
+            records,
+            on_conflict="neurolink_item_id"
+        ).execute()
+        return result.data or []
+
     def delete_embedding(self, neurolink_item_id: int) -> bool:
-        """Delete an embedding by neurolink_item_id."""
+        """Delete an embedding, and any chunk vectors, by neurolink_item_id."""
         result = self.client.table("item_embeddings").delete().eq(
             "neurolink_item_id", neurolink_item_id
         ).execute()
+        self.replace_chunks(neurolink_item_id, [])
         return True
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(httpx.TransportError),
+        before_sleep=record_retry("supabase")
+    )
+    def replace_chunks(self, neurolink_item_id: int, chunks: list[dict]) -> int:
+        """
+        Upsert an item's chunks in one request, then delete chunk rows past
+        the new last index (the item got shorter). Returns the number stored.
+        """
+        if chunks:
+            records = [
+                {
+                    "neurolink_item_id": neurolink_item_id,
+                    "chunk_index": chunk["chunk_index"],
+                    "start_offset": chunk["start_offset"],
+                    "end_offset": chunk["end_offset"],
+                    "embedding": chunk["embedding"]
+                }
+                for chunk in chunks
+            ]
+            self.client.table("item_chunk_embeddings").upsert(
+                records,
+                on_conflict="neurolink_item_id,chunk_index",
+                returning="minimal"
+            ).execute()
+
+        self.client.table("item_chunk_embeddings").delete().eq(
+            "neurolink_item_id", neurolink_item_id
+        ).gte("chunk_index", len(chunks)).execute()
+        return len(chunks)
+
     def search_similar(
         self,
         query_embedding: list[float],
@@ -95,7 +215,61 @@ class VectorService:
 
         return result.data if result.data else []
 
+    def search_chunks(
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        content_type: str | None = None,
+        after: datetime | None = None,
+        before: datetime | None = None
+    ) -> list[dict]:
+        """
+        Search chunk vectors using the match_item_chunks function, which
+        returns the best chunk per item.
+        """
+        params = {
+            "query_embedding": query_embedding,
+            "match_threshold": match_threshold,
+            "match_count": match_count
+        }
+
+        if content_type:
+            params["filter_content_type"] = content_type
+        if after:
+            params["filter_after"] = after.isoformat()
+        if before:
+            params["filter_before"] = before.isoformat()
+
+        result = self.client.rpc("match_item_chunks", params).execute()
+
+        return result.data if result.data else []
+
+
+_vector_service: VectorStore | None = None
+
+
+def get_vector_service() -> VectorStore:
+    """
+    Factory function to get the configured vector store.
+    VECTOR_BACKEND="local" returns the shared in-process index,
+    anything else the shared Supabase VectorService.
+    """
+    global _vector_service
+    if _vector_service is None:
+        if settings.VECTOR_BACKEND == "local":
+            _vector_service = LocalVectorService()
+        else:
+            _vector_service = VectorService()
+    return _vector_service
+
+
+_vector_upsert_batcher: VectorUpsertBatcher | None = None
+
 
-def get_vector_service() -> VectorService:
-    """Factory function to get VectorService instance."""
-    return VectorService()
+def get_vector_upsert_batcher() -> VectorUpsertBatcher:
+    """Get the process-wide vector upsert batcher shared by processing workers."""
+    global _vector_upsert_batcher
+    if _vector_upsert_batcher is None:
+        _vector_upsert_batcher = VectorUpsertBatcher(get_vector_service())
+    return _vector_upsert_batcher
@@ -0,0 +1,210 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.metrics import span
+
+
+CONTENT_PREVIEW_LENGTH = 500
+
+# Same cap as the match_items() SQL function
+MAX_MATCH_COUNT = 100
+
+
+def create_content_preview(content: str) -> str:
+    """Create a content preview truncated to CONTENT_PREVIEW_LENGTH chars."""
+    if len(content) > CONTENT_PREVIEW_LENGTH:
+        return content[:CONTENT_PREVIEW_LENGTH] + "..."
+    return content
+
+
+def merge_chunk_matches(matches: list[dict], chunk_matches: list[dict], match_count: int) -> list[dict]:
+    """
+    Combine item-vector matches with per-item best chunks, keeping each
+    item's highest similarity. Items found only through a chunk have no
+    content_preview. Returns at most match_count matches, best first.
+    """
+    best = {match["neurolink_item_id"]: match for match in matches}
+    for chunk_match in chunk_matches:
+        item_id = chunk_match["neurolink_item_id"]
+        current = best.get(item_id)
+        if current is not None and current["similarity"] >= chunk_match["similarity"]:
+            continue
+        best[item_id] = {
+            **(current or {"neurolink_item_id": item_id, "content_preview": None}),
+            "similarity": chunk_match["similarity"],
+            "matched_chunk": {
+                "chunk_index": chunk_match["chunk_index"],
+                "start_offset": chunk_match["start_offset"],
+                "end_offset": chunk_match["end_offset"]
+            }
+        }
+    return sorted(best.values(), key=lambda match: match["similarity"], reverse=True)[:match_count]
+
+
+class VectorStore(ABC):
+    """
+    Interface of a vector search backend.
+    Implemented by VectorService (Supabase pgvector) and
+    LocalVectorService (in-process NumPy index); selected by VECTOR_BACKEND.
+    """
+
+    @abstractmethod
+    def upsert_embedding(
+        self,
+        neurolink_item_id: int,
+        source_url: str,
+        content_type: str | None,
+        content: str,
+        embedding: list[float]
+    ) -> int:
+        """Insert or replace an item's embedding. Returns the embedding ID."""
+
+    def upsert_embeddings_batch(self, rows: list[dict]) -> dict:
+        """
+        Upsert many embeddings. Each row holds upsert_embedding()'s keyword
+        arguments. Returns {"ids": {item_id: embedding_id}, "errors": {item_id: message}}.
+        Backends override this with a real bulk write; the default loops.
+        """
+        ids, errors = {}, {}
+        for row in rows:
+            try:
+                ids[row["neurolink_item_id"]] = self.upsert_embedding(**row)
+            except Exception as e:
+                errors[row["neurolink_item_id"]] = str(e)
+        return {"ids": ids, "errors": errors}
+
+    @abstractmethod
+    def delete_embedding(self, neurolink_item_id: int) -> bool:
+        """Delete an item's embedding."""
+
+    @abstractmethod
+    def search_similar(
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        content_type: str | None = None,
+        after: datetime | None = None,
+        before: datetime | None = None
+    ) -> list[dict]:
+        """
+        Find items whose cosine similarity exceeds match_threshold.
+        Returns match dicts shaped like match_items() rows, best first:
+        id, neurolink_item_id, source_url, content_type, content_preview,
+        similarity, created_at.
+        """
+
+    @abstractmethod
+    def replace_chunks(self, neurolink_item_id: int, chunks: list[dict]) -> int:
+        """
+        Store an item's chunk vectors, replacing any it had before; an empty
+        list just removes them. Each chunk holds chunk_index, start_offset,
+        end_offset and embedding. Returns the number stored.
+        """
+
+    @abstractmethod
+    def search_chunks(
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        content_type: str | None = None,
+        after: datetime | None = None,
+        before: datetime | None = None
+    ) -> list[dict]:
+        """
+        Find items by their best chunk (max-sim over the item's chunks).
+        Filters apply to the item's embedding row, as in search_similar().
+        Returns one dict per item, best first: neurolink_item_id,
+        chunk_index, start_offset, end_offset, similarity.
+        """
+
+    def search_with_chunks(
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        content_type: str | None = None,
+        after: datetime | None = None,
+        before: datetime | None = None
+    ) -> list[dict]:
+        """
+        search_similar() plus chunk hits aggregated back to their items:
+        an item scores the max of its item vector and best chunk. Matches
+        won by a chunk carry a "matched_chunk" dict with its index and offsets.
+        """
+        filters = {
+            "query_embedding": query_embedding,
+            "match_threshold": match_threshold,
+            "match_count": match_count,
+            "content_type": content_type,
+            "after": after,
+            "before": before
+        }
+        with span("vector_search"):
+            matches = self.search_similar(**filters)
+            if not settings.CHUNKING_ENABLED:
+                return matches
+            return merge_chunk_matches(matches, self.search_chunks(**filters), match_count)
+
+
+class VectorUpsertBatcher:
+    """
+    Micro-batching layer over upsert_embeddings_batch.
+
+    Concurrent `upsert()` calls from processing workers are collected until
+    VECTOR_UPSERT_BATCH_SIZE rows are pending or VECTOR_UPSERT_BATCH_WAIT_MS
+    passes, then written with one bulk call in a worker thread. While a
+    backlog drains, many items share each request.
+    """
+
+    def __init__(self, store: VectorStore):
+        self.store = store
+        self.max_batch_size = settings.VECTOR_UPSERT_BATCH_SIZE
+        self.max_wait = settings.VECTOR_UPSERT_BATCH_WAIT_MS / 1000
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def upsert(self, **row) -> int:
+        """Queue a row (upsert_embedding() arguments) and wait for its embedding ID."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            with span("vector_upsert"):
+                result = await asyncio.to_thread(self.store.upsert_embeddings_batch, [row for row, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for row, future in batch:
+            if future.done():
+                continue
+            item_id = row["neurolink_item_id"]
+            if item_id in result["ids"]:
+                future.set_result(result["ids"][item_id])
+            else:
+                future.set_exception(RuntimeError(result["errors"].get(item_id, "Embedding was not stored")))
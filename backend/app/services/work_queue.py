@@ -0,0 +1,450 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.writer import write_lane
+from app.models.item import SavedItem
+from app.models.job import ProcessingJob
+
+
+logger = logging.getLogger(__name__)
+
+# Results from the handler that will not get better by retrying
+PERMANENT_ERRORS = ("Item not found", "No content available")
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lists
+ITEM_ID_CHUNK_SIZE = 500
+
+# Throughput is measured over this trailing window
+THROUGHPUT_WINDOW_SECONDS = 300
+PROGRESS_LOG_INTERVAL = 30
+
+
+def enqueue_items(db: Session, item_ids: list[int]) -> int:
+    """
+    Queue items for AI processing.
+    Re-queues finished or failed jobs for the same item. A job that is
+    currently running is flagged instead, and goes back to the queue
+    when its run finishes (see record_job_result), since that run may
+    have read the item before it changed. Does not commit.
+    Returns number of ids submitted.
+    """
+    item_ids = list(dict.fromkeys(item_ids))
+    if not item_ids:
+        return 0
+
+    now = datetime.utcnow()
+    table = ProcessingJob.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.item_id],
+        set_={
+            "status": "queued",
+            "attempts": 0,
+            "available_at": now,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "last_error": None,
+            "requeue": False,
+            "updated_at": now,
+        },
+        where=table.c.status != "running"
+    )
+    db.execute(stmt, [
+        {
+            "item_id": item_id,
+            "status": "queued",
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item_id in item_ids
+    ])
+    for start in range(0, len(item_ids), ITEM_ID_CHUNK_SIZE):
+        db.execute(
+            update(ProcessingJob)
+            .where(
+                ProcessingJob.item_id.in_(item_ids[start:start + ITEM_ID_CHUNK_SIZE]),
+                ProcessingJob.status == "running"
+            )
+            .values(requeue=True, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    return len(item_ids)
+
+
+def is_job_running(db: Session, item_id: int) -> bool:
+    """Whether a worker currently holds the item's job (enqueue_items skips it)."""
+    status = db.execute(
+        select(ProcessingJob.status).where(ProcessingJob.item_id == item_id)
+    ).scalar_one_or_none()
+    return status == "running"
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int = 1) -> list:
+    """
+    Atomically lease up to `limit` runnable jobs.
+    Runnable means queued and due, or running with an expired lease
+    (the worker holding it died). Does not commit.
+    Returns rows of (id, item_id, attempts).
+    """
+    now = datetime.utcnow()
+    candidates = (
+        select(ProcessingJob.id)
+        .where(or_(
+            and_(ProcessingJob.status == "queued", ProcessingJob.available_at <= now),
+            and_(ProcessingJob.status == "running", ProcessingJob.lease_expires_at < now)
+        ))
+        .order_by(ProcessingJob.available_at, ProcessingJob.id)
+        .limit(limit)
+    )
+    stmt = (
+        update(ProcessingJob)
+        .where(ProcessingJob.id.in_(candidates.scalar_subquery()))
+        .values(
+            status="running",
+            worker_id=worker_id,
+            lease_expires_at=now + timedelta(seconds=settings.QUEUE_LEASE_SECONDS),
+            attempts=ProcessingJob.attempts + 1,
+            requeue=False,
+            updated_at=now
+        )
+        .returning(ProcessingJob.id, ProcessingJob.item_id, ProcessingJob.attempts)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).all()
+
+
+def extend_lease(db: Session, job_id: int, worker_id: str) -> None:
+    """Push out the lease of a job this worker still holds. Does not commit."""
+    db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.worker_id == worker_id)
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=settings.QUEUE_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def finish_job(db: Session, job_id: int, error: str | None = None) -> None:
+    """Mark a job done, or failed for good when an error is given. Does not commit."""
+    db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id)
+        .values(
+            status="failed" if error else "done",
+            lease_expires_at=None,
+            last_error=error,
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def retry_job(db: Session, job_id: int, attempts: int, error: str) -> bool:
+    """
+    Schedule a failed attempt for retry with exponential backoff.
+    Marks the job failed once QUEUE_MAX_ATTEMPTS is reached. Does not commit.
+    Returns True if the job was re-queued.
+    """
+    if attempts >= settings.QUEUE_MAX_ATTEMPTS:
+        finish_job(db, job_id, error=error)
+        return False
+
+    delay = settings.QUEUE_RETRY_BACKOFF * (2 ** (attempts - 1))
+    now = datetime.utcnow()
+    db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id)
+        .values(
+            status="queued",
+            available_at=now + timedelta(seconds=delay),
+            lease_expires_at=None,
+            worker_id=None,
+            last_error=error,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+def _count_queued() -> int:
+    with SessionLocal() as db:
+        return count_queued_jobs(db)
+
+
+def _requeue_if_requested(db: Session, job_id: int) -> bool:
+    """Put a job flagged by enqueue_items back in the queue as a fresh job."""
+    now = datetime.utcnow()
+    requeued = db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.requeue.is_(True))
+        .values(
+            status="queued",
+            attempts=0,
+            available_at=now,
+            lease_expires_at=None,
+            worker_id=None,
+            last_error=None,
+            requeue=False,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return requeued.rowcount > 0
+
+
+def record_job_result(db: Session, job_id: int, attempts: int, error: str | None, retryable: bool) -> str:
+    """
+    Finish, retry or fail a job after an attempt; a job queued again while
+    it ran is re-queued whatever the outcome. Does not commit.
+    Returns the job's new status.
+    """
+    if _requeue_if_requested(db, job_id):
+        return "queued"
+    if error is None:
+        finish_job(db, job_id)
+        return "done"
+    if retryable and retry_job(db, job_id, attempts, error):
+        return "queued"
+    finish_job(db, job_id, error=error)
+    return "failed"
+
+
+def recover_interrupted_work(db: Session) -> int:
+    """
+    Resume work interrupted by a restart.
+    Jobs left running by the previous process are queued again, and items
+    stuck in "processing" without a job get one. Assumes a single backend
+    process owns the database. Does not commit.
+    Returns number of recovered jobs.
+    """
+    recovered = db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.status == "running")
+        .values(
+            status="queued", lease_expires_at=None, worker_id=None, requeue=False, available_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    active_jobs = select(ProcessingJob.item_id).where(ProcessingJob.status.in_(["queued", "running"]))
+    stuck_ids = db.execute(
+        select(SavedItem.id).where(
+            or_(
+                SavedItem.summary_status == "processing",
+                SavedItem.embedding_status == "processing",
+                SavedItem.chunk_status == "processing"
+            ),
+            SavedItem.id.not_in(active_jobs)
+        )
+    ).scalars().all()
+
+    return recovered + enqueue_items(db, stuck_ids)
+
+
+def count_queued_jobs(db: Session) -> int:
+    """Number of jobs waiting to run (including scheduled retries)."""
+    return db.execute(
+        select(func.count()).select_from(ProcessingJob).where(ProcessingJob.status == "queued")
+    ).scalar_one()
+
+
+def get_queue_depth(db: Session) -> dict[str, int]:
+    """Job counts by status (queued, running, done, failed)."""
+    depth = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    rows = db.execute(
+        select(ProcessingJob.status, func.count()).group_by(ProcessingJob.status)
+    ).all()
+    for status, count in rows:
+        depth[status] = count
+    return depth
+
+
+class RunProgress:
+    """Completed/failed counters and trailing-window throughput for the pool."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self._finished: deque[float] = deque()
+        self._last_log = self.started_at
+
+    def record(self, success: bool) -> None:
+        now = time.monotonic()
+        if success:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self._finished.append(now)
+        while self._finished and self._finished[0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self._finished.popleft()
+
+    def items_per_minute(self) -> float:
+        now = time.monotonic()
+        window = min(THROUGHPUT_WINDOW_SECONDS, now - self.started_at)
+        recent = sum(1 for finished in self._finished if finished >= now - window)
+        return recent * 60 / window if window > 0 else 0.0
+
+    def due_for_log(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_log < PROGRESS_LOG_INTERVAL:
+            return False
+        self._last_log = now
+        return True
+
+    def snapshot(self, queued: int | None = None) -> dict:
+        rate = self.items_per_minute()
+        snapshot = {
+            "completed": self.completed,
+            "failed": self.failed,
+            "items_per_minute": round(rate, 2),
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 1),
+        }
+        if queued is not None:
+            snapshot["queued"] = queued
+            snapshot["eta_seconds"] = round(queued * 60 / rate, 1) if rate else None
+        return snapshot
+
+
+def _is_retryable(result: dict) -> bool:
+    """Failed results are retried unless the item itself is unprocessable."""
+    error = result.get("error") or ""
+    return not any(error.startswith(permanent) for permanent in PERMANENT_ERRORS)
+
+
+class WorkQueue:
+    """
+    Pool of asyncio workers draining the processing_jobs table.
+
+    Jobs are claimed with a lease that is renewed while the handler runs,
+    so a crashed worker's job becomes claimable again once its lease
+    expires. Failed attempts are retried with backoff.
+    """
+
+    def __init__(self):
+        self._handler: Callable[[int], Awaitable[dict]] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self.progress = RunProgress()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self, handler: Callable[[int], Awaitable[dict]], workers: int | None = None) -> None:
+        """Recover interrupted work and start the worker pool."""
+        if self._workers:
+            return
+
+        self._handler = handler
+        recovered = await write_lane.run(recover_interrupted_work)
+        if recovered:
+            logger.info("Recovered %d interrupted processing jobs", recovered)
+
+        self.progress = RunProgress()
+        size = workers or settings.QUEUE_WORKERS
+        self._workers = [
+            asyncio.create_task(self._worker(f"worker-{i}")) for i in range(size)
+        ]
+
+    async def stop(self) -> None:
+        """Stop all workers. In-flight jobs are resumed on next start."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def notify(self) -> None:
+        """Wake idle workers after new jobs were committed."""
+        self._wakeup.set()
+
+    async def _worker(self, worker_id: str) -> None:
+        """
+        Keep up to QUEUE_JOBS_PER_WORKER jobs in flight, claiming more as
+        they finish. Items in flight together share embedding batches.
+        """
+        limit = settings.QUEUE_JOBS_PER_WORKER
+        running: set[asyncio.Task] = set()
+        try:
+            while True:
+                self._wakeup.clear()
+                jobs = []
+                if len(running) < limit:
+                    try:
+                        jobs = await write_lane.run(claim_jobs, worker_id, limit - len(running))
+                    except Exception:
+                        logger.exception("%s failed to claim jobs", worker_id)
+                for job in jobs:
+                    running.add(asyncio.create_task(self._run_job(worker_id, job)))
+
+                if len(running) >= limit:
+                    # Full: claim again once a job finishes
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    # Queue drained: wait for new jobs, a finished job or the poll interval
+                    wakeup = asyncio.create_task(self._wakeup.wait())
+                    done, _ = await asyncio.wait(
+                        running | {wakeup}, timeout=settings.QUEUE_POLL_INTERVAL,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    wakeup.cancel()
+                    done.discard(wakeup)
+                    running -= done
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        logger.error("%s failed to record a job result", worker_id, exc_info=task.exception())
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run_job(self, worker_id: str, job) -> None:
+        task = asyncio.create_task(self._handler(job.item_id))
+        try:
+            # Renew the lease while the handler is still working
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.QUEUE_LEASE_SECONDS / 3)
+                if done:
+                    break
+                await write_lane.run(extend_lease, job.id, worker_id)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        try:
+            result = task.result()
+            error = None if result.get("success") else result.get("error", "Processing failed")
+        except Exception as e:
+            result = {}
+            error = str(e)
+
+        retryable = not result or _is_retryable(result)
+        status = await write_lane.run(record_job_result, job.id, job.attempts, error, retryable)
+        if status == "queued" and error is not None:
+            logger.warning("Item %d failed (attempt %d), retrying: %s", job.item_id, job.attempts, error)
+        elif status == "failed" and retryable:
+            logger.error("Item %d failed after %d attempts: %s", job.item_id, job.attempts, error)
+
+        self.progress.record(error is None)
+        if self.progress.due_for_log():
+            queued = await asyncio.to_thread(_count_queued)
+            snapshot = self.progress.snapshot(queued=queued)
+            logger.info(
+                "Processing: %d done, %d failed, %d queued, %.1f items/min",
+                snapshot["completed"], snapshot["failed"], snapshot["queued"], snapshot["items_per_minute"]
+            )
+
+
+# Application-wide queue; started from the FastAPI lifespan in app.main
+work_queue = WorkQueue()
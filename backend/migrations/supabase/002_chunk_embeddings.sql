@@ -0,0 +1,77 @@
+-- NeuroLink: chunk embeddings for long threads and articles
+-- Run this in the Supabase SQL Editor after 001_vector_setup.sql
+
+-- One row per token-bounded chunk of an item's content.
+-- Offsets are character positions in the item's processed content.
+CREATE TABLE item_chunk_embeddings (
+  id BIGINT PRIMARY KEY GENERATED ALWAYS AS IDENTITY,
+  neurolink_item_id BIGINT NOT NULL,
+  chunk_index INT NOT NULL,
+  start_offset INT NOT NULL,
+  end_offset INT NOT NULL,
+  embedding extensions.vector(1536),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Upsert target; also serves per-item deletes
+CREATE UNIQUE INDEX item_chunk_embeddings_item_chunk_unique
+  ON item_chunk_embeddings (neurolink_item_id, chunk_index);
+
+-- HNSW index for fast similarity search
+CREATE INDEX item_chunk_embeddings_embedding_idx
+  ON item_chunk_embeddings USING hnsw (embedding vector_cosine_ops);
+
+-- Best-matching chunk per item (max-sim). The nearest chunks come from
+-- the HNSW index first (ORDER BY distance + LIMIT, nothing else in that
+-- query, so the index is used), then are reduced to one row per item.
+-- Filters apply to the item's item_embeddings row, so they mean the same
+-- as in match_items(). ef_search covers the candidate pool, which allows
+-- 4 chunks per returned item.
+CREATE OR REPLACE FUNCTION match_item_chunks (
+  query_embedding extensions.vector(1536),
+  match_threshold FLOAT DEFAULT 0.7,
+  match_count INT DEFAULT 10,
+  filter_content_type TEXT DEFAULT NULL,
+  filter_after TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  filter_before TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (
+  neurolink_item_id BIGINT,
+  chunk_index INT,
+  start_offset INT,
+  end_offset INT,
+  similarity FLOAT
+)
+LANGUAGE sql STABLE
+SET hnsw.ef_search = 400
+AS $$
+  WITH nearest AS (
+    SELECT
+      chunks.neurolink_item_id,
+      chunks.chunk_index,
+      chunks.start_offset,
+      chunks.end_offset,
+      chunks.embedding <=> query_embedding AS distance
+    FROM item_chunk_embeddings chunks
+    WHERE chunks.embedding IS NOT NULL
+    ORDER BY chunks.embedding <=> query_embedding ASC
+    LIMIT LEAST(match_count, 100) * 4
+  )
+  SELECT * FROM (
+    SELECT DISTINCT ON (nearest.neurolink_item_id)
+      nearest.neurolink_item_id,
+      nearest.chunk_index,
+      nearest.start_offset,
+      nearest.end_offset,
+      1 - nearest.distance AS similarity
+    FROM nearest
+    JOIN item_embeddings items ON items.neurolink_item_id = nearest.neurolink_item_id
+    WHERE 1 - nearest.distance > match_threshold
+      AND (filter_content_type IS NULL OR items.content_type = filter_content_type)
+      AND (filter_after IS NULL OR items.created_at >= filter_after)
+      AND (filter_before IS NULL OR items.created_at <= filter_before)
+    ORDER BY nearest.neurolink_item_id, nearest.distance ASC
+  ) best
+  ORDER BY best.similarity DESC
+  LIMIT LEAST(match_count, 100);
+$$;
@@ -0,0 +1,235 @@
+"""
+Benchmark: plain TEXT columns vs the compressed, deduplicated content store.
+
+Builds the same synthetic library twice in throwaway SQLite files:
+- "columns": raw_preview/full_content/thread_content as separate TEXT
+  columns with a keyword index over all three (the previous layout)
+- "store": bulk_ingest into content_blobs + spans, keyword index over the
+  blob text
+and reports the database size (with and without the keyword index) plus
+/api/items list and get latency. The store side calls the route functions;
+the columns side runs the queries they ran before.
+
+Text is drawn from a random vocabulary, which compresses worse than real
+tweets, so the size gain on a real library is usually larger.
+
+Usage (from backend/):
+    python -m scripts.bench_content_store --items 50000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import Column, Index, MetaData, Table, Text, create_engine, func, insert, select, text, tuple_
+from sqlalchemy.orm import registry, sessionmaker
+
+from app.api.responses import ORJSONResponse
+from app.api.routes import LIST_FIELDS, _encode_cursor, get_item, list_items
+from app.core.database import Base
+from app.models.item import SavedItem, CONTENT_FIELDS
+from app.schemas.ingest import IngestItem, SavedItemResponse
+from app.services.ingest import _build_row, bulk_ingest
+from app.services.search_index import CREATE_SEARCH_TABLE, INDEXED_COLUMNS, SEARCH_TABLE, create_search_index
+
+PAGE_SIZE = 50
+INGEST_BATCH = 1000
+
+# saved_items as it was: the content fields as TEXT columns
+legacy_metadata = MetaData()
+legacy_items = Table(
+    "saved_items",
+    legacy_metadata,
+    *(
+        column._copy() for column in SavedItem.__table__.columns
+        if column.name not in ("content_ref", "content_spans")
+    ),
+    *(Column(name, Text, nullable=True) for name in CONTENT_FIELDS)
+)
+
+# Column copies bring their index=True indexes; add the table-level ones
+for index in SavedItem.__table__.indexes:
+    copied = {legacy_index.name for legacy_index in legacy_items.indexes}
+    if index.name not in copied and all(column.name in legacy_items.c for column in index.columns):
+        Index(index.name, *(legacy_items.c[column.name] for column in index.columns), unique=index.unique)
+
+
+class LegacyItem:
+    pass
+
+
+registry().map_imperatively(LegacyItem, legacy_items)
+
+
+def make_items(count: int, seed: int = 7) -> list[IngestItem]:
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 10))) for _ in range(5000)]
+
+    def sentences(low: int, high: int) -> str:
+        return " ".join(
+            " ".join(rng.choices(vocabulary, k=rng.randint(6, 20))).capitalize() + "."
+            for _ in range(rng.randint(low, high))
+        )
+
+    items = []
+    for i in range(count):
+        full = sentences(1, 12)
+        thread = None
+        if i % 3 == 0:
+            thread = "\n\n".join([full, *(sentences(1, 8) for _ in range(rng.randint(1, 6)))])
+        items.append(IngestItem(
+            url=f"https://x.com/user{i % 97}/status/{10**17 + i}",
+            preview_text=full[:500],
+            full_content=full,
+            thread_content=thread,
+            extra_data={"content_type": "tweet", "has_images": i % 2 == 0}
+        ))
+    return items
+
+
+def db_size(engine) -> int:
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return Path(engine.url.database).stat().st_size
+
+
+class ColumnsLayout:
+    label = "columns"
+
+    def build(self, engine, items: list[IngestItem]) -> None:
+        legacy_metadata.create_all(bind=engine)
+        columns = (*CONTENT_FIELDS, "summary")
+        with engine.begin() as conn:
+            for start in range(0, len(items), INGEST_BATCH):
+                now = datetime.utcnow()
+                rows = []
+                for item in items[start:start + INGEST_BATCH]:
+                    row, _ = _build_row(item, "twitter", now)
+                    del row["content_ref"], row["content_spans"]
+                    rows.append({
+                        **row,
+                        "raw_preview": item.preview_text,
+                        "full_content": item.full_content,
+                        "thread_content": item.thread_content
+                    })
+                conn.execute(insert(legacy_items), rows)
+            conn.execute(text(CREATE_SEARCH_TABLE.replace(", ".join(INDEXED_COLUMNS), ", ".join(columns))))
+            conn.execute(text(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(columns)}) "
+                f"SELECT id, {', '.join(columns)} FROM saved_items"
+            ))
+
+    def list_page(self, db, cursor: tuple, include_content: bool) -> list[SavedItemResponse]:
+        """The previous /api/items: the columns projection plus the total count."""
+        names = [*LIST_FIELDS, "full_content", "thread_content"] if include_content else LIST_FIELDS
+        rows = db.execute(
+            select(*(legacy_items.c[name] for name in names))
+            .where(tuple_(legacy_items.c.created_at, legacy_items.c.id) < tuple_(*cursor))
+            .order_by(legacy_items.c.created_at.desc(), legacy_items.c.id.desc())
+            .limit(PAGE_SIZE)
+        ).all()
+        db.execute(select(func.count()).select_from(legacy_items)).scalar_one()
+        return [
+            SavedItemResponse.model_validate({"full_content": None, "thread_content": None, **row._mapping})
+            for row in rows
+        ]
+
+    def get(self, db, item_id: int) -> SavedItemResponse:
+        return SavedItemResponse.model_validate(db.get(LegacyItem, item_id))
+
+
+class StoreLayout:
+    label = "store"
+
+    def build(self, engine, items: list[IngestItem]) -> None:
+        Base.metadata.create_all(bind=engine)
+        create_search_index(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            for start in range(0, len(items), INGEST_BATCH):
+                bulk_ingest(db, items[start:start + INGEST_BATCH])
+                db.commit()
+
+    def list_page(self, db, cursor: tuple, include_content: bool) -> ORJSONResponse:
+        return list_items(
+            status=None, content_type=None, author=None, quoted_author=None,
+            limit=PAGE_SIZE, offset=0, cursor=_encode_cursor(*cursor),
+            include_content=include_content, fields=None, db=db
+        )
+
+    def get(self, db, item_id: int) -> ORJSONResponse:
+        return get_item(item_id, fields=None, db=db)
+
+
+def timed(fn, calls: list[tuple]) -> str:
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return f"p50 {statistics.median(latencies):6.2f}ms  p95 {p95:6.2f}ms"
+
+
+def run(layout, items: list[IngestItem], samples: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        start = time.perf_counter()
+        layout.build(engine, items)
+        build_seconds = time.perf_counter() - start
+        total_size = db_size(engine)
+
+        rng = random.Random(1)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            keys = db.execute(select(SavedItem.created_at, SavedItem.id)).all()
+            cursors = [tuple(rng.choice(keys)) for _ in range(samples)]
+            ids = [rng.choice(keys)[1] for _ in range(samples)]
+
+            results = {}
+            for include_content in (False, True):
+                results[include_content] = timed(
+                    layout.list_page, [(db, cursor, include_content) for cursor in cursors]
+                )
+            # Fresh identity map per lookup, as in a request
+            results["get"] = timed(
+                lambda item_id: (layout.get(db, item_id), db.expunge_all()), [(item_id,) for item_id in ids]
+            )
+
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+        table_size = db_size(engine)
+        engine.dispose()
+
+    print(
+        f"{layout.label:<8} build {build_seconds:5.1f}s   size {total_size / 2**20:6.1f} MiB "
+        f"({table_size / 2**20:.1f} MiB without keyword index)"
+    )
+    print(f"{'':<8} list, preview only  {results[False]}")
+    print(f"{'':<8} list, with content  {results[True]}")
+    print(f"{'':<8} get                 {results['get']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--samples", type=int, default=200, help="Timed calls per operation")
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    raw_bytes = sum(
+        len(value.encode())
+        for item in items
+        for value in (item.preview_text, item.full_content, item.thread_content) if value
+    )
+    print(f"Library: {len(items)} items, {raw_bytes / 2**20:.1f} MiB in the three text fields")
+    run(ColumnsLayout(), items, args.samples)
+    run(StoreLayout(), items, args.samples)
+
+
+if __name__ == "__main__":
+    main()
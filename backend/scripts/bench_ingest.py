@@ -0,0 +1,128 @@
+"""
+Benchmark: per-item ingest loop vs set-based bulk_ingest.
+
+Runs both paths against a throwaway SQLite file with a synthetic payload.
+
+Usage (from backend/):
+    python -m scripts.bench_ingest --items 10000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.item import SavedItem
+from app.schemas.ingest import IngestItem
+from app.services.content_store import compute_content_hash, pack_content, store_content
+from app.services.ingest import bulk_ingest, resolve_content_type, has_extracted_content
+from app.services.search_index import create_search_index
+
+
+def make_items(count: int) -> list[IngestItem]:
+    return [
+        IngestItem(
+            url=f"https://x.com/user{i % 97}/status/{10**17 + i}",
+            preview_text=f"Preview text for bookmark {i}",
+            full_content=f"Full tweet text for bookmark {i}. " * 8,
+            thread_content=None if i % 3 else f"Thread text for bookmark {i}. " * 20,
+            extra_data={"content_type": "tweet", "has_images": i % 2 == 0}
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_ingest(db, items: list[IngestItem], platform: str, skip_duplicates: bool) -> list[int]:
+    """The original one-SELECT-and-flush-per-item loop."""
+    items_to_process = []
+    for item in items:
+        content_type = resolve_content_type(item)
+        has_content = has_extracted_content(item, content_type)
+        text, spans = pack_content({
+            "raw_preview": item.preview_text,
+            "full_content": item.full_content,
+            "thread_content": item.thread_content,
+        })
+        content_ref = compute_content_hash(text) if text is not None else None
+        if text is not None:
+            store_content(db, {content_ref: text})
+
+        existing = db.execute(
+            select(SavedItem).where(SavedItem.source_url == item.url)
+        ).scalar_one_or_none()
+
+        if existing:
+            if skip_duplicates:
+                existing.content_ref = content_ref
+                existing.content_spans = spans
+                existing.content_type = content_type
+                existing.extra_data = item.extra_data
+                existing.status = "fetched" if has_content else "pending"
+                existing.fetch_attempts = 1 if has_content else 0
+                existing.summary_status = "pending"
+                existing.embedding_status = "pending"
+                existing.processing_error = None
+                if has_content:
+                    items_to_process.append(existing.id)
+            continue
+
+        saved_item = SavedItem(
+            source_url=item.url,
+            source_platform=platform,
+            content_type=content_type,
+            content_ref=content_ref,
+            content_spans=spans,
+            extra_data=item.extra_data,
+            status="fetched" if has_content else "pending",
+            fetch_attempts=1 if has_content else 0,
+            summary_status="pending",
+            embedding_status="pending"
+        )
+        db.add(saved_item)
+        db.flush()
+        if has_content:
+            items_to_process.append(saved_item.id)
+
+    return items_to_process
+
+
+def bulk(db, items: list[IngestItem], platform: str, skip_duplicates: bool) -> list[int]:
+    return bulk_ingest(db, items, platform=platform, skip_duplicates=skip_duplicates)["item_ids"]
+
+
+def run(label: str, ingest_fn, items: list[IngestItem]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        create_search_index(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        timings = []
+        for phase, skip_duplicates in (("insert", False), ("re-ingest", True)):
+            with Session() as db:
+                start = time.perf_counter()
+                ids = ingest_fn(db, items, "twitter", skip_duplicates)
+                db.commit()
+                elapsed = time.perf_counter() - start
+            timings.append(f"{phase}: {elapsed:7.3f}s ({len(ids)} ids)")
+
+        engine.dispose()
+    print(f"{label:<8} " + "   ".join(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    print(f"Payload: {len(items)} items")
+    run("legacy", legacy_ingest, items)
+    run("bulk", bulk, items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: /api/items payload size and latency by response path.
+
+Serves a synthetic library from a throwaway SQLite file through the real
+router (plus the compression middleware) and compares, per page:
+- "model": the previous path, every item validated into SavedItemResponse
+  and serialized through FastAPI's response_model
+- "orjson": the current path, plain row dicts rendered by ORJSONResponse
+- "fields": the same with fields= set to what a list view shows
+each sent as is, gzip-compressed, and brotli-compressed when the brotli
+package is installed. Latency is measured end to end through TestClient,
+so it includes compression and decompression.
+
+Usage (from backend/):
+    python -m scripts.bench_responses --items 20000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, FastAPI, Query
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select, tuple_, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api import compression
+from app.api.compression import CompressionMiddleware
+from app.api.routes import ITEM_FIELDS, _decode_cursor, _encode_cursor, _item_documents, _select_items, router
+from app.core.database import Base, get_db
+from app.models.item import SavedItem
+from app.schemas.ingest import ItemListResponse, SavedItemResponse
+from app.services.ingest import bulk_ingest
+from app.services.search_index import create_search_index
+from scripts.bench_content_store import make_items
+
+INGEST_BATCH = 1000
+LIST_VIEW_FIELDS = "id,source_url,content_type,raw_preview,summary,created_at"
+
+legacy_router = APIRouter()
+
+
+@legacy_router.get("/legacy/items", response_model=ItemListResponse)
+def legacy_list_items(
+    limit: int = Query(50),
+    cursor: str | None = Query(None),
+    db: Session = Depends(get_db)
+):
+    """The previous /api/items response path: one SavedItemResponse per row."""
+    rows = db.execute(
+        _select_items(ITEM_FIELDS)
+        .where(tuple_(SavedItem.created_at, SavedItem.id) < tuple_(*_decode_cursor(cursor)))
+        .order_by(SavedItem.created_at.desc(), SavedItem.id.desc())
+        .limit(limit)
+    ).all()
+    items = [SavedItemResponse.model_validate(document) for document in _item_documents(rows, ITEM_FIELDS)]
+    total = db.execute(select(func.count()).select_from(SavedItem)).scalar_one()
+    return ItemListResponse(items=items, total=total)
+
+
+def build(engine, count: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    items = make_items(count)
+    with Session() as db:
+        for start in range(0, count, INGEST_BATCH):
+            bulk_ingest(db, items[start:start + INGEST_BATCH])
+            db.commit()
+        # Processed items carry a summary and model
+        db.execute(update(SavedItem).values(
+            summary="A one or two sentence summary of what the bookmarked thread argues and why.",
+            summary_model="gpt-4o-mini",
+            summary_status="completed",
+            embedding_status="completed"
+        ))
+        db.commit()
+
+
+def measure(client: TestClient, path: str, cursors: list[str], encoding: str) -> tuple[float, float]:
+    """Median latency (ms) and median bytes on the wire over the cursors."""
+    latencies, sizes = [], []
+    for cursor in cursors:
+        start = time.perf_counter()
+        response = client.get(f"{path}&cursor={cursor}", headers={"Accept-Encoding": encoding})
+        response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(response.num_bytes_downloaded)
+    return statistics.median(latencies), statistics.median(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=200, help="Requests per variant")
+    args = parser.parse_args()
+
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        build(engine, args.items)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        def bench_db():
+            with Session() as db:
+                yield db
+
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware)
+        app.include_router(legacy_router)
+        app.include_router(router)
+        app.dependency_overrides[get_db] = bench_db
+
+        rng = random.Random(1)
+        with Session() as db:
+            keys = db.execute(select(SavedItem.created_at, SavedItem.id)).all()
+        cursors = [_encode_cursor(*rng.choice(keys)) for _ in range(args.samples)]
+
+        variants = {
+            "model": f"/legacy/items?limit={args.page_size}",
+            "orjson": f"/api/items?limit={args.page_size}",
+            "fields": f"/api/items?limit={args.page_size}&fields={LIST_VIEW_FIELDS}",
+        }
+        print(f"Library: {args.items} items, pages of {args.page_size}, {args.samples} requests per row")
+        print(f"  fields = {LIST_VIEW_FIELDS}")
+        with TestClient(app) as client:
+            # Warm up the page cache and the route
+            measure(client, variants["model"], cursors[:20], "identity")
+            for label, path in variants.items():
+                for encoding in encodings:
+                    latency, size = measure(client, path, cursors, encoding)
+                    print(f"{label:<8} {encoding:<9} p50 {latency:7.2f}ms   {size / 1024:8.1f} KiB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: concurrent reads during writes, default SQLite vs tuned engine + write lane.
+
+Writer threads update item statuses while reader threads page through the
+item list, mimicking the processing workers and the UI polling at once.
+The baseline is a plain engine (rollback journal, commit per write); the
+tuned run uses WAL + pragmas and funnels writes through a WriteLane.
+
+Usage (from backend/):
+    python -m scripts.bench_sqlite_concurrency --items 20000 --writes 2000
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import select, update, insert, create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_sqlite_engine
+from app.core.writer import WriteLane
+from app.models.item import SavedItem
+
+
+def seed(engine, count: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(SavedItem.__table__), [
+            {
+                "source_url": f"https://x.com/user{i % 97}/status/{10**17 + i}",
+                "source_platform": "twitter",
+                "content_type": "tweet",
+                "status": "fetched",
+                "summary_status": "pending",
+                "embedding_status": "pending",
+            }
+            for i in range(count)
+        ])
+
+
+def mark_completed(db, item_id: int) -> None:
+    db.execute(
+        update(SavedItem).where(SavedItem.id == item_id)
+        .values(summary_status="completed", summary="Benchmark summary")
+    )
+
+
+def run(label: str, tuned: bool, items: int, writes: int, writers: int, readers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        if tuned:
+            engine = create_sqlite_engine(url)
+        else:
+            engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        seed(engine, items)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        lane = WriteLane(Session) if tuned else None
+
+        errors = 0
+        read_latencies: list[float] = []
+        done = threading.Event()
+        lock = threading.Lock()
+
+        def writer(offset: int) -> None:
+            nonlocal errors
+            for n in range(offset, writes, writers):
+                item_id = n % items + 1
+                try:
+                    if lane:
+                        lane.call(mark_completed, item_id)
+                    else:
+                        with Session() as db:
+                            mark_completed(db, item_id)
+                            db.commit()
+                except OperationalError:
+                    with lock:
+                        errors += 1
+
+        def reader() -> None:
+            nonlocal errors
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    with Session() as db:
+                        db.execute(
+                            select(SavedItem.id, SavedItem.summary_status)
+                            .order_by(SavedItem.created_at.desc(), SavedItem.id.desc())
+                            .limit(50)
+                        ).all()
+                except OperationalError:
+                    with lock:
+                        errors += 1
+                    continue
+                with lock:
+                    read_latencies.append((time.perf_counter() - start) * 1000)
+
+        reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+        writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        for thread in reader_threads:
+            thread.start()
+        start = time.perf_counter()
+        for thread in writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        for thread in reader_threads:
+            thread.join()
+
+        if lane:
+            lane.stop()
+        engine.dispose()
+
+    ordered = sorted(read_latencies) or [0.0]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    transactions = f", {lane.transactions} txns" if lane else ""
+    print(
+        f"{label:<8} writes: {writes / elapsed:8.0f}/s ({elapsed:6.2f}s{transactions})   "
+        f"reads: {len(read_latencies) / elapsed:8.0f}/s, p95 {p95:6.2f}ms   errors: {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--writes", type=int, default=2_000)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.items} items, {args.writes} writes by {args.writers} writers, {args.readers} readers")
+    run("default", False, args.items, args.writes, args.writers, args.readers)
+    run("tuned", True, args.items, args.writes, args.writers, args.readers)
+
+
+if __name__ == "__main__":
+    main()
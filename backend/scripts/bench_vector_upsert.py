@@ -0,0 +1,69 @@
+"""
+Benchmark: per-row vs batched Supabase vector upserts, against the local PostgREST stub.
+
+One row in the payload has a wrong-sized embedding so the batched path has
+to split its request down to that row; every other row must still be stored.
+The per-row baseline skips that row.
+
+Usage (from backend/):
+    python -m scripts.bench_vector_upsert --rows 2000
+"""
+import argparse
+import random
+import time
+
+from app.core.config import settings
+from app.services.vector_service import VectorService
+from scripts.postgrest_stub import start_stub
+
+
+def make_rows(count: int, dimension: int) -> list[dict]:
+    rows = [
+        {
+            "neurolink_item_id": i,
+            "source_url": f"https://x.com/user{i % 97}/status/{10**17 + i}",
+            "content_type": "tweet",
+            "content": f"Full tweet text for bookmark {i}. " * 8,
+            "embedding": [random.random() for _ in range(dimension)]
+        }
+        for i in range(1, count + 1)
+    ]
+    rows[count // 2]["embedding"] = rows[count // 2]["embedding"][:-1]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--dimension", type=int, default=settings.EMBEDDING_DIMENSION)
+    args = parser.parse_args()
+
+    server, table = start_stub(dimension=args.dimension)
+    settings.SUPABASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.SUPABASE_SERVICE_KEY = "stub-key"
+    service = VectorService()
+    rows = make_rows(args.rows, args.dimension)
+    print(f"{len(rows)} rows, {args.dimension}-dim, batch size {settings.VECTOR_UPSERT_BATCH_SIZE}")
+
+    # upsert_embedding retries every error with backoff, so leave the bad row out here
+    good_rows = [row for row in rows if len(row["embedding"]) == args.dimension]
+    table.requests = 0
+    start = time.perf_counter()
+    for row in good_rows:
+        service.upsert_embedding(**row)
+    elapsed = time.perf_counter() - start
+    print(f"per-row  {elapsed:7.3f}s  {table.requests:5d} requests  {len(good_rows)} stored")
+
+    table.requests = 0
+    start = time.perf_counter()
+    result = service.upsert_embeddings_batch(rows)
+    elapsed = time.perf_counter() - start
+    print(
+        f"batched  {elapsed:7.3f}s  {table.requests:5d} requests  "
+        f"{len(result['ids'])} stored, {len(result['errors'])} failed"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
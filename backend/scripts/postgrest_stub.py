@@ -0,0 +1,239 @@
+"""
+Local PostgREST-compatible stub of the Supabase item_embeddings API.
+
+Serves just what VectorService uses, from memory:
+- POST   /rest/v1/item_embeddings?on_conflict=neurolink_item_id  (upsert, returns rows)
+- DELETE /rest/v1/item_embeddings?neurolink_item_id=eq.<id>
+- POST   /rest/v1/rpc/match_items
+- POST   /rest/v1/item_chunk_embeddings?on_conflict=neurolink_item_id,chunk_index
+- DELETE /rest/v1/item_chunk_embeddings?neurolink_item_id=eq.<id>&chunk_index=gte.<n>
+- POST   /rest/v1/rpc/match_item_chunks
+
+Like Postgres, a request is one statement: a row with the wrong embedding
+dimension fails the whole request (400), which exercises the batch split
+fallback. Point the backend at it with VECTOR_BACKEND=supabase,
+SUPABASE_URL=http://127.0.0.1:54321 and any SUPABASE_SERVICE_KEY.
+
+Usage (from backend/):
+    python -m scripts.postgrest_stub --port 54321
+"""
+import argparse
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def _similarities(rows: list[dict], query_embedding: list[float]) -> np.ndarray:
+    matrix = np.asarray([row["embedding"] for row in rows], dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    return matrix @ query / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingTable:
+    """
+    In-memory item_embeddings table keyed by neurolink_item_id, plus
+    item_chunk_embeddings keyed by (neurolink_item_id, chunk_index).
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.rows: dict[int, dict] = {}
+        self.chunks: dict[tuple[int, int], dict] = {}
+        self.requests = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def upsert(self, records: list[dict]) -> list[dict]:
+        for record in records:
+            if len(record.get("embedding") or []) != self.dimension:
+                raise ValueError(f"expected {self.dimension} dimensions, not {len(record.get('embedding') or [])}")
+        item_ids = [record["neurolink_item_id"] for record in records]
+        if len(set(item_ids)) != len(item_ids):
+            raise ValueError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+
+        stored = []
+        with self._lock:
+            for record in records:
+                existing = self.rows.get(record["neurolink_item_id"])
+                if existing is None:
+                    existing = {
+                        "id": self._next_id,
+                        "created_at": datetime.now(timezone.utc).isoformat()
+                    }
+                    self._next_id += 1
+                row = {**existing, **record}
+                self.rows[record["neurolink_item_id"]] = row
+                stored.append(row)
+        return [{**row, "embedding": json.dumps(row["embedding"])} for row in stored]
+
+    def delete(self, item_id: int) -> None:
+        with self._lock:
+            self.rows.pop(item_id, None)
+
+    def _filtered_rows(self, params: dict) -> list[dict]:
+        with self._lock:
+            rows = list(self.rows.values())
+        if params.get("filter_content_type"):
+            rows = [row for row in rows if row.get("content_type") == params["filter_content_type"]]
+        if params.get("filter_after"):
+            rows = [row for row in rows if row["created_at"] >= params["filter_after"]]
+        if params.get("filter_before"):
+            rows = [row for row in rows if row["created_at"] <= params["filter_before"]]
+        return rows
+
+    def match(self, params: dict) -> list[dict]:
+        rows = self._filtered_rows(params)
+        if not rows:
+            return []
+
+        similarities = _similarities(rows, params["query_embedding"])
+
+        order = np.argsort(-similarities)[:min(params.get("match_count", 10), 100)]
+        return [
+            {
+                "id": rows[i]["id"],
+                "neurolink_item_id": rows[i]["neurolink_item_id"],
+                "source_url": rows[i].get("source_url"),
+                "content_type": rows[i].get("content_type"),
+                "content_preview": rows[i].get("content_preview"),
+                "similarity": float(similarities[i]),
+                "created_at": rows[i]["created_at"]
+            }
+            for i in order
+            if similarities[i] > params.get("match_threshold", 0.7)
+        ]
+
+    def upsert_chunks(self, records: list[dict]) -> None:
+        for record in records:
+            if len(record.get("embedding") or []) != self.dimension:
+                raise ValueError(f"expected {self.dimension} dimensions, not {len(record.get('embedding') or [])}")
+        with self._lock:
+            for record in records:
+                self.chunks[(record["neurolink_item_id"], record["chunk_index"])] = record
+
+    def delete_chunks(self, item_id: int, min_index: int) -> None:
+        with self._lock:
+            for key in [key for key in self.chunks if key[0] == item_id and key[1] >= min_index]:
+                del self.chunks[key]
+
+    def match_chunks(self, params: dict) -> list[dict]:
+        """Best chunk per item, joined to item rows for the filters."""
+        item_ids = {row["neurolink_item_id"] for row in self._filtered_rows(params)}
+        with self._lock:
+            chunks = [chunk for chunk in self.chunks.values() if chunk["neurolink_item_id"] in item_ids]
+        if not chunks:
+            return []
+
+        similarities = _similarities(chunks, params["query_embedding"])
+        best: dict[int, int] = {}
+        for i in np.argsort(-similarities):
+            if similarities[i] > params.get("match_threshold", 0.7):
+                best.setdefault(chunks[i]["neurolink_item_id"], i)
+        return [
+            {
+                "neurolink_item_id": chunks[i]["neurolink_item_id"],
+                "chunk_index": chunks[i]["chunk_index"],
+                "start_offset": chunks[i]["start_offset"],
+                "end_offset": chunks[i]["end_offset"],
+                "similarity": float(similarities[i])
+            }
+            for i in list(best.values())[:min(params.get("match_count", 10), 100)]
+        ]
+
+
+def make_handler(table: EmbeddingTable):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _error(self, status: int, code: str, message: str) -> None:
+            self._reply(status, {"code": code, "message": message, "details": None, "hint": None})
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def do_POST(self):
+            table.requests += 1
+            url = urlsplit(self.path)
+            body = self._body()
+            if url.path == "/rest/v1/item_embeddings":
+                records = body if isinstance(body, list) else [body]
+                try:
+                    self._reply(201, table.upsert(records))
+                except ValueError as e:
+                    self._error(400, "22000", str(e))
+            elif url.path == "/rest/v1/rpc/match_items":
+                self._reply(200, table.match(body))
+            elif url.path == "/rest/v1/item_chunk_embeddings":
+                try:
+                    table.upsert_chunks(body if isinstance(body, list) else [body])
+                    self._reply(201, [])
+                except ValueError as e:
+                    self._error(400, "22000", str(e))
+            elif url.path == "/rest/v1/rpc/match_item_chunks":
+                self._reply(200, table.match_chunks(body))
+            else:
+                self._error(404, "PGRST202", f"Unknown path {url.path}")
+
+        def do_DELETE(self):
+            table.requests += 1
+            self._body()  # postgrest-py sends "{}"; drain it to keep the connection usable
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            item_filter = query.get("neurolink_item_id", [""])[0]
+            if url.path == "/rest/v1/item_chunk_embeddings" and item_filter.startswith("eq."):
+                index_filter = query.get("chunk_index", ["gte.0"])[0]
+                table.delete_chunks(int(item_filter[3:]), int(index_filter.removeprefix("gte.")))
+                self._reply(200, [])
+                return
+            if url.path != "/rest/v1/item_embeddings" or not item_filter.startswith("eq."):
+                self._error(400, "PGRST100", "Only neurolink_item_id=eq.<id> deletes are supported")
+                return
+            table.delete(int(item_filter[3:]))
+            self._reply(200, [])
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub(port: int = 0, dimension: int | None = None) -> tuple[ThreadingHTTPServer, EmbeddingTable]:
+    """Start the stub in a daemon thread; port=0 picks a free port."""
+    table = EmbeddingTable(dimension or settings.EMBEDDING_DIMENSION)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(table))
+    threading.Thread(target=server.serve_forever, name="postgrest-stub", daemon=True).start()
+    return server, table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--dimension", type=int, default=None)
+    args = parser.parse_args()
+
+    server, table = start_stub(args.port, args.dimension)
+    print(f"PostgREST stub on http://127.0.0.1:{server.server_address[1]} ({table.dimension}-dim)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()